@@ -1,9 +1,12 @@
 import os
 import json
+import time
 import requests
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
+from backend.metrics import LLM_REQUEST_SECONDS
+
 # 加载环境变量
 load_dotenv()
 
@@ -78,7 +81,13 @@ def predict_hot_topics(current_data):
     
     try:
         # 发送请求
-        response = requests.post(DEEPSEEK_API_URL, headers=headers, json=payload, timeout=30)
+        start = time.perf_counter()
+        try:
+            response = requests.post(DEEPSEEK_API_URL, headers=headers, json=payload, timeout=30)
+        except Exception:
+            LLM_REQUEST_SECONDS.observe(time.perf_counter() - start, model=payload["model"], status="error")
+            raise
+        LLM_REQUEST_SECONDS.observe(time.perf_counter() - start, model=payload["model"], status=response.status_code)
         response.raise_for_status()
         
         # 解析响应
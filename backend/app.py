@@ -3,8 +3,10 @@ import sys
 import json
 import time
 import logging
+import threading
 from datetime import datetime, timedelta
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, jsonify, request, send_from_directory, g, Response
+from flask import json as flask_json
 from flask_cors import CORS
 
 # 添加项目根目录到系统路径
@@ -13,6 +15,18 @@ sys.path.insert(0, BASE_DIR)
 
 # 导入自定义模块
 from backend.scrapers.manager import get_all_data, get_category_data
+from backend.scrapers.circuit_breaker import breaker_status
+from backend.config.data_sources import CACHE_CONFIG, DATA_SOURCE_MAPPING, init_runtime
+from backend.shared_cache import MemoryCache, get_cache, publish, read_if_changed
+from backend.hot_data_view import HotDataIndex, QueryError
+from backend.rank_history import get_rank_history
+from backend.predictions import refresh_predictions
+from backend.similarity import get_topic_index
+from backend import metrics
+from backend.fingerprint import fingerprint, digest
+from backend.scheduler import TrafficCounter
+from backend.snapshot import SNAPSHOT_FILE, TIME_FORMAT, write_snapshot, read_snapshot, snapshot_mtime, archive_snapshot
+from backend.profiler import profiler, install_signal_handler
 
 # 设置日志
 logging.basicConfig(
@@ -28,13 +42,108 @@ CORS(app)  # 允许跨域请求
 # 缓存数据和更新时间
 cache = {
     "hot_data": {},
+    # 热搜数据的内容指纹，数据内容没有变化时保留原对象，已编码的响应和ETag继续有效
+    "hot_data_fingerprint": None,
     "predictions": [],
+    # 各类别生成预测时的输入哈希 {类别: {"input_hash", "generated_at"}}，只有输入变化的类别才重新生成
+    "prediction_inputs": {},
     "last_update": None,
-    "prediction_date": datetime.now().strftime("%Y-%m-%d")
+    "prediction_date": datetime.now().strftime("%Y-%m-%d"),
+    # 数据是否来自启动时加载的快照，需要尽快在后台刷新
+    "stale": False,
+    # 是否有后台刷新正在进行
+    "refreshing": False,
 }
 
-# 创建静态目录
-os.makedirs(app.static_folder, exist_ok=True)
+# 热搜数据有效期
+HOT_DATA_TTL = timedelta(minutes=30)
+
+# 热搜数据快照文件，重启后可立即返回上次的数据
+HOT_DATA_SNAPSHOT_FILE = SNAPSHOT_FILE
+
+# 外部抓取模式：由独立的抓取进程（python -m backend.worker）刷新数据并写入快照，
+# Web进程不抓取，只在快照更新后重新加载。通过环境变量 SCRAPE_WORKER=external 开启（可以写在.env中）
+def is_external_worker():
+    """是否为外部抓取模式，在加载.env之后读取环境变量"""
+    init_runtime()
+    return os.environ.get("SCRAPE_WORKER", "").lower() == "external"
+
+# 多进程部署时热搜数据和预测结果通过共享缓存（CACHE_CONFIG）同步：
+# 每个进程保留一份本地副本，每秒最多比较一次版本号，版本变化时才重新读取
+SHARED_SYNC_INTERVAL = 1.0
+shared_state = {"checked_at": 0.0, "hot_data": None, "predictions": None}
+
+# 热搜数据的查询索引（数据被替换后重建）和按查询参数缓存的编码后响应
+HOT_DATA_RESPONSE_CACHE_SIZE = 256
+hot_data_view = {"index": None, "responses": MemoryCache(HOT_DATA_RESPONSE_CACHE_SIZE)}
+hot_data_view_lock = threading.Lock()
+
+# 各类别的请求计数，抓取时按请求量决定到期类别的刷新顺序（首次请求时创建）
+traffic_counter = None
+
+# 外部抓取模式下检查快照是否更新的间隔（秒）和上次检查的状态
+SNAPSHOT_CHECK_INTERVAL = 1.0
+snapshot_state = {"mtime": None, "checked_at": 0.0}
+
+# 保证同一时间只有一个刷新任务
+refresh_lock = threading.Lock()
+
+# 保证同一时间只有一个预测任务
+prediction_lock = threading.Lock()
+
+# 是否已经完成初始化
+initialized = False
+
+# 压测模式：使用合成数据且不触发抓取，通过环境变量 LOAD_TEST_DATA=类别数x条目数 开启
+load_test_mode = False
+
+@app.before_request
+def start_request_timer():
+    """记录请求开始时间"""
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    """按路由记录请求耗时"""
+    start = getattr(g, "request_start", None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        metrics.API_REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            route=route,
+            method=request.method,
+            status=response.status_code
+        )
+    return response
+
+@app.route("/metrics")
+def metrics_endpoint():
+    """以Prometheus文本格式导出进程内指标"""
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+def is_admin_request():
+    """校验管理接口权限：配置了ADMIN_TOKEN时校验令牌，否则只允许本机访问"""
+    token = os.environ.get("ADMIN_TOKEN")
+    if token:
+        return request.headers.get("X-Admin-Token") == token
+    return request.remote_addr in ("127.0.0.1", "::1")
+
+@app.route("/admin/profile", methods=["GET", "POST"])
+def admin_profile():
+    """GET查看采样状态，POST在限定时长内开启采样分析（参数 seconds、interval）"""
+    if not is_admin_request():
+        return jsonify({"success": False, "message": "无权访问"}), 403
+    
+    if request.method == "POST":
+        try:
+            seconds = float(request.args["seconds"]) if "seconds" in request.args else None
+            interval = float(request.args["interval"]) if "interval" in request.args else None
+        except ValueError:
+            return jsonify({"success": False, "message": "参数必须是数字"}), 400
+        if not profiler.start(duration=seconds, interval=interval):
+            return jsonify({"success": False, "message": "已有采样在进行", **profiler.status()}), 409
+    
+    return jsonify({"success": True, **profiler.status()})
 
 @app.route("/")
 def index():
@@ -45,6 +154,17 @@ def index():
         "version": "1.0.0"
     })
 
+@app.route("/health")
+def health():
+    """健康检查，不触发任何抓取"""
+    return jsonify({
+        "status": "ok",
+        "stale": cache["stale"],
+        "refreshing": cache["refreshing"],
+        "last_update": cache["last_update"].strftime("%Y-%m-%d %H:%M:%S") if cache["last_update"] else None,
+        "sources": breaker_status()
+    })
+
 @app.route("/api/hot_data")
 def hot_data():
     """获取热搜数据"""
@@ -53,31 +173,336 @@ def hot_data():
     # 如果缓存过期或者强制更新
     force_update = request.args.get("force", "").lower() in ["true", "1", "yes"]
     
-    if force_update or cache["last_update"] is None or \
-       (datetime.now() - cache["last_update"]) > timedelta(minutes=30):
+    sync_shared_cache()
+    
+    if is_external_worker():
+        # 数据由抓取进程刷新，这里只检查快照是否有更新
+        reload_hot_data_snapshot()
+    elif force_update or not cache["hot_data"]:
+        # 强制更新或没有任何数据时同步抓取
+        refresh_hot_data(force_update=force_update)
+    elif is_hot_data_expired():
+        # 已有数据时先返回旧数据，在后台刷新
+        start_background_refresh()
+    
+    try:
+        query = parse_hot_data_query(request.args)
+        body, etag = get_hot_data_response(query)
+    except QueryError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    record_traffic([query["category"]] if "category" in query else list(cache["hot_data"]))
+    
+    response = Response(body, mimetype="application/json")
+    response.headers["X-Data-Stale"] = "1" if cache["stale"] else "0"
+    # 客户端的 If-None-Match 与当前内容一致时返回304
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+def parse_hot_data_query(args):
+    """解析 /api/hot_data 的查询参数（category、limit、cursor、fields、min_score、min_hot），没有参数时返回空字典"""
+    query = {}
+    try:
+        if args.get("category"):
+            query["category"] = args["category"]
+        if args.get("limit"):
+            query["limit"] = int(args["limit"])
+        if args.get("cursor"):
+            query["cursor"] = args["cursor"]
+        if args.get("fields"):
+            query["fields"] = [field.strip() for field in args["fields"].split(",") if field.strip()]
+        if args.get("min_score"):
+            query["min_score"] = float(args["min_score"])
+        if args.get("min_hot"):
+            query["min_hot"] = float(args["min_hot"])
+    except ValueError:
+        raise QueryError("limit、min_score 和 min_hot 必须是数字")
+    return query
+
+def record_traffic(categories):
+    """记录请求涉及的类别"""
+    global traffic_counter
+    if load_test_mode:
+        return
+    try:
+        if traffic_counter is None:
+            traffic_counter = TrafficCounter(get_cache())
+        traffic_counter.hit(categories)
+    except Exception as e:
+        logger.error(f"记录请求计数失败: {e}")
+
+def get_hot_data_view():
+    """获取当前热搜数据的查询索引和响应缓存，数据被替换后重建"""
+    hot_data = cache["hot_data"]
+    view = hot_data_view
+    if view["index"] is None or view["index"].source is not hot_data:
+        with hot_data_view_lock:
+            view = hot_data_view
+            if view["index"] is None or view["index"].source is not hot_data:
+                view = {"index": HotDataIndex(hot_data), "responses": MemoryCache(HOT_DATA_RESPONSE_CACHE_SIZE)}
+                hot_data_view.update(view)
+    return view
+
+def get_hot_data_response(query):
+    """按查询参数返回编码后的响应体和ETag，同一份数据的同一组参数只编码一次"""
+    view = get_hot_data_view()
+    index = view["index"]
+    key = json.dumps(query, sort_keys=True, ensure_ascii=False)
+    cached = view["responses"].get(key)
+    # 编码期间数据可能已被替换，只使用基于当前数据编码的结果
+    if cached is not None and cached[0] is index.source:
+        return cached[1], cached[2]
+    
+    if query:
+        body = flask_json.dumps({"categories": index.query(**query)})
+    else:
+        # 没有参数时与原接口一致，返回所有类别的完整数据
+        body = flask_json.dumps(index.source)
+    etag = digest(body)
+    view["responses"].set(key, (index.source, body, etag))
+    return body, etag
+
+def is_hot_data_expired():
+    """判断热搜数据是否需要刷新"""
+    if load_test_mode:
+        return False
+    return cache["stale"] or cache["last_update"] is None or \
+        (datetime.now() - cache["last_update"]) > HOT_DATA_TTL
+
+def sync_shared_cache(force=False):
+    """从共享缓存读取其他进程更新的热搜数据和预测结果"""
+    if load_test_mode:
+        return
+    now = time.monotonic()
+    if not force and now - shared_state["checked_at"] < SHARED_SYNC_INTERVAL:
+        return
+    shared_state["checked_at"] = now
+    
+    try:
+        store = get_cache()
+        version, entry = read_if_changed(store, "hot_data", shared_state["hot_data"])
+        if entry:
+            set_hot_data(entry["data"], datetime.strptime(entry["updated_at"], TIME_FORMAT), entry.get("fingerprint"))
+            cache["stale"] = False
+        shared_state["hot_data"] = version
+        
+        version, entry = read_if_changed(store, "predictions", shared_state["predictions"])
+        if entry:
+            cache["predictions"] = entry["predictions"]
+            cache["prediction_inputs"] = entry.get("inputs", {})
+            cache["prediction_date"] = entry["date"]
+        shared_state["predictions"] = version
+    except Exception as e:
+        logger.error(f"同步共享缓存失败: {e}")
+
+def publish_hot_data():
+    """将热搜数据写入共享缓存"""
+    try:
+        shared_state["hot_data"] = publish(get_cache(), "hot_data", {
+            "data": cache["hot_data"],
+            "fingerprint": cache["hot_data_fingerprint"],
+            "updated_at": cache["last_update"].strftime(TIME_FORMAT)
+        })
+    except Exception as e:
+        logger.error(f"写入共享缓存失败: {e}")
+
+def publish_predictions():
+    """将预测结果写入共享缓存"""
+    if load_test_mode:
+        return
+    try:
+        shared_state["predictions"] = publish(get_cache(), "predictions", {
+            "predictions": cache["predictions"],
+            "inputs": cache["prediction_inputs"],
+            "date": cache["prediction_date"]
+        })
+    except Exception as e:
+        logger.error(f"写入共享缓存失败: {e}")
+
+def refresh_hot_data(force_update=False):
+    """抓取最新热搜数据并更新缓存和快照，多个进程同一时间只有一个在刷新"""
+    with refresh_lock:
+        # 等待锁期间其他线程或进程可能已经完成了刷新
+        sync_shared_cache(force=True)
+        if not force_update and cache["hot_data"] and not is_hot_data_expired():
+            return
+        
+        # 已有数据时不等待正在刷新的其他进程；没有数据时等它刷新完再读取结果
+        lock = get_cache().lock("refresh:hot_data", timeout=CACHE_CONFIG['refresh_lock_timeout'])
+        wait = force_update or not cache["hot_data"]
+        if not lock.acquire(blocking=wait, wait_timeout=CACHE_CONFIG['refresh_lock_timeout']):
+            logger.info("其他进程正在刷新热搜数据")
+            return
         try:
-            logger.info("开始获取最新热搜数据")
-            
-            # 使用新的爬虫管理器获取数据
-            hot_data = get_all_data(force_update=force_update)
-            
-            if hot_data:
-                cache["hot_data"] = hot_data
-                cache["last_update"] = datetime.now()
-                logger.info(f"成功获取热搜数据: {sum(len(data) for data in hot_data.values())} 条")
-            else:
-                logger.warning("获取热搜数据为空")
-        except Exception as e:
-            logger.error(f"获取热搜数据异常: {e}")
-            # 出错时返回缓存数据
+            sync_shared_cache(force=True)
+            if not force_update and cache["hot_data"] and not is_hot_data_expired():
+                return
+            _refresh_hot_data(force_update)
+        finally:
+            lock.release()
+
+def _refresh_hot_data(force_update):
+    """抓取热搜数据，调用方需持有刷新锁"""
+    cache["refreshing"] = True
+    try:
+        logger.info("开始获取最新热搜数据")
+        
+        # 使用新的爬虫管理器获取数据
+        hot_data = get_all_data(force_update=force_update)
+        
+        if hot_data:
+            changed = set_hot_data(hot_data, datetime.now())
+            cache["stale"] = False
+            if changed:
+                save_hot_data_snapshot()
+            # 数据没有变化时也发布新的更新时间，其他进程按指纹判断后保留原数据
+            publish_hot_data()
+            logger.info(f"成功获取热搜数据: {sum(len(data) for data in hot_data.values())} 条" +
+                        ("" if changed else "，内容没有变化"))
+        else:
+            logger.warning("获取热搜数据为空")
+    except Exception as e:
+        logger.error(f"获取热搜数据异常: {e}")
+        # 出错时保留缓存数据
+    finally:
+        cache["refreshing"] = False
+
+def set_hot_data(hot_data, updated_at, hot_data_fingerprint=None):
+    """
+    替换热搜数据并更新时间；内容指纹与当前数据相同时保留原对象，
+    查询索引、已编码的响应和ETag都不会失效
+
+    返回:
+        bool: 数据内容是否变化
+    """
+    hot_data_fingerprint = hot_data_fingerprint or fingerprint(hot_data)
+    cache["last_update"] = updated_at
+    if cache["hot_data"] and hot_data_fingerprint == cache["hot_data_fingerprint"]:
+        return False
+    cache["hot_data"] = hot_data
+    cache["hot_data_fingerprint"] = hot_data_fingerprint
+    return True
+
+def start_background_refresh(force_update=False):
+    """在后台线程中刷新热搜数据，已有刷新任务时直接返回"""
+    if cache["refreshing"] or refresh_lock.locked():
+        return
+    thread = threading.Thread(
+        target=refresh_hot_data,
+        kwargs={"force_update": force_update},
+        name="hot-data-refresh",
+        daemon=True
+    )
+    thread.start()
+
+def save_hot_data_snapshot():
+    """保存热搜数据快照，同时并入当天的归档"""
+    try:
+        write_snapshot(cache["hot_data"], cache["last_update"], HOT_DATA_SNAPSHOT_FILE)
+    except Exception as e:
+        logger.error(f"保存热搜数据快照失败: {e}")
+    try:
+        archive_snapshot(cache["hot_data"], cache["last_update"])
+    except Exception as e:
+        logger.error(f"归档热搜数据失败: {e}")
+
+def load_synthetic_data(categories, items, seed=0):
+    """进入压测模式，用合成数据填充缓存"""
+    global load_test_mode
+    from backend.benchmarks.synthetic import generate_hot_data
+    
+    load_test_mode = True
+    set_hot_data(generate_hot_data(categories, items, seed), datetime.now())
+    cache["stale"] = False
+    logger.info(f"压测模式: 已生成 {categories} 个类别 × {items} 条合成数据")
+
+def load_hot_data_snapshot(stale=True):
+    """加载上次保存的热搜数据快照，默认将加载后的数据标记为过期"""
+    try:
+        mtime = snapshot_mtime(HOT_DATA_SNAPSHOT_FILE)
+        hot_data, updated_at = read_snapshot(HOT_DATA_SNAPSHOT_FILE)
+        if hot_data is None:
+            return False
+        set_hot_data(hot_data, updated_at)
+        cache["stale"] = stale
+        snapshot_state["mtime"] = mtime
+        logger.info(f"从快照加载了 {sum(len(items) for items in cache['hot_data'].values())} 条热搜数据")
+        return True
+    except Exception as e:
+        logger.error(f"加载热搜数据快照失败: {e}")
+        return False
+
+def reload_hot_data_snapshot():
+    """外部抓取模式下，快照文件有更新时重新加载（每秒最多检查一次）"""
+    now = time.monotonic()
+    if now - snapshot_state["checked_at"] < SNAPSHOT_CHECK_INTERVAL:
+        return
+    snapshot_state["checked_at"] = now
+    
+    mtime = snapshot_mtime(HOT_DATA_SNAPSHOT_FILE)
+    if mtime is not None and mtime != snapshot_state["mtime"]:
+        load_hot_data_snapshot(stale=False)
+
+@app.route("/api/rising")
+def rising():
+    """
+    各来源原始榜单中名次上升最快的条目，只读取排名历史，不触发抓取
+    参数: source（只返回该来源）、category（只返回属于该类别的来源）、window（统计的时间窗口，秒，默认3600）、
+    limit（每个来源的条目数，默认10）
+    """
+    category = request.args.get("category")
+    source = request.args.get("source")
+    if category and category not in DATA_SOURCE_MAPPING:
+        return jsonify({"success": False, "message": f"未知类别: {category}"}), 400
+    try:
+        window = float(request.args.get("window", 3600))
+        limit = int(request.args.get("limit", 10))
+    except ValueError:
+        return jsonify({"success": False, "message": "window 和 limit 必须是数字"}), 400
+    if window <= 0 or not 0 < limit <= 100:
+        return jsonify({"success": False, "message": "window 必须大于0，limit 必须在 1 到 100 之间"}), 400
+    
+    history = get_rank_history()
+    sources = history.sources(category)
+    if source:
+        if source not in sources:
+            return jsonify({"success": False, "message": f"没有来源 {source} 的排名历史"}), 404
+        sources = [source]
+    return jsonify({
+        "window": window,
+        "rising": {name: history.rising(name, window=window, limit=limit) for name in sources}
+    })
+
+@app.route("/api/similar")
+def similar():
+    """
+    查找与文本语义相近的热搜条目（跨来源、跨时间），只读取话题索引，不触发抓取
+    参数: q（查询文本）、k（返回条数，默认10）、category（只返回该类别）、min_score（最低相似度，默认0）
+    """
+    text = request.args.get("q", "").strip()
+    if not text:
+        return jsonify({"success": False, "message": "缺少参数 q"}), 400
+    try:
+        k = int(request.args.get("k", 10))
+        min_score = float(request.args.get("min_score", 0))
+    except ValueError:
+        return jsonify({"success": False, "message": "k 和 min_score 必须是数字"}), 400
+    if not 0 < k <= 100:
+        return jsonify({"success": False, "message": "k 必须在 1 到 100 之间"}), 400
     
-    return jsonify(cache["hot_data"])
+    try:
+        index = get_topic_index()
+    except RuntimeError as e:
+        return jsonify({"success": False, "message": str(e)}), 503
+    results = index.search(text, k=k, category=request.args.get("category"), min_score=min_score)
+    return jsonify({"query": text, "results": results})
 
 @app.route("/api/predictions")
 def predictions():
     """获取预测数据"""
     global cache
     
+    sync_shared_cache()
+    
     # 如果还没有预测数据，生成一些示例
     if not cache["predictions"]:
         create_example_predictions()
@@ -89,60 +514,38 @@ def predictions():
 
 @app.route("/api/generate_predictions", methods=["POST"])
 def generate_predictions():
-    """生成预测"""
+    """生成预测，只重新计算输入数据有变化的类别（force=true 时全部重新计算）"""
     global cache
     
     try:
         # 从请求中获取热搜数据，如果没有则使用最新数据
-        data = request.get_json() or {}
+        data = request.get_json(silent=True) or {}
         hot_data = data.get("hot_data", cache["hot_data"])
+        force = str(data.get("force", request.args.get("force", ""))).lower() in ["true", "1", "yes"]
         
-        # 实际项目中这里应该调用模型生成预测
-        # 这里简单实现，随机选取一些热搜作为预测
-        import random
-        
-        predictions = []
-        categories = list(hot_data.keys())
-        
-        # 为每个类别生成一些预测
-        for i, category in enumerate(categories):
-            items = hot_data.get(category, [])
-            if not items:
-                continue
-                
-            # 随机选择3个热搜
-            selected_items = random.sample(items, min(3, len(items)))
+        with prediction_lock:
+            sync_shared_cache(force=True)
+            # 压测模式下的数据是合成的，只用抽样策略，不调用外部接口
+            predictions, inputs, changed = refresh_predictions(
+                hot_data, cache["predictions"], cache["prediction_inputs"], force=force,
+                strategy="sample" if load_test_mode else None
+            )
             
-            for j, item in enumerate(selected_items):
-                title = item.get("title", "")
-                url = item.get("url", "")
-                hot = item.get("hot", 0)
-                source = item.get("source", "未知")
+            if changed:
+                # 更新缓存
+                cache["predictions"] = predictions
+                cache["prediction_inputs"] = inputs
+                cache["prediction_date"] = datetime.now().strftime("%Y-%m-%d")
                 
-                predictions.append({
-                    "category": category,
-                    "topic": f"话题{i+1}-{j+1}",
-                    "title": title,
-                    "reason": f"该话题在{source}平台热度达到{hot}，是{category}领域的热点内容",
-                    "urls": [url] if url else [],
-                    "titles": [
-                        f"{title} - 明天会更火爆",
-                        f"{title} - 持续发酵中",
-                        f"{title} - 热度不减"
-                    ]
-                })
-        
-        # 更新缓存
-        cache["predictions"] = predictions
-        cache["prediction_date"] = datetime.now().strftime("%Y-%m-%d")
-        
-        # 保存预测结果到文件
-        save_predictions_to_file(predictions)
+                # 保存预测结果到文件，并通知其他进程
+                save_predictions_to_file(cache["predictions"])
+                publish_predictions()
         
         return jsonify({
             "success": True,
-            "message": f"成功生成 {len(predictions)} 条预测",
-            "predictions": predictions,
+            "message": f"成功生成 {len(cache['predictions'])} 条预测，重新计算了 {len(changed)} 个类别",
+            "predictions": cache["predictions"],
+            "changed": changed,
             "date": cache["prediction_date"]
         })
     except Exception as e:
@@ -197,13 +600,18 @@ def create_example_predictions():
     ]
     
     cache["predictions"] = predictions
+    # 示例预测没有对应的输入，下次生成时所有类别都会重新计算
+    cache["prediction_inputs"] = {}
     cache["prediction_date"] = datetime.now().strftime("%Y-%m-%d")
     
-    # 保存预测结果到文件
+    # 保存预测结果到文件，并通知其他进程
     save_predictions_to_file(predictions)
+    publish_predictions()
 
 def save_predictions_to_file(predictions):
-    """保存预测结果到文件"""
+    """保存预测结果到文件，压测模式下不写入（预测来自合成数据）"""
+    if load_test_mode:
+        return
     try:
         # 确保静态目录存在
         os.makedirs(app.static_folder, exist_ok=True)
@@ -213,6 +621,7 @@ def save_predictions_to_file(predictions):
         with open(prediction_file, "w", encoding="utf-8") as f:
             json.dump({
                 "predictions": predictions,
+                "inputs": cache["prediction_inputs"],
                 "date": cache["prediction_date"],
                 "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             }, f, ensure_ascii=False, indent=2)
@@ -224,31 +633,64 @@ def save_predictions_to_file(predictions):
 # 启动时加载数据
 @app.before_first_request
 def initialize():
-    """应用启动时初始化数据"""
+    """应用启动时初始化数据：加载持久化的快照后立即可用，在后台刷新"""
+    global initialized
+    if initialized:
+        return
+    initialized = True
+    
     try:
+        # 加载.env并创建运行所需的目录
+        init_runtime()
+        os.makedirs(app.static_folder, exist_ok=True)
+        
+        # 压测模式下不加载快照也不抓取
+        load_test_size = os.environ.get("LOAD_TEST_DATA")
+        if load_test_size:
+            from backend.benchmarks.synthetic import parse_size
+            load_synthetic_data(*parse_size(load_test_size))
+        
         # 尝试加载预测数据
         prediction_file = os.path.join(app.static_folder, "predictions.json")
         if os.path.exists(prediction_file):
             with open(prediction_file, "r", encoding="utf-8") as f:
                 data = json.load(f)
                 cache["predictions"] = data.get("predictions", [])
+                cache["prediction_inputs"] = data.get("inputs", {})
                 cache["prediction_date"] = data.get("date", datetime.now().strftime("%Y-%m-%d"))
                 logger.info(f"从文件加载了 {len(cache['predictions'])} 条预测")
         
+        # 其他进程已经写入共享缓存的数据比本地快照和文件更新
+        sync_shared_cache(force=True)
+        
         # 如果没有预测数据，创建示例数据
         if not cache["predictions"]:
             create_example_predictions()
             
-        # 初始加载热搜数据
-        hot_data()
+        if not load_test_mode:
+            # 共享缓存中没有数据时加载上次的热搜数据快照
+            if not cache["hot_data"]:
+                load_hot_data_snapshot(stale=not is_external_worker())
+            
+            if is_external_worker():
+                # 外部抓取模式下数据由抓取进程刷新
+                logger.info("外部抓取模式: 热搜数据由抓取进程刷新")
+            else:
+                # 在后台刷新，数据未过期时不会真正抓取
+                start_background_refresh()
     except Exception as e:
         logger.error(f"初始化数据异常: {e}")
 
 if __name__ == "__main__":
+    # 先加载.env，其中的 HOST、PORT、DEBUG 等设置才会生效
+    init_runtime()
     host = os.environ.get("HOST", "0.0.0.0")
     port = int(os.environ.get("PORT", 5000))
     debug = os.environ.get("DEBUG", "").lower() in ["true", "1", "yes"]
     
+    # kill -USR2 <pid> 开启采样分析
+    install_signal_handler()
+    
     # 启动初始化
     # Flask 2.0以下版本不会自动调用before_first_request
     # 所以我们手动调用一次
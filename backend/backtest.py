@@ -0,0 +1,297 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+预测策略回测
+按天回放归档的热搜数据（temp/history/YYYY-MM-DD.json）：用第D天的数据运行预测策略，
+与第D+1天实际出现的条目比较，计算:
+- precision@k: 每个类别前k条预测中，标题与次日某个条目相似（n-gram Jaccard 不低于阈值）的比例
+- cluster_overlap: 次日各类别热度最高的若干个话题聚类中，被预测命中的比例
+
+每天的特征（标题 n-gram 和话题聚类）和每个类别的预测结果都按输入缓存到 temp/backtest_cache/，
+重复回测时直接读取；各策略、各天的回测在进程池中并行执行
+
+用法:
+    python -m backend.backtest [--strategies persistence,sample] [--days 30] [--k 3] [--processes 4]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+
+from backend.config.data_sources import BACKTEST_CONFIG
+from backend.snapshot import HISTORY_DIR, DAY_FORMAT, read_snapshot, list_archives
+from backend.similarity import ngrams
+from backend.predictions import STRATEGIES, input_hash
+
+logger = logging.getLogger('backtest')
+
+
+def persistence_predictions(category, index, items):
+    """基线策略：预测当天热度最高的条目次日仍然热门"""
+    ranked = sorted(items, key=lambda item: item.get('heat_score', item.get('hot', 0)), reverse=True)
+    return [{"category": category, "title": item.get("title", "")} for item in ranked]
+
+
+# 回测可用的策略：预测接口的策略加上基线
+BACKTEST_STRATEGIES = dict(STRATEGIES, persistence=persistence_predictions)
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _cache_file(cache_dir, *parts):
+    return os.path.join(cache_dir, '-'.join(str(part) for part in parts) + '.json')
+
+
+def _read_json(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_file = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_file, path)
+
+
+def cluster_items(grams, threshold):
+    """按热度顺序贪心聚类：与已有聚类首条的相似度达到阈值则并入，否则新建聚类，返回每条所属的聚类编号"""
+    leaders = []
+    assignment = []
+    for item_grams in grams:
+        for cluster_id, leader in enumerate(leaders):
+            if jaccard(item_grams, leader) >= threshold:
+                assignment.append(cluster_id)
+                break
+        else:
+            assignment.append(len(leaders))
+            leaders.append(item_grams)
+    return assignment
+
+
+def day_features(day, path, cache_dir, threshold):
+    """
+    某一天各类别条目的 n-gram 和话题聚类（按归档文件的修改时间缓存）
+
+    返回:
+        dict: {类别: {"grams": [[n-gram, ...], ...], "clusters": [聚类编号, ...]}}，条目按热度降序
+    """
+    stat = os.stat(path)
+    cache_file = _cache_file(cache_dir, 'features', day, stat.st_mtime_ns, stat.st_size, threshold)
+    cached = _read_json(cache_file)
+    if cached is not None:
+        return cached
+
+    hot_data, _ = read_snapshot(path)
+    features = {}
+    for category, items in (hot_data or {}).items():
+        grams = [set(ngrams(item.get('title', ''))) for item in items]
+        features[category] = {
+            'grams': [sorted(g) for g in grams],
+            'clusters': cluster_items(grams, threshold),
+        }
+    _write_json(cache_file, features)
+    return features
+
+
+def predict_day(strategy, day, path, cache_dir, seed):
+    """用某一天的数据运行策略，各类别的预测按输入哈希缓存"""
+    predict = BACKTEST_STRATEGIES[strategy]
+    hot_data, _ = read_snapshot(path)
+    predictions = {}
+    for index, (category, items) in enumerate((hot_data or {}).items()):
+        if not items:
+            continue
+        cache_file = _cache_file(cache_dir, 'predictions', strategy, seed, input_hash(category, items, strategy))
+        cached = _read_json(cache_file)
+        if cached is None:
+            # 随机策略按 (种子, 策略, 日期, 类别) 固定随机数，回测结果可以复现
+            random.seed(f"{seed}:{strategy}:{day}:{category}")
+            cached = [prediction.get('title', '') for prediction in predict(category, index, items)]
+            _write_json(cache_file, cached)
+        predictions[category] = cached
+    return predictions
+
+
+def score_day(predictions, next_features, k, threshold, top_clusters):
+    """按次日的条目为预测打分"""
+    hits = 0
+    total = 0
+    overlaps = []
+    for category, titles in predictions.items():
+        features = next_features.get(category)
+        if not features or not features['grams']:
+            continue
+        next_grams = [set(g) for g in features['grams']]
+        clusters = features['clusters']
+
+        hit_clusters = set()
+        for title in titles[:k]:
+            title_grams = set(ngrams(title))
+            best_score, best_index = 0.0, None
+            for i, item_grams in enumerate(next_grams):
+                score = jaccard(title_grams, item_grams)
+                if score > best_score:
+                    best_score, best_index = score, i
+            total += 1
+            if best_index is not None and best_score >= threshold:
+                hits += 1
+                hit_clusters.add(clusters[best_index])
+
+        # 聚类编号按首条出现的顺序分配，条目按热度降序，因此编号越小的聚类越热
+        top = set(range(min(top_clusters, max(clusters) + 1)))
+        overlaps.append(len(hit_clusters & top) / len(top))
+
+    return {
+        'hits': hits,
+        'predictions': total,
+        'precision': hits / total if total else None,
+        'cluster_overlap': sum(overlaps) / len(overlaps) if overlaps else None,
+    }
+
+
+def run_task(task):
+    """在进程池中执行：回测一个策略在某一天的预测"""
+    strategy, day, path, next_day, next_path, options = task
+    predictions = predict_day(strategy, day, path, options['cache_dir'], options['seed'])
+    next_features = day_features(next_day, next_path, options['cache_dir'], options['threshold'])
+    result = score_day(predictions, next_features, options['k'], options['threshold'], options['top_clusters'])
+    result.update(strategy=strategy, day=day)
+    return result
+
+
+def _feature_task(task):
+    day, path, options = task
+    day_features(day, path, options['cache_dir'], options['threshold'])
+    return day
+
+
+def consecutive_days(archives):
+    """相邻两天都有归档的 (第D天, 第D+1天) 组合"""
+    pairs = []
+    for (day, path), (next_day, next_path) in zip(archives, archives[1:]):
+        expected = (datetime.strptime(day, DAY_FORMAT) + timedelta(days=1)).strftime(DAY_FORMAT)
+        if next_day == expected:
+            pairs.append((day, path, next_day, next_path))
+    return pairs
+
+
+def run_backtest(strategies, days=None, k=3, processes=None, history_dir=HISTORY_DIR,
+                 cache_dir=None, threshold=None, top_clusters=None, seed=0):
+    """
+    回测预测策略
+
+    参数:
+        strategies (list): 策略名称，见 BACKTEST_STRATEGIES
+        days (int): 只回测最近的天数，默认回测全部归档
+        k (int): 每个类别参与打分的预测条数
+        processes (int): 进程数，0 表示在当前进程内执行
+
+    返回:
+        dict: {"days": [...], "strategies": {策略: 汇总}, "daily": [...], "elapsed_s": 耗时}
+    """
+    unknown = [name for name in strategies if name not in BACKTEST_STRATEGIES]
+    if unknown:
+        raise ValueError(f"未知的策略: {','.join(unknown)}")
+
+    options = {
+        'cache_dir': cache_dir or BACKTEST_CONFIG['cache_dir'],
+        'threshold': BACKTEST_CONFIG['match_threshold'] if threshold is None else threshold,
+        'top_clusters': top_clusters or BACKTEST_CONFIG['top_clusters'],
+        'k': k,
+        'seed': seed,
+    }
+    pairs = consecutive_days(list_archives(history_dir))
+    if days:
+        pairs = pairs[-days:]
+
+    start = time.perf_counter()
+    feature_tasks = sorted({(next_day, next_path) for _, _, next_day, next_path in pairs})
+    tasks = [
+        (strategy, day, path, next_day, next_path, options)
+        for strategy in strategies
+        for day, path, next_day, next_path in pairs
+    ]
+    processes = BACKTEST_CONFIG['processes'] if processes is None else processes
+    if processes > 0 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            # 先并行计算次日特征，各策略共用
+            list(pool.map(_feature_task, [(day, path, options) for day, path in feature_tasks]))
+            daily = list(pool.map(run_task, tasks))
+    else:
+        daily = [run_task(task) for task in tasks]
+    elapsed = time.perf_counter() - start
+
+    summary = {}
+    for strategy in strategies:
+        results = [result for result in daily if result['strategy'] == strategy]
+        hits = sum(result['hits'] for result in results)
+        total = sum(result['predictions'] for result in results)
+        overlaps = [result['cluster_overlap'] for result in results if result['cluster_overlap'] is not None]
+        summary[strategy] = {
+            'days': len(results),
+            f'precision_at_{k}': round(hits / total, 4) if total else None,
+            'cluster_overlap': round(sum(overlaps) / len(overlaps), 4) if overlaps else None,
+        }
+
+    return {
+        'days': [day for day, _, _, _ in pairs],
+        'strategies': summary,
+        'daily': daily,
+        'elapsed_s': round(elapsed, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='预测策略回测')
+    parser.add_argument('--strategies', default='persistence,sample',
+                        help=f"逗号分隔的策略: {','.join(BACKTEST_STRATEGIES)}")
+    parser.add_argument('--days', type=int, help='只回测最近的天数')
+    parser.add_argument('--k', type=int, default=3, help='每个类别参与打分的预测条数')
+    parser.add_argument('--processes', type=int, help='进程数，0表示不使用进程池')
+    parser.add_argument('--threshold', type=float, help='标题相似度阈值')
+    parser.add_argument('--history-dir', default=HISTORY_DIR, help='归档目录')
+    parser.add_argument('--seed', type=int, default=0, help='随机策略的种子')
+    parser.add_argument('--json', action='store_true', help='以JSON格式输出（包含每天的结果）')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    strategies = [name.strip() for name in args.strategies.split(',') if name.strip()]
+    results = run_backtest(
+        strategies, days=args.days, k=args.k, processes=args.processes,
+        history_dir=args.history_dir, threshold=args.threshold, seed=args.seed,
+    )
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return 0
+
+    if not results['days']:
+        print(f"{args.history_dir} 中没有相邻两天的归档，无法回测")
+        return 1
+    print(f"回测 {len(results['days'])} 天（{results['days'][0]} ~ {results['days'][-1]}），耗时 {results['elapsed_s']}秒")
+    print(f"{'策略':<14}{'天数':>6}{f'precision@{args.k}':>16}{'cluster_overlap':>18}")
+    for strategy, summary in results['strategies'].items():
+        precision = summary[f'precision_at_{args.k}']
+        overlap = summary['cluster_overlap']
+        print(f"{strategy:<14}{summary['days']:>6}{'-' if precision is None else precision:>16}{'-' if overlap is None else overlap:>18}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+关键词分类基准
+用录制的今日热榜页面中的榜单名称和条目标题，比较逐个关键词做子串查找的旧实现与
+classifier 自动机的分类结果和吞吐量
+
+用法:
+    python -m backend.benchmarks.classifier [--iterations 200] [--json]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+
+from backend.config.data_sources import TOPHUB_CONFIG
+from backend.scrapers.classifier import get_classifier
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def legacy_match_categories(text, keyword_sets):
+    """改造前 TopHubScraper._match_categories 的实现，作为对照"""
+    return [
+        category for category, keywords in keyword_sets.items()
+        if any(keyword.lower() in text.lower() for keyword in keywords)
+    ]
+
+
+def load_corpus():
+    """录制页面中的榜单名称和条目标题"""
+    texts = []
+    for filename in ('tophub_home.html', 'tophub_node.html'):
+        with open(os.path.join(FIXTURES_DIR, filename), 'r', encoding='utf-8') as f:
+            html = f.read()
+        texts.extend(re.findall(r'class="cc-cd-lb">(?:<img[^>]*>)?<span>([^<]*)<', html))
+        texts.extend(re.findall(r'class="t">([^<]*)<', html))
+    return texts
+
+
+def _measure(func, iterations):
+    func()  # 预热
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return time.perf_counter() - start
+
+
+def run(iterations):
+    keyword_sets = TOPHUB_CONFIG['category_keywords']
+    corpus = load_corpus()
+    classifier = get_classifier(keyword_sets)
+
+    implementations = {
+        'legacy': lambda: [legacy_match_categories(text, keyword_sets) for text in corpus],
+        'automaton': lambda: classifier.match_batch(corpus),
+    }
+
+    expected = implementations['legacy']()
+    results = {'texts': len(corpus), 'implementations': {}}
+    for name, func in implementations.items():
+        matched = func()
+        elapsed = _measure(func, iterations)
+        results['implementations'][name] = {
+            'tagged': sum(1 for categories in matched if categories),
+            'same_as_legacy': matched == expected,
+            'texts_per_sec': round(len(corpus) * iterations / elapsed, 1),
+            'us_per_text': round(elapsed / iterations / len(corpus) * 1e6, 3),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='关键词分类基准')
+    parser.add_argument('--iterations', type=int, default=200, help='每种实现分类整个语料的次数')
+    parser.add_argument('--json', action='store_true', help='以JSON格式输出')
+    args = parser.parse_args()
+
+    results = run(args.iterations)
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return 0
+
+    print(f"语料: {results['texts']} 条榜单名称和标题")
+    print(f"{'实现':<12}{'命中分类':>10}{'结果一致':>10}{'条/秒':>14}{'微秒/条':>10}")
+    for name, result in results['implementations'].items():
+        print(f"{name:<12}{result['tagged']:>10}{str(result['same_as_legacy']):>10}"
+              f"{result['texts_per_sec']:>14}{result['us_per_text']:>10}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
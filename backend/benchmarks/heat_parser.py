@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+热度字符串解析基准
+从录制的今日热榜页面中提取全部热度文本，再加入带前后缀、全角字符和大单位的变体，
+比较旧的字符串替换实现与 heat_parser 的解析成功率和吞吐量
+
+用法:
+    python -m backend.benchmarks.heat_parser [--iterations 200] [--json]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+
+from backend.scrapers.heat_parser import parse_heat, parse_heat_batch
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# 录制页面中不包含、但线上出现过的格式
+VARIANTS = [
+    '热度 3.4万', '热度：12万', '99万热度', '15万+', '12K+', '1.5w', '2.5亿', '1,234',
+    '１２３４', '３．５万', '🔥 66.7万', '1.2M', ' 462 ', '',
+]
+
+
+def legacy_parse_hot(hot, index):
+    """改造前 TopHubScraper._parse_hot 的实现，作为对照"""
+    try:
+        return int(hot.replace("万", "0000").replace("k", "000").replace("+", ""))
+    except ValueError:
+        return None
+
+
+def load_corpus():
+    """录制页面中的热度文本加上格式变体"""
+    texts = []
+    for filename in ('tophub_home.html', 'tophub_node.html'):
+        with open(os.path.join(FIXTURES_DIR, filename), 'r', encoding='utf-8') as f:
+            texts.extend(re.findall(r'class="e">([^<]*)<', f.read()))
+    return texts + VARIANTS
+
+
+def _measure(func, iterations):
+    func()  # 预热
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return time.perf_counter() - start
+
+
+def run(iterations):
+    corpus = load_corpus()
+    stripped = [text.strip() for text in corpus]
+
+    implementations = {
+        'legacy': lambda: [legacy_parse_hot(text, i) for i, text in enumerate(stripped)],
+        'parse_heat': lambda: [parse_heat(text) for text in corpus],
+        'parse_heat_batch': lambda: parse_heat_batch(corpus),
+    }
+
+    results = {'strings': len(corpus), 'implementations': {}}
+    for name, func in implementations.items():
+        parsed = func()
+        elapsed = _measure(func, iterations)
+        results['implementations'][name] = {
+            'parsed': sum(1 for value in parsed if value is not None),
+            'strings_per_sec': round(len(corpus) * iterations / elapsed, 1),
+            'us_per_string': round(elapsed / iterations / len(corpus) * 1e6, 3),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='热度字符串解析基准')
+    parser.add_argument('--iterations', type=int, default=200, help='每种实现解析整个语料的次数')
+    parser.add_argument('--json', action='store_true', help='以JSON格式输出')
+    args = parser.parse_args()
+
+    results = run(args.iterations)
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return 0
+
+    print(f"语料: {results['strings']} 条热度文本")
+    print(f"{'实现':<18}{'解析成功':>10}{'条/秒':>14}{'微秒/条':>10}")
+    for name, result in results['implementations'].items():
+        print(f"{name:<18}{result['parsed']:>10}{result['strings_per_sec']:>14}{result['us_per_string']:>10}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
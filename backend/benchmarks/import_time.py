@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+导入耗时回归基准
+使用 `python -X importtime` 测量关键模块的冷启动导入耗时，
+超出预算或导入了不应在启动时加载的模块时以非零状态码退出
+
+用法:
+    python -m backend.benchmarks.import_time [--repeat 5] [--json]
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+# 项目根目录（backend的上一级）
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 启动耗时预算
+# max_ms: 模块累计导入耗时上限（毫秒，取多次运行的中位数）
+# forbidden: 导入该模块时不允许被连带导入的模块（应在首次使用时才加载）
+IMPORT_BUDGETS = {
+    'backend.config.data_sources': {
+        'max_ms': 20,
+        'forbidden': ['dotenv', 'requests', 'bs4'],
+    },
+    'backend.scrapers.manager': {
+        'max_ms': 40,
+        'forbidden': [
+            'requests', 'bs4', 'dotenv', 'numpy',
+            'backend.scrapers.maimai_scraper',
+            'backend.scrapers.sspai_scraper',
+            'backend.scrapers.tophub_scraper',
+        ],
+    },
+    'backend.app': {
+        'max_ms': 400,
+        'forbidden': [
+            'bs4', 'numpy',
+            'backend.scrapers.maimai_scraper',
+            'backend.scrapers.sspai_scraper',
+            'backend.scrapers.tophub_scraper',
+        ],
+    },
+}
+
+
+def measure_import(module):
+    """
+    在全新的解释器中导入模块一次
+
+    返回:
+        tuple: (累计导入耗时毫秒, 被导入的模块集合)
+    """
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=PROJECT_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True
+    )
+
+    cumulative_us = None
+    imported = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        parts = line[len('import time:'):].split('|')
+        try:
+            cumulative = int(parts[1].strip())
+        except ValueError:
+            continue  # 表头
+        name = parts[2].strip()
+        imported.add(name)
+        if name == module:
+            cumulative_us = cumulative
+
+    return (cumulative_us or 0) / 1000.0, imported
+
+
+def run_benchmark(budgets=None, repeat=5):
+    """运行所有模块的导入基准，返回结果列表"""
+    budgets = budgets or IMPORT_BUDGETS
+    results = []
+    for module, budget in budgets.items():
+        timings = []
+        imported = set()
+        for _ in range(repeat):
+            elapsed_ms, imported = measure_import(module)
+            timings.append(elapsed_ms)
+
+        median_ms = statistics.median(timings)
+        violations = sorted(name for name in budget.get('forbidden', []) if name in imported)
+        results.append({
+            'module': module,
+            'median_ms': round(median_ms, 2),
+            'min_ms': round(min(timings), 2),
+            'max_ms': round(max(timings), 2),
+            'budget_ms': budget['max_ms'],
+            'forbidden_imports': violations,
+            'passed': median_ms <= budget['max_ms'] and not violations,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='导入耗时回归基准')
+    parser.add_argument('--repeat', type=int, default=5, help='每个模块的测量次数')
+    parser.add_argument('--json', action='store_true', help='以JSON格式输出结果')
+    args = parser.parse_args()
+
+    results = run_benchmark(repeat=args.repeat)
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        for result in results:
+            status = '通过' if result['passed'] else '超出预算'
+            print(f"{result['module']}: {result['median_ms']}ms (预算 {result['budget_ms']}ms) - {status}")
+            if result['forbidden_imports']:
+                print(f"  启动时不应导入: {', '.join(result['forbidden_imports'])}")
+
+    return 0 if all(result['passed'] for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Flask API 压测工具
+默认在进程内以压测模式启动API（合成数据，不抓取），也可以压测已启动的服务
+（以 LOAD_TEST_DATA=10x1000 python app.py 启动即为压测模式）。
+逐个接口施加并发负载，报告吞吐量、p50/p99延迟和内存占用
+
+用法:
+    python -m backend.benchmarks.load_test --size 10x1000 --concurrency 200 --duration 10
+    python -m backend.benchmarks.load_test --url http://localhost:5000 --pid 12345
+"""
+
+import sys
+import json
+import time
+import logging
+import argparse
+import resource
+import tempfile
+import threading
+import statistics
+
+from backend.benchmarks.synthetic import parse_size
+
+# 压测的接口: {名称: (方法, 路径)}
+ENDPOINTS = {
+    'hot_data': ('GET', '/api/hot_data'),
+    'hot_data_page': ('GET', '/api/hot_data?limit=20&fields=title,hot'),
+    'predictions': ('GET', '/api/predictions'),
+    'generate_predictions': ('POST', '/api/generate_predictions'),
+}
+
+
+def summarize(samples):
+    """计算耗时样本的统计值（毫秒）"""
+    if not samples:
+        return {'count': 0}
+    ordered = sorted(samples)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+    return {
+        'count': len(ordered),
+        'mean_ms': round(statistics.mean(ordered) * 1000, 3),
+        'p50_ms': round(pick(0.50), 3),
+        'p90_ms': round(pick(0.90), 3),
+        'p99_ms': round(pick(0.99), 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+    }
+
+
+def read_rss_kb(pid='self'):
+    """读取进程当前常驻内存（KB），无法读取时返回峰值常驻内存"""
+    try:
+        with open(f'/proc/{pid}/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    if pid == 'self':
+        # Linux上单位为KB，macOS上为字节
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage // 1024 if sys.platform == 'darwin' else usage
+    return None
+
+
+def drive(method, url, concurrency, duration, json_body=None, timeout=30):
+    """
+    以固定并发持续请求一个接口
+
+    返回:
+        dict: 延迟统计、每秒请求数、错误数和响应字节数
+    """
+    import requests
+
+    samples = []
+    errors = [0]
+    received = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client():
+        session = requests.Session()
+        local = []
+        local_errors = 0
+        local_bytes = 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                resp = session.request(method, url, json=json_body, timeout=timeout)
+                local_bytes += len(resp.content)
+                if resp.status_code >= 400:
+                    local_errors += 1
+            except requests.RequestException:
+                local_errors += 1
+            local.append(time.perf_counter() - start)
+        with lock:
+            samples.extend(local)
+            errors[0] += local_errors
+            received[0] += local_bytes
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    result = summarize(samples)
+    result.update({
+        'concurrency': concurrency,
+        'duration_s': round(elapsed, 3),
+        'requests_per_sec': round(len(samples) / elapsed, 1),
+        'errors': errors[0],
+        'bytes_per_response': round(received[0] / len(samples)) if samples else 0,
+    })
+    return result
+
+
+def start_local_server(categories, items, seed=0):
+    """在进程内以压测模式启动API服务，返回 (服务对象, 基础地址)"""
+    from werkzeug.serving import make_server
+    import backend.app as app_module
+
+    # 预测结果写入临时目录，避免覆盖正式数据
+    app_module.app.static_folder = tempfile.mkdtemp(prefix='hot-search-load-')
+    app_module.initialized = True
+    app_module.load_synthetic_data(categories, items, seed)
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    httpd = make_server('127.0.0.1', 0, app_module.app, threaded=True)
+    thread = threading.Thread(target=httpd.serve_forever, name='load-test-server', daemon=True)
+    thread.start()
+    return httpd, f'http://127.0.0.1:{httpd.server_port}'
+
+
+def run(args):
+    """对所有选中的接口依次压测"""
+    categories, items = parse_size(args.size)
+    httpd = None
+    if args.url:
+        base_url = args.url.rstrip('/')
+        pid = args.pid
+    else:
+        httpd, base_url = start_local_server(categories, items, args.seed)
+        pid = 'self'
+
+    results = {
+        'meta': {
+            'base_url': base_url,
+            'size': {'categories': categories, 'items_per_category': items} if not args.url else None,
+            'concurrency': args.concurrency,
+            'duration_s': args.duration,
+        },
+        'endpoints': {},
+    }
+    try:
+        for name in args.endpoints:
+            method, path = ENDPOINTS[name]
+            rss_before = read_rss_kb(pid) if pid else None
+            stats = drive(method, f'{base_url}{path}', args.concurrency, args.duration,
+                          json_body={} if method == 'POST' else None)
+            rss_after = read_rss_kb(pid) if pid else None
+            if rss_after is not None:
+                stats['rss_kb'] = rss_after
+                stats['rss_delta_kb'] = rss_after - rss_before
+            results['endpoints'][name] = stats
+    finally:
+        if httpd is not None:
+            httpd.shutdown()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Flask API 压测工具')
+    parser.add_argument('--size', default='3x1000', help='合成数据规模，类别数x每类条目数')
+    parser.add_argument('--seed', type=int, default=0, help='合成数据的随机种子')
+    parser.add_argument('--concurrency', type=int, default=100, help='并发客户端数')
+    parser.add_argument('--duration', type=float, default=10.0, help='每个接口的压测时长（秒）')
+    parser.add_argument('--endpoints', nargs='+', choices=list(ENDPOINTS), default=list(ENDPOINTS),
+                        help='要压测的接口')
+    parser.add_argument('--url', help='压测已启动的服务，例如 http://localhost:5000')
+    parser.add_argument('--pid', help='已启动服务的进程ID，用于读取内存占用')
+    parser.add_argument('--output', help='结果JSON的输出文件，默认输出到标准输出')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    results = run(args)
+
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
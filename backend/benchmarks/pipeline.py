@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+抓取 → 服务 全链路离线基准
+所有抓取请求都转发到本地回放服务（录制的 tophub/少数派/脉脉 响应），测量:
+- get_all_data 端到端耗时
+- 各解析器吞吐量
+- 缓存命中时的读取耗时
+- 并发访问 /api/hot_data 的每秒请求数
+
+结果以JSON输出，可与基线对比以发现性能回退
+
+用法:
+    python -m backend.benchmarks.pipeline [--latency-ms 50] [--error-rate 0.1] [--output result.json]
+    python -m backend.benchmarks.pipeline --baseline result.json --tolerance 0.2
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import threading
+
+from backend.config.data_sources import BASE_CONFIG, RATE_LIMIT_CONFIG
+from backend.benchmarks.replay_server import ReplayServer, ReplayConfig, FIXTURES_DIR
+from backend.benchmarks.load_test import summarize, drive
+
+
+def configure_offline(server, backoff_delay=0.05):
+    """将所有站点请求转发到回放服务，并放开限速以测量流水线本身的开销"""
+    from backend.scrapers.rate_limiter import rate_limiter
+
+    BASE_CONFIG['host_overrides'].update(server.host_overrides())
+    for host in server.host_overrides():
+        RATE_LIMIT_CONFIG['hosts'][host] = {'rate': 10000, 'burst': 10000}
+    RATE_LIMIT_CONFIG['backoff']['base_delay'] = backoff_delay
+    rate_limiter.buckets.clear()
+
+
+def bench_end_to_end(manager, runs):
+    """测量强制刷新所有类别的端到端耗时"""
+    samples = []
+    item_counts = {}
+    for _ in range(runs):
+        start = time.perf_counter()
+        data = manager.get_all_data(force_update=True)
+        samples.append(time.perf_counter() - start)
+        item_counts = {category: len(items) for category, items in data.items()}
+    result = summarize(samples)
+    result['items'] = item_counts
+    return result
+
+
+def _read_fixture(filename):
+    with open(os.path.join(FIXTURES_DIR, filename), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def bench_parsers(iterations):
+    """测量各解析器的吞吐量"""
+    from backend.scrapers.registry import get_scraper
+
+    tophub = get_scraper('tophub')
+    sspai = get_scraper('sspai')
+    maimai = get_scraper('maimai')
+
+    tophub_html = _read_fixture('tophub_home.html')
+    sspai_html = _read_fixture('sspai_tag_ai.html')
+    sspai_json = _read_fixture('sspai_articles.json')
+    feed_json = _read_fixture('maimai_feed_list.json')
+    hot_json = _read_fixture('maimai_hot_list.json')
+
+    def count_homepage(result):
+        nodes, _ = result
+        return sum(len(items) for items in nodes.values())
+
+    parsers = {
+        'tophub_homepage': (tophub_html, lambda: tophub._parse_homepage(tophub_html), count_homepage),
+        'sspai_html': (sspai_html, lambda: sspai._parse_articles_html(sspai_html), len),
+        'sspai_api': (sspai_json, lambda: sspai._parse_articles_api(json.loads(sspai_json)['data']), len),
+        'maimai_feed': (feed_json, lambda: maimai._parse_feed_items(json.loads(feed_json)['data']['list']), len),
+        'maimai_company': (hot_json, lambda: maimai._parse_discuss_items(json.loads(hot_json)['data']['list']), len),
+    }
+
+    results = {}
+    for name, (payload, parse, count) in parsers.items():
+        items = count(parse())  # 预热
+        start = time.perf_counter()
+        for _ in range(iterations):
+            parse()
+        elapsed = time.perf_counter() - start
+        size = len(payload.encode('utf-8'))
+        results[name] = {
+            'iterations': iterations,
+            'ms_per_op': round(elapsed / iterations * 1000, 3),
+            'ops_per_sec': round(iterations / elapsed, 1),
+            'items_per_sec': round(items * iterations / elapsed, 1),
+            'mb_per_sec': round(size * iterations / elapsed / 1024 / 1024, 3),
+        }
+    return results
+
+
+def bench_cache_reads(manager, iterations):
+    """测量缓存有效时读取类别数据的耗时"""
+    results = {}
+    for category in manager.data_source_mapping:
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            manager.get_category_data(category)
+            samples.append(time.perf_counter() - start)
+        results[category] = summarize(samples)
+    return results
+
+
+def bench_api(hot_data, concurrency, duration):
+    """在真实HTTP服务上并发访问 /api/hot_data"""
+    from werkzeug.serving import make_server
+    import backend.app as app_module
+
+    # 直接注入数据，避免首个请求触发初始化和后台刷新
+    app_module.initialized = True
+    app_module.cache['hot_data'] = hot_data
+    app_module.cache['last_update'] = app_module.datetime.now()
+    app_module.cache['stale'] = False
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    httpd = make_server('127.0.0.1', 0, app_module.app, threaded=True)
+    server_thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    server_thread.start()
+    try:
+        return drive('GET', f'http://127.0.0.1:{httpd.server_port}/api/hot_data', concurrency, duration)
+    finally:
+        httpd.shutdown()
+
+
+def run(args):
+    """运行全部基准，返回结果字典"""
+    from backend.scrapers.manager import ScraperManager
+
+    replay_config = ReplayConfig(args.latency_ms, args.jitter_ms, args.error_rate, seed=args.seed)
+    temp_dir = tempfile.mkdtemp(prefix='hot-search-bench-')
+    try:
+        with ReplayServer(config=replay_config) as server:
+            configure_offline(server)
+            manager = ScraperManager(temp_dir=temp_dir)
+
+            end_to_end = bench_end_to_end(manager, args.runs)
+            hot_data = manager.get_all_data()
+            results = {
+                'meta': {
+                    'python': platform.python_version(),
+                    'platform': platform.platform(),
+                    'latency_ms': args.latency_ms,
+                    'error_rate': args.error_rate,
+                },
+                'end_to_end': end_to_end,
+                'parsers': bench_parsers(args.parser_iterations),
+                'cache_reads': bench_cache_reads(manager, args.cache_iterations),
+                'api_hot_data': bench_api(hot_data, args.concurrency, args.duration),
+            }
+            results['meta']['replayed_requests'] = replay_config.request_count
+            return results
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def key_metrics(results):
+    """提取用于回归对比的关键指标: {名称: (数值, 越大越好)}"""
+    metrics = {
+        'end_to_end.p50_ms': (results['end_to_end']['p50_ms'], False),
+        'api_hot_data.requests_per_sec': (results['api_hot_data']['requests_per_sec'], True),
+    }
+    for name, parser in results['parsers'].items():
+        metrics[f'parsers.{name}.ops_per_sec'] = (parser['ops_per_sec'], True)
+    for category, stats in results['cache_reads'].items():
+        metrics[f'cache_reads.{category}.p50_ms'] = (stats['p50_ms'], False)
+    return metrics
+
+
+def compare(results, baseline, tolerance):
+    """与基线对比，返回退化超过容忍度的指标列表"""
+    current = key_metrics(results)
+    previous = key_metrics(baseline)
+    regressions = []
+    for name, (value, higher_is_better) in current.items():
+        if name not in previous or not previous[name][0]:
+            continue
+        base = previous[name][0]
+        change = (value - base) / base
+        if (higher_is_better and change < -tolerance) or (not higher_is_better and change > tolerance):
+            regressions.append({'metric': name, 'baseline': base, 'current': value, 'change': round(change, 3)})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='抓取 → 服务 全链路离线基准')
+    parser.add_argument('--runs', type=int, default=5, help='端到端刷新次数')
+    parser.add_argument('--parser-iterations', type=int, default=50, help='每个解析器的执行次数')
+    parser.add_argument('--cache-iterations', type=int, default=200, help='每个类别的缓存读取次数')
+    parser.add_argument('--concurrency', type=int, default=8, help='/api/hot_data 并发客户端数')
+    parser.add_argument('--duration', type=float, default=5.0, help='/api/hot_data 压测时长（秒）')
+    parser.add_argument('--latency-ms', type=float, default=0, help='回放服务注入的延迟（毫秒）')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='回放延迟的随机抖动（毫秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='回放服务注入错误的比例')
+    parser.add_argument('--seed', type=int, default=0, help='错误注入的随机种子')
+    parser.add_argument('--output', help='结果JSON的输出文件，默认输出到标准输出')
+    parser.add_argument('--baseline', help='基线结果JSON，对比后有退化时以非零状态码退出')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='允许的退化比例')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    results = run(args)
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        results['regressions'] = compare(results, baseline, args.tolerance)
+        exit_code = 1 if results['regressions'] else 0
+
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
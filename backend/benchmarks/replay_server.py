@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+离线回放服务
+在本地回放 tophub、少数派、脉脉的录制响应，支持注入延迟和错误，
+配合 BASE_CONFIG['host_overrides'] 让爬虫在不访问真实站点的情况下运行
+
+用法:
+    python -m backend.benchmarks.replay_server [--port 8765] [--latency-ms 50] [--error-rate 0.1]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+HTML = 'text/html; charset=utf-8'
+JSON = 'application/json; charset=utf-8'
+
+# 回放路由: {host: [(路径前缀, 录制文件, Content-Type)]}，按顺序匹配，'/' 只匹配根路径
+ROUTES = {
+    'tophub.today': [
+        ('/n/', 'tophub_node.html', HTML),
+        ('/', 'tophub_home.html', HTML),
+    ],
+    'sspai.com': [
+        ('/api/v1/articles', 'sspai_articles.json', JSON),
+        ('/tag/AI', 'sspai_tag_ai.html', HTML),
+    ],
+    'maimai.cn': [
+        ('/web/feed_list', 'maimai_feed_web.html', HTML),
+        ('/api/feed/list', 'maimai_feed_list.json', JSON),
+        ('/api/gossip/v2/hot_list', 'maimai_hot_list.json', JSON),
+        ('/', 'maimai_home.html', HTML),
+    ],
+}
+
+
+class ReplayConfig:
+    """回放行为配置，运行中可修改"""
+
+    def __init__(self, latency_ms=0, jitter_ms=0, error_rate=0.0, error_status=503, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.request_count = 0
+
+    def next_delay(self):
+        """本次请求的注入延迟（秒）"""
+        with self.lock:
+            jitter = self.random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0
+        return max(self.latency_ms + jitter, 0) / 1000.0
+
+    def should_fail(self):
+        """本次请求是否注入错误"""
+        with self.lock:
+            self.request_count += 1
+            return self.error_rate > 0 and self.random.random() < self.error_rate
+
+
+def _load_fixtures():
+    """读取所有录制文件到内存"""
+    fixtures = {}
+    for routes in ROUTES.values():
+        for _, filename, _ in routes:
+            if filename not in fixtures:
+                with open(os.path.join(FIXTURES_DIR, filename), 'rb') as f:
+                    fixtures[filename] = f.read()
+    return fixtures
+
+
+def _match_route(host, path):
+    """根据host和路径查找录制文件"""
+    for prefix, filename, content_type in ROUTES.get(host, []):
+        if prefix == '/' and path != '/':
+            continue
+        if path.startswith(prefix):
+            return filename, content_type
+    return None
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    """回放请求处理器，请求路径格式为 /<host>/<原始路径>"""
+
+    server_version = 'ReplayServer/1.0'
+    protocol_version = 'HTTP/1.1'
+
+    def _send(self, status, body, content_type=HTML):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self):
+        config = self.server.replay_config
+        path = self.path.split('?', 1)[0]
+        host, _, rest = path.lstrip('/').partition('/')
+        route = _match_route(host, f'/{rest}')
+
+        delay = config.next_delay()
+        if delay:
+            time.sleep(delay)
+
+        # 读取并丢弃请求体（登录POST等）
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+
+        if route is None:
+            self._send(404, b'not found')
+            return
+        if config.should_fail():
+            self._send(config.error_status, b'injected error')
+            return
+
+        filename, content_type = route
+        self._send(200, self.server.fixtures[filename], content_type)
+
+    do_GET = _handle
+    do_POST = _handle
+
+    def log_message(self, format, *args):
+        """关闭默认的访问日志"""
+
+
+class ReplayServer:
+    """在后台线程中运行的回放服务"""
+
+    def __init__(self, host='127.0.0.1', port=0, config=None):
+        self.httpd = ThreadingHTTPServer((host, port), ReplayHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.replay_config = config or ReplayConfig()
+        self.httpd.fixtures = _load_fixtures()
+        self.thread = None
+
+    @property
+    def config(self):
+        return self.httpd.replay_config
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def host_overrides(self):
+        """生成可写入 BASE_CONFIG['host_overrides'] 的映射"""
+        return {host: f'{self.base_url}/{host}' for host in ROUTES}
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='replay-server', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='离线回放服务')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0, help='每个请求注入的延迟（毫秒）')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='延迟的随机抖动范围（毫秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='注入错误的比例（0~1）')
+    parser.add_argument('--error-status', type=int, default=503, help='注入错误时返回的状态码')
+    args = parser.parse_args()
+
+    config = ReplayConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.error_status)
+    server = ReplayServer(args.host, args.port, config)
+    print(f"回放服务启动在 {server.base_url}")
+    for host, base in server.host_overrides().items():
+        print(f"  {host} -> {base}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+合成热搜数据生成器
+按 N个类别 × M条 生成结构与真实数据一致、标题接近真实中文热搜的数据，用于压测和容量评估
+"""
+
+import zlib
+import random
+
+# 真实类别名称，超出部分按序号补充
+BASE_CATEGORIES = ['科技', 'AI工具', '大厂八卦职场新闻']
+
+COMPANIES = [
+    '华为', '小米', '腾讯', '阿里巴巴', '字节跳动', '百度', '京东', '美团', '比亚迪', '苹果',
+    '英伟达', '微软', 'OpenAI', '特斯拉', '拼多多', '快手', '网易', '蔚来', '理想汽车', '大疆',
+    '荣耀', 'vivo', 'OPPO', '联想', '智谱AI', '月之暗面', 'DeepSeek', '谷歌', 'Meta', '三星',
+]
+
+EVENTS = [
+    '发布新一代旗舰手机', '推出自研大模型', '公布季度财报', '宣布组织架构调整', '上线AI助手',
+    '开启新一轮校招', '发布自动驾驶系统', '推出折叠屏新品', '被曝裁员', '发布新款芯片',
+    '开源多模态模型', '回应用户质疑', '调整绩效考核制度', '开放API接口', '推出智能眼镜',
+    '年终奖发放完毕', '高管离职', '股价大涨', '进军海外市场', '宣布降价',
+]
+
+DETAILS = [
+    '，业内人士称影响深远', '，股价应声上涨', '，网友热议', '，售价曝光', '，性能提升50%',
+    '，首批用户评价出炉', '，官方回应来了', '，员工透露内幕', '，985应届生年薪曝光', '',
+    '，竞争对手紧急跟进', '，多家媒体实测', '，背后原因引发讨论', '，首日销量破纪录',
+]
+
+PREFIXES = ['', '', '', '突发：', '独家：', '重磅！', '官宣：', '热议：']
+
+SOURCES = {
+    '科技': ['36Kr', '虎嗅网', '少数派', 'FreeBuf', 'IT之家'],
+    'AI工具': ['少数派AI专栏'],
+    '大厂八卦职场新闻': ['脉脉热门', '脉脉公司热榜'],
+}
+
+
+def category_names(count):
+    """生成类别名称"""
+    names = BASE_CATEGORIES[:count]
+    names.extend(f'类别{i + 1}' for i in range(len(names), count))
+    return names
+
+
+def generate_title(rng):
+    """生成一条中文热搜标题"""
+    return f"{rng.choice(PREFIXES)}{rng.choice(COMPANIES)}{rng.choice(EVENTS)}{rng.choice(DETAILS)}"
+
+
+def generate_items(category, count, rng):
+    """生成一个类别的条目，热度服从长尾分布并按热度降序排列"""
+    sources = SOURCES.get(category, ['今日热榜'])
+    items = []
+    for i in range(count):
+        items.append({
+            "title": generate_title(rng),
+            "url": f"https://example.com/{zlib.crc32(category.encode('utf-8')) % 10000}/{i}",
+            "hot": int(rng.paretovariate(1.2) * 1000),
+            "source": rng.choice(sources),
+        })
+    items.sort(key=lambda x: x["hot"], reverse=True)
+    return items
+
+
+def generate_hot_data(categories=3, items=20, seed=0):
+    """
+    生成合成热搜数据
+
+    参数:
+        categories (int): 类别数量
+        items (int): 每个类别的条目数
+        seed (int): 随机种子，相同参数生成的数据相同
+
+    返回:
+        dict: {类别: [条目, ...]}，格式与 get_all_data 一致
+    """
+    rng = random.Random(seed)
+    return {name: generate_items(name, items, rng) for name in category_names(categories)}
+
+
+def parse_size(value):
+    """解析 'N×M' 或 'NxM' 格式的规模参数，返回 (类别数, 每类条目数)"""
+    categories, _, items = value.lower().replace('×', 'x').partition('x')
+    return int(categories), int(items)
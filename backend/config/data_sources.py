@@ -4,15 +4,13 @@
 """
 数据源配置文件
 用于配置各个热点数据源的抓取参数
+
+导入本模块不会产生任何副作用，加载.env和创建目录在 init_runtime() 中完成
 """
 
 import os
-import time
+import threading
 from pathlib import Path
-from dotenv import load_dotenv
-
-# 加载.env文件
-load_dotenv(Path(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) / '.env')
 
 # 项目根目录
 ROOT_DIR = Path(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -30,6 +28,9 @@ BASE_CONFIG = {
     
     # 缓存时间（秒）
     'cache_time': 1800,  # 30分钟
+    
+    # 站点地址替换，{host: 替换后的基础地址}，用于离线基准测试时将请求转发到本地回放服务
+    'host_overrides': {},
 }
 
 # 脉脉配置
@@ -58,6 +59,9 @@ MAIMAI_CONFIG = {
     
     # 更新频率
     'update_interval': 3600,  # 1小时
+
+    # 自适应刷新间隔的范围（秒），见 SCHEDULER_CONFIG['adaptive_interval']
+    'update_interval_bounds': (900, 4 * 3600),  # 15分钟 ~ 4小时
 }
 
 # 少数派配置
@@ -70,12 +74,44 @@ SSPAI_CONFIG = {
         # AI工具标签页
         'ai_tools': '/tag/AI',
         
-        # 文章API
-        'api_articles': 'https://sspai.com/api/v1/articles?limit=20&offset=0&is_matrix=1&sort=matrix_at',
+        # 文章API（混合各类标签，按AI标签过滤后才是需要的文章）
+        'api_articles': 'https://sspai.com/api/v1/articles?limit={limit}&offset={offset}&is_matrix=1&sort=matrix_at',
     },
     
+    # API每页的文章数，以及过滤后条目不足 max_items 时最多请求的页数
+    'api_page_size': 60,
+    'api_max_pages': 3,
+    
+    # 抓取顺序：先请求第一个端点，超过 hedge_delay 秒仍未凑够 sufficient_items 条（或请求失败）时再并行请求下一个
+    'fetch_order': ['api_articles', 'ai_tools'],
+    
+    # 主途径返回不少于该数量的条目时不再对冲请求
+    'sufficient_items': 10,
+    
+    # 对冲请求的等待时间（秒）：按最近 hedge_latency_window 次API抓取（含翻页）耗时的 hedge_percentile 分位数，
+    # 限制在 hedge_delay_bounds 内；成功的样本少于5次时使用 hedge_delay
+    'hedge_delay': 1.0,
+    'hedge_percentile': 0.95,
+    'hedge_latency_window': 50,
+    'hedge_delay_bounds': (0.5, 8.0),
+    
+    # 单次刷新的总耗时预算（秒），超出后只返回已获取到的数据
+    'fetch_budget': 15.0,
+    
+    # 各端点的请求超时（秒），未配置的使用 BASE_CONFIG['request_timeout']
+    'timeouts': {
+        'api_articles': 5,
+        'ai_tools': 10,
+    },
+
+    # API文章的标签名包含其中任一关键词（不区分大小写）时视为AI文章
+    'ai_tag_keywords': ['AI', '人工智能', 'ChatGPT'],
+    
     # 更新频率
     'update_interval': 7200,  # 2小时
+
+    # 自适应刷新间隔的范围（秒），见 SCHEDULER_CONFIG['adaptive_interval']
+    'update_interval_bounds': (1800, 12 * 3600),  # 30分钟 ~ 12小时
 }
 
 # 科技媒体配置
@@ -101,52 +137,331 @@ TOPHUB_CONFIG = {
     # 最大获取条目数
     'max_items': 20,
     
-    # 接口端点
+    # 接口端点（键为展示用的来源名称）
     'endpoints': {
         # 36Kr热榜
-        '36kr': '/n/Q1Vd5Ko85R',
+        '36Kr': '/n/Q1Vd5Ko85R',
         
         # 虎嗅热榜
-        'huxiu': '/n/74Kvx59dkx',
+        '虎嗅网': '/n/74Kvx59dkx',
         
         # 少数派热榜
-        'sspai': '/n/Y2KeDGQdNp',
+        '少数派': '/n/Y2KeDGQdNp',
         
         # FreeBuf热榜
-        'freebuf': '/n/NX5pOXVzB7'
+        'FreeBuf': '/n/NX5pOXVzB7'
+    },
+    
+    # 首页地址，一次下载即可解析出首页上的所有节点
+    'homepage': '/',
+
+    # 首页内容分类关键词，按榜单名称和条目标题匹配
+    'category_keywords': {
+        '科技': ['科技', '数码', 'IT', '互联网', '手机', '电脑', '硬件', '软件', '编程', '开发', '技术', '创新'],
+        '职场': ['职场', '工作', '就业', '招聘', '简历', '求职', '薪资', '加班', '办公', '员工', '人才', '升职', '跳槽'],
+        'AI新闻': ['AI', '人工智能', '机器学习', '深度学习', '神经网络', 'ChatGPT', 'GPT', '大模型', '智能', '算法', '自然语言处理', '计算机视觉'],
     },
+
+    # 分类条目不足该数量时，用标题匹配的条目补足
+    'category_min_items': 5,
+
+    # 单个节点缓存的有效期（秒），过期的节点才会重新抓取；
+    # 自适应刷新间隔比它短时按刷新间隔计算，见 TopHubScraper._node_ttl
+    'node_ttl': 1800,  # 30分钟
+    
+    # 并发抓取节点的线程数
+    'max_workers': 4,
     
     # 更新频率
     'update_interval': 3600,  # 1小时
+
+    # 自适应刷新间隔的范围（秒），见 SCHEDULER_CONFIG['adaptive_interval']
+    'update_interval_bounds': (600, 4 * 3600),  # 10分钟 ~ 4小时
+}
+
+# 请求限速配置
+RATE_LIMIT_CONFIG = {
+    # 未单独配置的站点使用的默认策略（rate: 每秒请求数, burst: 允许的突发请求数）
+    'default': {'rate': 1.0, 'burst': 2},
+
+    # 按站点(host)配置，子域名沿用主域名的配置
+    'hosts': {
+        'tophub.today': {'rate': 0.5, 'burst': 4},
+        'sspai.com': {'rate': 1.0, 'burst': 2},
+        'maimai.cn': {'rate': 0.5, 'burst': 2},
+    },
+
+    # 429/5xx时的指数退避策略
+    'backoff': {
+        'base_delay': 1.0,  # 首次退避时间（秒）
+        'max_delay': 60.0,  # 最长退避时间（秒），Retry-After也不会超过该值
+        'retries': BASE_CONFIG['retry_times'],
+    },
 }
 
-# 数据源和功能映射关系
+# 数据源熔断配置
+CIRCUIT_BREAKER_CONFIG = {
+    # 未单独配置的数据源使用的默认策略
+    'default': {
+        'failure_threshold': 3,  # 连续失败多少次后熔断
+        'recovery_timeout': 300,  # 熔断后多久（秒）放行一次试探请求
+        'max_recovery_timeout': 3600,  # 试探连续失败时等待时间翻倍，最长不超过该值（秒）
+    },
+
+    # 按数据源配置，未配置的字段沿用默认值
+    'sources': {
+        'maimai': {'failure_threshold': 2},
+    },
+}
+
+# 数据源注册表
+# 每个数据源对应一个爬虫类（模块路径:类名），爬虫需提供统一的 fetch(force=False) 接口，
+# 首次使用时才会导入模块并创建实例。新增数据源只需在此注册并在下方映射中引用
+SCRAPER_REGISTRY = {
+    'maimai': {
+        'class': 'backend.scrapers.maimai_scraper:MaimaiScraper',
+    },
+    'sspai': {
+        'class': 'backend.scrapers.sspai_scraper:SSPAIScraper',
+    },
+    'tophub': {
+        'class': 'backend.scrapers.tophub_scraper:TopHubScraper',
+    },
+}
+
+# 数据源和功能映射关系（config 为数据源配置，其中 update_interval 为初始更新频率，开启自适应刷新间隔后在 update_interval_bounds 范围内调整）
 DATA_SOURCE_MAPPING = {
     '大厂八卦职场新闻': {
         'source': 'maimai',
-        'need_update': lambda last_update: time.time() - last_update > MAIMAI_CONFIG['update_interval'],
-        'update_timestamp': lambda: time.time(),
+        'config': MAIMAI_CONFIG,
     },
     'AI工具': {
         'source': 'sspai',
-        'need_update': lambda last_update: time.time() - last_update > SSPAI_CONFIG['update_interval'],
-        'update_timestamp': lambda: time.time(),
+        'config': SSPAI_CONFIG,
     },
     '科技': {
         'source': 'tophub',
-        'need_update': lambda last_update: time.time() - last_update > TOPHUB_CONFIG['update_interval'],
-        'update_timestamp': lambda: time.time(),
+        'config': TOPHUB_CONFIG,
     },
 }
 
 # 临时目录
 TEMP_DIR = ROOT_DIR / 'temp'
 
-# 确保临时目录存在
-if not TEMP_DIR.exists():
-    TEMP_DIR.mkdir(parents=True)
+# 共享缓存配置，驱动可通过环境变量 CACHE_BACKEND 覆盖
+CACHE_CONFIG = {
+    # 缓存驱动: memory（进程内LRU）、file（本地目录，多进程共享）、redis、fakeredis（进程内模拟Redis）
+    'backend': 'file',
+
+    'memory': {
+        'max_entries': 256,
+    },
+
+    # 环境变量 CACHE_PATH 可覆盖
+    'file': {
+        'path': str(TEMP_DIR / 'cache'),
+    },
+
+    # 环境变量 REDIS_URL 可覆盖
+    'redis': {
+        'url': 'redis://localhost:6379/0',
+        'prefix': 'hot-search:',
+    },
+
+    # 刷新锁的最长持有时间（秒），持有者异常退出后超过该时间自动释放
+    'refresh_lock_timeout': 300,
+}
+
+# 独立抓取进程配置（python -m backend.worker）
+WORKER_CONFIG = {
+    # 检查各类别是否需要刷新的间隔（秒），实际刷新频率由各数据源的 update_interval 决定，
+    # 每轮刷新的类别数和顺序见 SCHEDULER_CONFIG
+    'poll_interval': 60,
+
+    # 有熔断的数据源时，在其恢复时间到达后提前开始下一轮（发起试探），两轮之间至少间隔该值（秒）
+    'min_probe_wait': 1,
+
+    # 解析进程数，0 表示在抓取进程内解析
+    'parse_processes': min(os.cpu_count() or 1, 4),
+
+    # 解析进程的启动方式
+    'start_method': 'spawn',
+}
+
+# 刷新调度配置：到期的类别按优先级排序，抓取能力有限时先刷新最需要的类别
+# 优先级 = 超期倍数（距上次抓取的时间 / 新鲜度目标） × 请求量权重 × 变化率权重
+SCHEDULER_CONFIG = {
+    # 各类别的新鲜度目标（秒），未配置的使用数据源的 update_interval
+    'freshness_sla': {
+        '大厂八卦职场新闻': 3600,
+        'AI工具': 7200,
+        '科技': 3600,
+    },
 
-# 确保cookie存储目录存在
-cookie_dir = os.path.dirname(MAIMAI_CONFIG['login']['cookie_path'])
-if not os.path.exists(cookie_dir):
-    os.makedirs(cookie_dir) 
\ No newline at end of file
+    # 请求量权重：乘以 1 + traffic_weight * ln(1 + 衰减后的请求数)
+    'traffic_weight': 0.5,
+
+    # 请求计数的半衰期（秒）
+    'traffic_half_life': 3600,
+
+    # Web进程把请求计数写入共享缓存的间隔（秒）
+    'traffic_flush_interval': 10,
+
+    # 变化率权重：乘以 1 + volatility_weight * 变化率（上次刷新新出现的条目占比，0~1）
+    'volatility_weight': 1.0,
+
+    # 变化率的平滑系数，越大越偏向最近一次刷新
+    'volatility_smoothing': 0.5,
+
+    # 自适应刷新间隔：按每次刷新新出现的条目占比和距上次抓取的时间估计各数据源的变化速度，
+    # 在数据源的 update_interval_bounds 范围内缩短或延长刷新间隔；关闭时使用固定的 update_interval
+    'adaptive_interval': True,
+
+    # 期望每次刷新新出现的条目占比，变化更快时缩短间隔，更慢时延长
+    'target_change': 0.2,
+
+    # 单次调整刷新间隔的最大倍数
+    'max_interval_step': 2.0,
+
+    # 抓取进程每轮最多刷新的类别数，None 表示不限制（没有缓存数据的类别总是刷新）
+    'max_refreshes_per_round': 2,
+}
+
+# 排名历史配置
+RANK_HISTORY_CONFIG = {
+    # 变化记录目录，每个来源（条目的 source 字段）一个 .jsonl 文件
+    'path': str(TEMP_DIR / 'rank_history'),
+
+    # 每个条目在内存中保留的名次变化点数量
+    'max_points': 48,
+
+    # 下榜条目保留的时长（秒）
+    'retention': 7 * 24 * 3600,
+
+    # 记录文件超过该大小后压缩为当前榜单
+    'max_file_bytes': 8 * 1024 * 1024,
+
+    # 规范化链接时去掉的查询参数（utm_ 开头的参数总是去掉）
+    'ignored_query_params': ['spm', 'from', 'source', 'ref', 'share_token'],
+}
+
+# 热度归一化配置
+HEAT_SCORE_CONFIG = {
+    # t-digest 压缩参数，越大越精确，每个来源的质心数约为该值的一半
+    'compression': 100,
+
+    # 每次抓取前已有分布的权重衰减系数，1 表示不衰减
+    'decay': 0.9,
+}
+
+# 话题相似度索引配置
+# 可选依赖：需要安装 numpy（pip install numpy，未列入 requirements.txt），
+# 没有安装时不建立索引，抓取不受影响，/api/similar 返回503
+SIMILARITY_CONFIG = {
+    # 索引文件目录
+    'path': str(TEMP_DIR / 'similarity'),
+
+    # 哈希向量的维度
+    'dim': 512,
+
+    # 最多保存的条目数，写满后覆盖最早的条目（向量文件大小为 capacity × dim × 4 字节）
+    'capacity': 20000,
+
+    # LSH 表数和每个表的位数（每个表 2^bits 个桶，bits 不超过8）
+    'lsh_tables': 16,
+    'lsh_bits': 8,
+
+    # 随机超平面的种子，修改后需要删除索引文件
+    'seed': 0,
+
+    # 条目数不超过该值时直接与全部条目比较
+    'exact_search_below': 2000,
+
+    # 上次重算之后写入的条目数达到当时的文档数（至少为该值）后重算全部向量
+    'min_reweight_docs': 50,
+
+    # 条目信息的变化先追加到 meta.log，日志中超过该条数后才改写整个 meta.json
+    'meta_log_rows': 5000,
+
+    # 写入索引时文件锁的最长持有时间（秒）
+    'lock_timeout': 60,
+}
+
+# 预测配置
+PREDICTION_CONFIG = {
+    # 预测策略: sample（从热搜中抽样）、deepseek（调用DeepSeek接口），环境变量 PREDICTION_STRATEGY 可覆盖
+    'strategy': 'sample',
+
+    # sample 策略每个类别的预测条数
+    'items_per_category': 3,
+}
+
+# 预测回测配置（python -m backend.backtest）
+BACKTEST_CONFIG = {
+    # 按天归档的热搜数据目录
+    'history_dir': str(TEMP_DIR / 'history'),
+
+    # 归档保留的天数
+    'retention_days': 90,
+
+    # 合并当天归档时文件锁的最长持有时间（秒），Web进程和抓取进程都会写入归档
+    'archive_lock_timeout': 30,
+
+    # 每天特征（n-gram 和话题聚类）和各类别预测结果的缓存目录
+    'cache_dir': str(TEMP_DIR / 'backtest_cache'),
+
+    # 预测标题与次日条目的 n-gram Jaccard 相似度达到该值视为命中，同一话题聚类也使用该阈值
+    'match_threshold': 0.3,
+
+    # 计算话题聚类重合度时，每个类别取次日热度最高的聚类数
+    'top_clusters': 10,
+
+    # 回测进程数
+    'processes': min(os.cpu_count() or 1, 4),
+}
+
+# 采样分析器配置
+PROFILER_CONFIG = {
+    # 采样间隔（秒）
+    'interval': 0.005,
+
+    # 未指定时长时的默认采样时长（秒）
+    'default_duration': 30,
+
+    # 单次采样的最长时长（秒）
+    'max_duration': 300,
+
+    # 折叠栈文件的输出目录
+    'output_dir': str(TEMP_DIR / 'profiles'),
+}
+
+_runtime_initialized = False
+_runtime_lock = threading.Lock()
+
+def init_runtime():
+    """
+    初始化运行环境：加载.env文件并创建临时目录
+    可重复调用，只有第一次调用会真正执行
+    """
+    global _runtime_initialized
+    if _runtime_initialized:
+        return
+    
+    with _runtime_lock:
+        if _runtime_initialized:
+            return
+        
+        # 加载.env文件
+        from dotenv import load_dotenv
+        load_dotenv(ROOT_DIR / '.env')
+        MAIMAI_CONFIG['login']['username'] = os.getenv('MAIMAI_USERNAME')
+        MAIMAI_CONFIG['login']['password'] = os.getenv('MAIMAI_PASSWORD')
+        
+        # 确保临时目录存在
+        TEMP_DIR.mkdir(parents=True, exist_ok=True)
+        
+        # 确保cookie存储目录存在
+        cookie_dir = os.path.dirname(MAIMAI_CONFIG['login']['cookie_path'])
+        os.makedirs(cookie_dir, exist_ok=True)
+        
+        _runtime_initialized = True
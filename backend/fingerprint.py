@@ -0,0 +1,24 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+数据指纹
+把抓取结果按规范形式（键排序、紧凑分隔符、不转义中文）序列化后取哈希，
+内容相同的数据无论对象是否相同、键的顺序如何都得到相同的指纹，
+用于判断数据源返回的内容是否真的变化，以及生成响应的ETag
+"""
+
+import json
+import hashlib
+
+
+def digest(raw):
+    """字节串或字符串的哈希（十六进制，32个字符）"""
+    if isinstance(raw, str):
+        raw = raw.encode('utf-8')
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def fingerprint(data):
+    """可JSON序列化数据的内容指纹"""
+    return digest(json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str))
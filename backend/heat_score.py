@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+热度归一化
+各数据源的 hot 含义不同（点赞+评论、站内热度、"万"字符串换算等），不能直接比较。
+这里为每个来源（条目的 source 字段）维护一个 t-digest 分位数草图，
+把原始热度换算成该来源历史分布中的百分位（heat_score，0~100），不同来源之间可以直接排序。
+草图的大小与数据量无关，旧数据按衰减系数逐渐淡出
+"""
+
+import math
+import bisect
+import logging
+
+from backend.config.data_sources import HEAT_SCORE_CONFIG
+
+logger = logging.getLogger('heat_score')
+
+
+class TDigest:
+    """合并式 t-digest：质心按均值排序，靠近两端的质心权重更小，因此尾部分位数更精确"""
+
+    def __init__(self, compression=100, centroids=None, minimum=None, maximum=None):
+        self.compression = compression
+        self.centroids = [tuple(c) for c in centroids or []]
+        self.buffer = []
+        self.min = minimum
+        self.max = maximum
+        self._index = None
+
+    @property
+    def total(self):
+        return sum(weight for _, weight in self.centroids) + sum(weight for _, weight in self.buffer)
+
+    def add(self, value, weight=1.0):
+        """加入一个值"""
+        value = float(value)
+        self.buffer.append((value, weight))
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self._index = None
+        if len(self.buffer) >= self.compression * 5:
+            self._compress()
+
+    def decay(self, factor):
+        """所有已有数据的权重乘以factor，使草图偏向最近的数据"""
+        self._compress()
+        self.centroids = [(mean, weight * factor) for mean, weight in self.centroids]
+        self._index = None
+
+    def _q_limit(self, q):
+        """k1 尺度函数 k(q) = δ/(2π)·asin(2q-1)：从分位数q开始的质心最多覆盖到 k 增加1 的位置"""
+        k = self.compression / (2 * math.pi) * math.asin(2 * q - 1) + 1
+        return (math.sin(min(k * 2 * math.pi / self.compression, math.pi / 2)) + 1) / 2
+
+    def _compress(self):
+        """把缓冲区合并进质心，质心数不超过约 compression/2 个"""
+        if not self.buffer:
+            return
+        points = sorted(self.centroids + self.buffer)
+        self.buffer = []
+        total = sum(weight for _, weight in points)
+
+        merged = []
+        cumulative = 0.0
+        q_limit = self._q_limit(0.0)
+        mean, weight = points[0]
+        for point_mean, point_weight in points[1:]:
+            if (cumulative + weight + point_weight) / total <= q_limit:
+                weight += point_weight
+                mean += (point_mean - mean) * point_weight / weight
+            else:
+                merged.append((mean, weight))
+                cumulative += weight
+                q_limit = self._q_limit(min(cumulative / total, 1.0))
+                mean, weight = point_mean, point_weight
+        merged.append((mean, weight))
+        self.centroids = merged
+        self._index = None
+
+    def _build_index(self):
+        """各质心的均值和累计权重区间，用于二分查找"""
+        self._compress()
+        means = []
+        starts = []
+        cumulative = 0.0
+        for mean, weight in self.centroids:
+            means.append(mean)
+            starts.append(cumulative)
+            cumulative += weight
+        starts.append(cumulative)
+        self._index = (means, starts, cumulative)
+        return self._index
+
+    def cdf(self, value):
+        """不大于value的数据所占比例（相同的值取其区间中点），没有数据时返回0.5"""
+        means, starts, total = self._index or self._build_index()
+        if not means or total <= 0:
+            return 0.5
+        if value < self.min:
+            return 0.0
+        if value > self.max:
+            return 1.0
+        if self.min == self.max:
+            return 0.5
+
+        lo = bisect.bisect_left(means, value)
+        hi = bisect.bisect_right(means, value)
+        if hi > lo:
+            return (starts[lo] + starts[hi]) / 2 / total
+
+        # value 位于两个质心之间，在两者的中点累计权重之间线性插值
+        if lo == 0:
+            left_value, left_position = self.min, 0.0
+        else:
+            left_value, left_position = means[lo - 1], (starts[lo - 1] + starts[lo]) / 2
+        if lo == len(means):
+            right_value, right_position = self.max, total
+        else:
+            right_value, right_position = means[lo], (starts[lo] + starts[lo + 1]) / 2
+
+        if right_value <= left_value:
+            return right_position / total
+        ratio = (value - left_value) / (right_value - left_value)
+        return (left_position + ratio * (right_position - left_position)) / total
+
+    def to_dict(self):
+        self._compress()
+        return {
+            'centroids': [list(c) for c in self.centroids],
+            'min': self.min,
+            'max': self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data, compression=100):
+        return cls(compression, data.get('centroids'), data.get('min'), data.get('max'))
+
+
+def _hot(item):
+    hot = item.get('hot', 0)
+    return hot if isinstance(hot, (int, float)) else 0
+
+
+class HeatNormalizer:
+    """
+    按来源维护热度分布并计算 heat_score
+    指定 store 时草图保存在缓存中（键 heat_digest:<来源>），多个进程共用同一份分布
+    """
+
+    def __init__(self, store=None, compression=None, decay=None):
+        self.store = store
+        self.compression = compression or HEAT_SCORE_CONFIG['compression']
+        self.decay = HEAT_SCORE_CONFIG['decay'] if decay is None else decay
+        self.digests = {}
+
+    def _load(self, source):
+        if self.store is not None:
+            try:
+                data = self.store.get(f"heat_digest:{source}")
+                if data:
+                    return TDigest.from_dict(data, self.compression)
+            except Exception as e:
+                logger.error(f"加载来源 {source} 的热度分布失败: {e}")
+        return self.digests.get(source) or TDigest(self.compression)
+
+    def _save(self, source, digest):
+        self.digests[source] = digest
+        if self.store is not None:
+            try:
+                self.store.set(f"heat_digest:{source}", digest.to_dict())
+            except Exception as e:
+                logger.error(f"保存来源 {source} 的热度分布失败: {e}")
+
+    def update(self, items):
+        """用一批条目更新各来源的分布"""
+        groups = {}
+        for item in items:
+            groups.setdefault(item.get('source', ''), []).append(_hot(item))
+        for source, values in groups.items():
+            digest = self._load(source)
+            if self.decay < 1:
+                digest.decay(self.decay)
+            for value in values:
+                digest.add(value)
+            self._save(source, digest)
+
+    def score(self, source, hot):
+        """原始热度在该来源分布中的百分位（0~100）"""
+        digest = self.digests.get(source)
+        if digest is None:
+            digest = self.digests[source] = self._load(source)
+        return round(digest.cdf(hot) * 100, 2)
+
+    def annotate(self, items):
+        """更新分布后为每个条目加上 heat_score，返回按 heat_score 降序排列的新列表"""
+        self.update(items)
+        scored = [dict(item, heat_score=self.score(item.get('source', ''), _hot(item))) for item in items]
+        scored.sort(key=lambda item: item['heat_score'], reverse=True)
+        return scored
@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+热搜数据查询视图
+每份热搜数据只建一次索引：各类别按归一化热度 heat_score 降序排好（没有 heat_score 的数据按原始热度），
+另外保存一份按原始热度降序的键数组及其中每个条目在 heat_score 顺序中的位置。
+只按 min_score 过滤（或不过滤）时用二分查找得到边界后直接切片，开销只与返回的条目数有关。
+
+min_hot 与 heat_score 顺序无关，不能只靠切片完成：满足 min_hot 的条目数用二分查找得到，
+之后在两种做法中选开销小的一种——取出满足 min_hot 的条目按位置排序（与满足的条目数成正比），
+或沿 heat_score 顺序逐条过滤直到凑够一页（与跳过的条目数成正比）。
+因此 min_hot 的开销最坏与满足 min_score、min_hot 两者中较少一方的条目数成正比，而不是与返回的条目数成正比
+"""
+
+import json
+import base64
+import bisect
+from itertools import islice
+
+# 可以通过 fields 参数选择的字段
+FIELDS = ('title', 'url', 'hot', 'source', 'rank', 'heat_score')
+
+# 单页最多返回的条目数
+MAX_LIMIT = 500
+
+
+class QueryError(ValueError):
+    """查询参数不合法"""
+
+
+def encode_cursor(category, offset):
+    """生成分页游标（不透明字符串）"""
+    raw = json.dumps([category, offset], ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """解析分页游标，返回 (类别, 偏移量)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        category, offset = json.loads(raw.decode('utf-8'))
+        if not isinstance(category, str) or not isinstance(offset, int) or offset < 0:
+            raise ValueError
+        return category, offset
+    except (ValueError, TypeError, UnicodeDecodeError):
+        raise QueryError("cursor 无效")
+
+
+def _hot(item):
+    hot = item.get('hot', 0)
+    return hot if isinstance(hot, (int, float)) else 0
+
+
+def _score(item):
+    score = item.get('heat_score')
+    return score if isinstance(score, (int, float)) else -1
+
+
+def _rank(item):
+    """排序依据：先按 heat_score，相同（或都没有）时按原始热度"""
+    return _score(item), _hot(item)
+
+
+class HotDataIndex:
+    """热搜数据的查询索引，source 为建立索引时的原始数据"""
+
+    def __init__(self, hot_data):
+        self.source = hot_data
+        self.items = {}
+        # 各类别 heat_score 取负后的升序数组，用于二分查找 min_score 的边界
+        self.neg_score = {}
+        # 各类别热度取负后的升序数组（用于二分查找 min_hot 的边界），
+        # 以及按原始热度降序排列的条目在 heat_score 顺序中的位置
+        self.neg_hot = {}
+        self.hot_positions = {}
+        for category, items in hot_data.items():
+            ordered = sorted(items, key=_rank, reverse=True)
+            self.items[category] = ordered
+            self.neg_score[category] = [-_score(item) for item in ordered]
+            positions = sorted(range(len(ordered)), key=lambda i: _hot(ordered[i]), reverse=True)
+            self.hot_positions[category] = positions
+            self.neg_hot[category] = [-_hot(ordered[i]) for i in positions]
+
+    def _filter_hot(self, category, n_score, min_hot, offset, end):
+        """
+        heat_score 顺序前 n_score 条中热度不低于 min_hot 的条目
+
+        返回:
+            tuple: (条目总数, [offset, end) 范围内的条目)，end 为None时取到最后
+        """
+        items = self.items[category]
+        n_hot = bisect.bisect_right(self.neg_hot[category], -min_hot)
+        only_hot = n_score == len(items)
+        # 逐条过滤预计要检查的条目数：只按 min_hot 过滤时凑够一页即可停止，否则要遍历整个前缀才能得到总数
+        if only_hot and n_hot:
+            walk = (n_hot if end is None else min(end, n_hot)) * n_score / n_hot
+        else:
+            walk = n_score
+        if n_hot <= walk:
+            # 取出满足 min_hot 的条目，按 heat_score 顺序中的位置排序
+            positions = sorted(p for p in islice(self.hot_positions[category], n_hot) if p < n_score)
+            return len(positions), [items[p] for p in positions[offset:end]]
+        matched = (item for item in islice(items, n_score) if _hot(item) >= min_hot)
+        if only_hot:
+            return n_hot, list(islice(matched, offset, end))
+        matched = list(matched)
+        return len(matched), matched[offset:end]
+
+    def _query_category(self, category, offset, limit, fields, min_score, min_hot):
+        items = self.items[category]
+        n_score = len(items) if min_score is None else bisect.bisect_right(self.neg_score[category], -min_score)
+        if min_hot is None:
+            total = n_score
+            end = total if limit is None else min(offset + limit, total)
+            page = items[offset:end]
+        else:
+            total, page = self._filter_hot(category, n_score, min_hot, offset, None if limit is None else offset + limit)
+            end = total if limit is None else min(offset + limit, total)
+        if fields:
+            page = [{field: item.get(field) for field in fields} for item in page]
+        return {
+            'items': page,
+            'total': total,
+            'next_cursor': encode_cursor(category, end) if end < total else None,
+        }
+
+    def query(self, category=None, limit=None, cursor=None, fields=None, min_score=None, min_hot=None):
+        """
+        查询热搜数据
+
+        参数:
+            category (str): 只返回该类别，默认返回所有类别
+            limit (int): 每个类别最多返回的条目数
+            cursor (str): 上一页返回的 next_cursor，游标本身包含类别
+            fields (list): 只返回这些字段
+            min_score (float): 只返回 heat_score 不低于该值的条目
+            min_hot (float): 只返回原始热度不低于该值的条目
+
+        返回:
+            dict: {类别: {"items": [...], "total": 条目总数, "next_cursor": 下一页游标}}
+        """
+        if limit is not None and not 0 < limit <= MAX_LIMIT:
+            raise QueryError(f"limit 必须在 1 到 {MAX_LIMIT} 之间")
+        if fields:
+            unknown = [field for field in fields if field not in FIELDS]
+            if unknown:
+                raise QueryError(f"未知字段: {','.join(unknown)}")
+
+        offset = 0
+        if cursor:
+            cursor_category, offset = decode_cursor(cursor)
+            if category and category != cursor_category:
+                raise QueryError("cursor 与 category 不一致")
+            category = cursor_category
+
+        if category is not None:
+            if category not in self.items:
+                raise QueryError(f"未知类别: {category}")
+            categories = [category]
+        else:
+            categories = list(self.items)
+
+        return {
+            name: self._query_category(name, offset, limit, fields, min_score, min_hot)
+            for name in categories
+        }
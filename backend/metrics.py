@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+进程内指标模块
+提供计数器、仪表和直方图，并以Prometheus文本格式导出（/metrics）
+"""
+
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+
+# 默认的耗时分桶（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    """转义标签值中的反斜杠、引号和换行"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labelnames, values, extra=None):
+    """格式化标签为 {a="1",b="2"}"""
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    """格式化数值"""
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """指标基类"""
+
+    type_name = ''
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def clear(self):
+        """清空所有数据"""
+        with self.lock:
+            self.values.clear()
+
+    def _render_samples(self):
+        raise NotImplementedError
+
+    def render(self):
+        """导出为Prometheus文本格式"""
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.type_name}',
+        ]
+        lines.extend(self._render_samples())
+        return '\n'.join(lines)
+
+
+class Counter(_Metric):
+    """单调递增的计数器"""
+
+    type_name = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels):
+        return self.values.get(self._key(labels), 0)
+
+    def _render_samples(self):
+        with self.lock:
+            items = sorted(self.values.items())
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}' for key, value in items]
+
+
+class Gauge(_Metric):
+    """可增可减的仪表"""
+
+    type_name = 'gauge'
+
+    def set(self, value, **labels):
+        with self.lock:
+            self.values[self._key(labels)] = value
+
+    def get(self, **labels):
+        return self.values.get(self._key(labels), 0)
+
+    def _render_samples(self):
+        with self.lock:
+            items = sorted(self.values.items())
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}' for key, value in items]
+
+
+class Histogram(_Metric):
+    """固定分桶的直方图，记录分布、总和与次数"""
+
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            entry = self.values.get(key)
+            if entry is None:
+                # [各分桶计数(最后一个为+Inf), 总和, 次数]
+                entry = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self.values[key] = entry
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """记录代码块耗时"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self, **labels):
+        """返回 (分桶计数, 总和, 次数) 的副本"""
+        with self.lock:
+            entry = self.values.get(self._key(labels))
+            if entry is None:
+                return [0] * (len(self.buckets) + 1), 0.0, 0
+            return list(entry[0]), entry[1], entry[2]
+
+    def _render_samples(self):
+        with self.lock:
+            items = sorted((key, (list(entry[0]), entry[1], entry[2])) for key, entry in self.values.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, ('le', _format_value(bound)))
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+class MetricsRegistry:
+    """指标注册表"""
+
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def register(self, metric):
+        with self.lock:
+            existing = self.metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self.metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        """导出所有指标"""
+        with self.lock:
+            metrics = list(self.metrics.values())
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+
+# 全局注册表
+registry = MetricsRegistry()
+
+# Prometheus文本格式的Content-Type
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# HTTP抓取
+HTTP_FETCH_SECONDS = registry.histogram(
+    'scraper_http_request_seconds', '抓取请求耗时（秒）', ('host', 'status'))
+HTTP_FETCH_BYTES = registry.counter(
+    'scraper_http_response_bytes_total', '抓取下载的字节数', ('host',))
+
+# 数据源
+SOURCE_FETCH_SECONDS = registry.histogram(
+    'scraper_fetch_seconds', '数据源单次刷新耗时（秒）', ('source',))
+PARSE_SECONDS = registry.histogram(
+    'scraper_parse_seconds', '页面/接口数据解析耗时（秒）', ('source',))
+ITEMS_PARSED = registry.counter(
+    'scraper_items_parsed_total', '解析出的条目数', ('source',))
+
+# 爬虫管理器缓存（result: hit=缓存有效, miss=需要抓取, stale=抓取失败回退到旧缓存）
+CACHE_REQUESTS = registry.counter(
+    'scraper_cache_requests_total', '类别数据的缓存命中情况', ('category', 'result'))
+
+# 刷新调度（到期类别按该值从高到低刷新）
+REFRESH_PRIORITY = registry.gauge(
+    'scraper_refresh_priority', '类别的刷新优先级', ('category',))
+REFRESH_INTERVAL = registry.gauge(
+    'scraper_refresh_interval_seconds', '数据源当前的刷新间隔（秒），开启自适应刷新间隔时按变化速度调整', ('source',))
+
+# 对冲请求（reason: delay=主请求超过等待时间, insufficient=主请求失败或条目不足）
+HEDGED_REQUESTS = registry.counter(
+    'scraper_hedged_requests_total', '发出的对冲请求次数', ('source', 'endpoint', 'reason'))
+
+# 数据源熔断（state: 0=closed, 1=half_open, 2=open）
+CIRCUIT_STATE = registry.gauge(
+    'scraper_circuit_state', '数据源熔断器状态（0=关闭, 1=半开, 2=打开）', ('source',))
+CIRCUIT_REJECTED = registry.counter(
+    'scraper_circuit_rejected_total', '熔断期间被直接跳过的抓取次数', ('source',))
+
+# 大模型调用
+LLM_REQUEST_SECONDS = registry.histogram(
+    'llm_request_seconds', '大模型接口调用耗时（秒）', ('model', 'status'),
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0))
+
+# Web接口
+API_REQUEST_SECONDS = registry.histogram(
+    'api_request_seconds', 'API请求处理耗时（秒）', ('route', 'method', 'status'))
+
+
+def render():
+    """以Prometheus文本格式导出所有指标"""
+    return registry.render()
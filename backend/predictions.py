@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+热点预测
+每个类别记录生成预测时输入数据（标题和链接的集合，与顺序无关）的哈希；
+重新生成时只计算输入发生变化的类别（使用大模型时也只为这些类别调用接口），
+其余类别沿用上次的结果
+"""
+
+import os
+import json
+import random
+import hashlib
+import logging
+from datetime import datetime
+
+from backend.config.data_sources import PREDICTION_CONFIG
+
+logger = logging.getLogger('predictions')
+
+
+def get_strategy():
+    """当前使用的预测策略名称"""
+    return os.environ.get('PREDICTION_STRATEGY') or PREDICTION_CONFIG['strategy']
+
+
+def input_hash(category, items, strategy):
+    """
+    类别输入数据的哈希，只包含去重排序后的标题和链接：热度每次抓取都会变化，
+    类别内按 heat_score 排列的顺序也随之变化，都不影响预测输入
+    """
+    pairs = sorted({(item.get('title', ''), item.get('url', '')) for item in items})
+    payload = [strategy, category, [list(pair) for pair in pairs]]
+    raw = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return hashlib.sha1(raw).hexdigest()
+
+
+def sample_predictions(category, index, items):
+    """从类别的热搜中随机选取若干条作为预测"""
+    predictions = []
+    selected_items = random.sample(items, min(PREDICTION_CONFIG['items_per_category'], len(items)))
+    for j, item in enumerate(selected_items):
+        title = item.get("title", "")
+        url = item.get("url", "")
+        hot = item.get("hot", 0)
+        source = item.get("source", "未知")
+
+        predictions.append({
+            "category": category,
+            "topic": f"话题{index+1}-{j+1}",
+            "title": title,
+            "reason": f"该话题在{source}平台热度达到{hot}，是{category}领域的热点内容",
+            "urls": [url] if url else [],
+            "titles": [
+                f"{title} - 明天会更火爆",
+                f"{title} - 持续发酵中",
+                f"{title} - 热度不减"
+            ]
+        })
+    return predictions
+
+
+def deepseek_predictions(category, index, items):
+    """调用DeepSeek接口预测类别的热点话题"""
+    from backend.api.deepseek_api import predict_hot_topics
+
+    predictions = []
+    for j, topic in enumerate(predict_hot_topics({category: items})):
+        predictions.append({
+            "category": category,
+            "topic": f"话题{index+1}-{j+1}",
+            "title": topic.get("topic", ""),
+            "reason": topic.get("reason", ""),
+            "urls": [],
+            "titles": topic.get("titles", []),
+        })
+    return predictions
+
+
+STRATEGIES = {
+    'sample': sample_predictions,
+    'deepseek': deepseek_predictions,
+}
+
+
+def refresh_predictions(hot_data, predictions, inputs, strategy=None, force=False):
+    """
+    按类别增量生成预测
+
+    参数:
+        hot_data (dict): {类别: 条目列表}
+        predictions (list): 上次的预测列表
+        inputs (dict): 上次各类别的输入 {类别: {"input_hash": ..., "generated_at": ...}}
+        strategy (str): 预测策略，默认使用 get_strategy()
+        force (bool): 忽略哈希，重新计算所有类别
+
+    返回:
+        tuple: (新的预测列表, 新的 inputs, 重新计算的类别列表)
+    """
+    strategy = strategy or get_strategy()
+    predict = STRATEGIES.get(strategy)
+    if predict is None:
+        raise ValueError(f"未知的预测策略: {strategy}")
+
+    previous = {}
+    for prediction in predictions:
+        previous.setdefault(prediction.get("category"), []).append(prediction)
+
+    grouped = {}
+    new_inputs = {}
+    changed = []
+    for index, (category, items) in enumerate(hot_data.items()):
+        digest = input_hash(category, items, strategy) if items else None
+        known = inputs.get(category, {})
+        if digest is None or (not force and known.get("input_hash") == digest and category in previous):
+            # 输入没有变化，或本次没有数据，沿用上次的预测
+            if category in previous:
+                grouped[category] = previous[category]
+                if known:
+                    new_inputs[category] = known
+            continue
+
+        try:
+            result = predict(category, index, items)
+        except Exception as e:
+            logger.error(f"生成类别 {category} 的预测失败: {e}")
+            result = []
+        if not result:
+            # 生成失败时保留上次的预测，下次再重试
+            if category in previous:
+                grouped[category] = previous[category]
+            continue
+
+        grouped[category] = result
+        new_inputs[category] = {
+            "input_hash": digest,
+            "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        changed.append(category)
+
+    # 输入中没有出现的类别沿用上次的预测
+    for category, items in previous.items():
+        if category not in grouped:
+            grouped[category] = items
+            if category in inputs:
+                new_inputs[category] = inputs[category]
+
+    return [prediction for items in grouped.values() for prediction in items], new_inputs, changed
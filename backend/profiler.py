@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+运行时采样分析器
+后台线程定期读取所有线程（爬虫线程、Flask工作线程等）的调用栈，在限定时长后
+以折叠栈格式（flamegraph.pl / speedscope 可直接读取）写入 temp/profiles/
+
+开启方式:
+- POST /admin/profile?seconds=30
+- kill -USR2 <pid>（使用默认时长）
+"""
+
+import os
+import re
+import sys
+import time
+import signal
+import logging
+import threading
+from collections import Counter
+from datetime import datetime
+
+from backend.config.data_sources import PROFILER_CONFIG
+
+logger = logging.getLogger('profiler')
+
+# 去掉线程名中的序号，让同类线程合并，例如 "Thread-12 (process_request_thread)"
+_THREAD_NUMBER = re.compile(r'-\d+')
+
+
+def _frame_label(frame):
+    """栈帧的显示名称: 函数名 (文件名:函数起始行)"""
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def collapse_stack(frame, thread_name):
+    """将线程调用栈转换为折叠格式: 线程;外层函数;...;内层函数"""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.append(_THREAD_NUMBER.sub('', thread_name))
+    labels.reverse()
+    return ';'.join(labels)
+
+
+class SamplingProfiler:
+    """栈采样分析器，同一时间只运行一次采样"""
+
+    def __init__(self, config=None):
+        self.config = config or PROFILER_CONFIG
+        self.lock = threading.Lock()
+        self.thread = None
+        self.started_at = None
+        self.duration = None
+        self.last_output = None
+        self.last_samples = 0
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, duration=None, interval=None):
+        """
+        开始采样
+
+        参数:
+            duration (float): 采样时长（秒），不超过配置的最长时长
+            interval (float): 采样间隔（秒）
+
+        返回:
+            bool: 是否成功开始，已有采样在进行时返回False
+        """
+        duration = min(float(duration or self.config['default_duration']), self.config['max_duration'])
+        interval = float(interval or self.config['interval'])
+
+        with self.lock:
+            if self.running:
+                return False
+            self.started_at = datetime.now()
+            self.duration = duration
+            self.thread = threading.Thread(
+                target=self._run,
+                args=(duration, interval),
+                name='sampling-profiler',
+                daemon=True
+            )
+            self.thread.start()
+
+        logger.info(f"开始采样分析，时长 {duration} 秒，间隔 {interval * 1000:.1f} 毫秒")
+        return True
+
+    def _sample(self, stacks, own_ident, names):
+        """采集一次所有线程的调用栈"""
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            stacks[collapse_stack(frame, names.get(ident, f'thread-{ident}'))] += 1
+
+    def _run(self, duration, interval):
+        stacks = Counter()
+        own_ident = threading.get_ident()
+        deadline = time.monotonic() + duration
+        samples = 0
+
+        try:
+            while time.monotonic() < deadline:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                self._sample(stacks, own_ident, names)
+                samples += 1
+                time.sleep(interval)
+
+            self.last_output = self._write(stacks)
+            self.last_samples = samples
+            logger.info(f"采样分析完成，共 {samples} 次采样，结果已写入: {self.last_output}")
+        except Exception as e:
+            logger.error(f"采样分析异常: {e}")
+
+    def _write(self, stacks):
+        """将折叠栈写入输出目录，返回文件路径"""
+        output_dir = self.config['output_dir']
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, f"profile-{self.started_at.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.collapsed")
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+    def status(self):
+        """当前采样状态"""
+        return {
+            'running': self.running,
+            'started_at': self.started_at.strftime('%Y-%m-%d %H:%M:%S') if self.started_at else None,
+            'duration': self.duration,
+            'last_output': self.last_output,
+            'last_samples': self.last_samples,
+        }
+
+
+# 全局共享的分析器
+profiler = SamplingProfiler()
+
+
+def install_signal_handler(signum=None):
+    """
+    注册信号处理器，收到信号（默认SIGUSR2）时按默认时长开始采样
+    只能在主线程调用，不支持该信号的平台直接返回False
+    """
+    signum = signum or getattr(signal, 'SIGUSR2', None)
+    if signum is None or threading.current_thread() is not threading.main_thread():
+        return False
+
+    def handler(signum, frame):
+        # 信号处理器中只启动采样线程，不做耗时操作
+        profiler.start()
+
+    signal.signal(signum, handler)
+    return True
@@ -0,0 +1,293 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+排名历史
+名次按来源（条目的 source 字段，即原始榜单）分别记录，使用爬虫在排序合并之前写入的原始名次 rank，
+而不是类别列表按热度重新排序后的位置。
+
+每次抓取后与该来源上一次的排名做O(n)比较（按规范化后的链接建哈希表），只记录变化：
+新上榜(entered)、下榜(exited)和名次变化(moved)，存储量随变化增长而不随抓取次数增长。
+每个条目在内存中保留最近的名次变化点，"上升最快"查询只需遍历当前榜单。
+类别只保留条目数上限内的条目，来源中未进入类别列表的条目视为下榜
+
+变化记录按来源追加写入 temp/rank_history/<来源>.jsonl，其他进程读取时从上次读到的位置继续；
+每个来源只属于一个类别，写入由爬虫管理器的类别刷新锁保证同一时间只有一个进程
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from collections import deque
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode, quote, unquote
+
+from backend.config.data_sources import RANK_HISTORY_CONFIG
+
+logger = logging.getLogger('rank_history')
+
+
+def normalize_url(url):
+    """规范化链接：协议和域名小写，去掉片段、跟踪参数和末尾的斜杠，查询参数排序"""
+    if not url:
+        return ''
+    parts = urlsplit(url.strip())
+    ignored = RANK_HISTORY_CONFIG['ignored_query_params']
+    query = sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name not in ignored and not name.startswith('utm_')
+    )
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ''))
+
+
+def item_key(item):
+    """条目的唯一键，没有链接时使用标题"""
+    return normalize_url(item.get('url', '')) or f"title:{item.get('title', '')}"
+
+
+class SourceHistory:
+    """单个来源的排名历史"""
+
+    def __init__(self, path, max_points, retention):
+        self.path = path
+        self.max_points = max_points
+        self.retention = retention
+        self.offset = 0
+        # 来源所属的类别，来自变化记录
+        self.category = None
+        # 当前榜单 {键: 名次}
+        self.ranks = {}
+        # 条目信息 {键: {"title": ..., "url": ...}}
+        self.meta = {}
+        # 名次变化点 {键: deque[(时间, 名次或None)]}，None 表示下榜
+        self.points = {}
+
+    def _reset(self):
+        self.offset = 0
+        self.category = None
+        self.ranks = {}
+        self.meta = {}
+        self.points = {}
+
+    def _add_point(self, key, ts, rank):
+        points = self.points.get(key)
+        if points is None:
+            points = self.points[key] = deque(maxlen=self.max_points)
+        points.append((ts, rank))
+
+    def apply(self, record):
+        """应用一条变化记录"""
+        ts = record['ts']
+        self.category = record.get('category', self.category)
+        for key, rank, title, url in record.get('entered', []):
+            self.ranks[key] = rank
+            self.meta[key] = {'title': title, 'url': url}
+            self._add_point(key, ts, rank)
+        for key in record.get('exited', []):
+            self.ranks.pop(key, None)
+            self._add_point(key, ts, None)
+        for key, _, rank in record.get('moved', []):
+            self.ranks[key] = rank
+            self._add_point(key, ts, rank)
+
+    def catch_up(self):
+        """读取其他进程追加的记录；文件被压缩（变短）后从头重放"""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            if self.offset:
+                self._reset()
+            return
+        if size < self.offset:
+            self._reset()
+        if size == self.offset:
+            return
+
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    # 其他进程正在写入的半行，下次再读
+                    break
+                self.offset += len(line)
+                try:
+                    self.apply(json.loads(line))
+                except ValueError as e:
+                    logger.error(f"排名历史记录损坏，已跳过: {e}")
+
+    def diff(self, items, ts, category=None):
+        """与当前榜单比较，返回变化记录，没有变化时返回None；条目没有原始名次 rank 时按列表顺序"""
+        current = {}
+        for item in items:
+            key = item_key(item)
+            if key not in current:
+                rank = item.get('rank')
+                current[key] = (rank if isinstance(rank, int) else len(current) + 1, item)
+
+        entered = []
+        moved = []
+        for key, (rank, item) in current.items():
+            previous = self.ranks.get(key)
+            if previous is None:
+                entered.append([key, rank, item.get('title', ''), item.get('url', '')])
+            elif previous != rank:
+                moved.append([key, previous, rank])
+        exited = [key for key in self.ranks if key not in current]
+
+        if not (entered or exited or moved) and category == self.category:
+            return None
+        return {'ts': ts, 'category': category, 'entered': entered, 'exited': exited, 'moved': moved}
+
+    def _append(self, record):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+        with open(self.path, 'ab') as f:
+            f.write(line)
+        self.offset += len(line)
+
+    def _compact(self, ts):
+        """记录文件过大时改写为当前榜单的一条记录，丢弃保留期之前的变化"""
+        ranked = sorted(self.ranks.items(), key=lambda entry: entry[1])
+        record = {
+            'ts': ts,
+            'category': self.category,
+            'entered': [[key, rank, self.meta[key]['title'], self.meta[key]['url']] for key, rank in ranked],
+        }
+        tmp_file = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        os.replace(tmp_file, self.path)
+        self._reset()
+        self.catch_up()
+        logger.info(f"已压缩排名历史: {self.path}")
+
+    def _prune(self, now):
+        """清理下榜超过保留期的条目"""
+        expired = [
+            key for key, points in self.points.items()
+            if key not in self.ranks and points[-1][0] < now - self.retention
+        ]
+        for key in expired:
+            del self.points[key]
+            self.meta.pop(key, None)
+
+    def record(self, items, ts, category=None):
+        """记录一次抓取结果，返回变化记录"""
+        self.catch_up()
+        record = self.diff(items, ts, category)
+        if record is None:
+            return None
+        self._append(record)
+        self.apply(record)
+        self._prune(ts)
+        if self.offset > RANK_HISTORY_CONFIG['max_file_bytes']:
+            self._compact(ts)
+        return record
+
+    def _rank_at(self, key, ts):
+        """条目在某一时刻的名次，不在榜上时返回None"""
+        points = self.points.get(key)
+        if not points:
+            return None
+        rank = None
+        for point_ts, point_rank in points:
+            if point_ts > ts:
+                break
+            rank = point_rank
+        return rank
+
+    def rising(self, window, limit, now):
+        """window秒内名次上升最多的条目，新上榜的条目视为从榜单之外（当前最低名次+1）上升"""
+        since = now - window
+        outside = max(self.ranks.values(), default=0) + 1
+        results = []
+        for key, rank in self.ranks.items():
+            previous = self._rank_at(key, since)
+            delta = (previous or outside) - rank
+            if delta > 0:
+                results.append(dict(
+                    self.meta.get(key, {}),
+                    rank=rank,
+                    previous_rank=previous,
+                    rank_delta=delta,
+                    entered=previous is None,
+                ))
+        results.sort(key=lambda entry: (-entry['rank_delta'], entry['rank']))
+        return results[:limit]
+
+    def trajectory(self, key):
+        """条目最近的名次变化点 [(时间, 名次或None)]"""
+        return list(self.points.get(key, []))
+
+
+class RankHistory:
+    """所有来源的排名历史"""
+
+    def __init__(self, path=None):
+        self.path = str(path or RANK_HISTORY_CONFIG['path'])
+        self.histories = {}
+        self.lock = threading.Lock()
+
+    def _history(self, source):
+        history = self.histories.get(source)
+        if history is None:
+            history = SourceHistory(
+                os.path.join(self.path, f"{quote(source, safe='')}.jsonl"),
+                RANK_HISTORY_CONFIG['max_points'],
+                RANK_HISTORY_CONFIG['retention'],
+            )
+            self.histories[source] = history
+        return history
+
+    def record(self, source, items, ts=None, category=None):
+        """记录来源的一次抓取结果，名次取条目的原始名次 rank"""
+        with self.lock:
+            return self._history(source).record(items, ts or time.time(), category)
+
+    def sources(self, category=None):
+        """有排名历史的来源（包括其他进程写入的），指定类别时只返回属于该类别的来源"""
+        try:
+            names = [unquote(name[:-len('.jsonl')]) for name in os.listdir(self.path) if name.endswith('.jsonl')]
+        except OSError:
+            names = []
+        with self.lock:
+            names = sorted(set(names) | set(self.histories))
+            if category is None:
+                return names
+            result = []
+            for name in names:
+                history = self._history(name)
+                history.catch_up()
+                if history.category == category:
+                    result.append(name)
+            return result
+
+    def rising(self, source, window=3600, limit=10, now=None):
+        """来源中window秒内名次上升最多的条目"""
+        with self.lock:
+            history = self._history(source)
+            history.catch_up()
+            return history.rising(window, limit, now or time.time())
+
+    def trajectory(self, source, url):
+        """条目的名次变化轨迹"""
+        with self.lock:
+            history = self._history(source)
+            history.catch_up()
+            return history.trajectory(item_key({'url': url}))
+
+
+_rank_history = None
+_rank_history_lock = threading.Lock()
+
+
+def get_rank_history():
+    """获取排名历史单例"""
+    global _rank_history
+    if _rank_history is None:
+        with _rank_history_lock:
+            if _rank_history is None:
+                _rank_history = RankHistory()
+    return _rank_history
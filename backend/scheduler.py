@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+刷新调度
+到期的类别不再同等对待：按超期程度（相对于新鲜度目标）、请求量和上次刷新时的变化率计算优先级，
+抓取能力有限时（抓取进程每轮最多刷新若干个类别）先刷新优先级高的类别，其余留到下一轮。
+
+请求量由Web进程在进程内累加，定期并入共享缓存中按半衰期衰减的计数；
+变化率由爬虫管理器在每次刷新后更新，多个进程看到的是同一份统计。
+
+开启自适应刷新间隔时，每次刷新按新出现的条目占比和距上次抓取的时间估计数据源的变化速度，
+把刷新间隔调整为"每次刷新约有 target_change 的条目是新的"所需的时间（单次最多调整 max_interval_step 倍，
+并限制在数据源的 update_interval_bounds 内）：榜单几乎不动时减少请求，变化快时缩短间隔
+"""
+
+import math
+import time
+import logging
+import threading
+
+from backend.config.data_sources import DATA_SOURCE_MAPPING, SCHEDULER_CONFIG
+from backend.rank_history import item_key
+from backend.metrics import REFRESH_PRIORITY, REFRESH_INTERVAL
+
+logger = logging.getLogger('scheduler')
+
+
+def _decayed(entry, now):
+    """按半衰期衰减后的请求计数"""
+    if not entry:
+        return 0.0
+    elapsed = max(now - entry.get('at', now), 0.0)
+    return entry.get('count', 0.0) * 0.5 ** (elapsed / SCHEDULER_CONFIG['traffic_half_life'])
+
+
+def _bounds(config):
+    return config.get('update_interval_bounds') or (config['update_interval'], config['update_interval'])
+
+
+def source_interval(store, source, config):
+    """数据源当前的刷新间隔（秒）：开启自适应刷新间隔时为学到的间隔（限制在范围内），否则为 update_interval"""
+    if not SCHEDULER_CONFIG['adaptive_interval']:
+        return config['update_interval']
+    try:
+        learned = store.get(f"interval:{source}")
+    except Exception as e:
+        logger.error(f"读取刷新间隔失败: {e}")
+        learned = None
+    if learned is None:
+        return config['update_interval']
+    lower, upper = _bounds(config)
+    return min(max(learned, lower), upper)
+
+
+class TrafficCounter:
+    """按类别统计请求量：进程内累加，每隔 traffic_flush_interval 秒并入共享缓存"""
+
+    def __init__(self, store):
+        self.store = store
+        self.pending = {}
+        self.flushed_at = time.monotonic()
+        self.mutex = threading.Lock()
+
+    def hit(self, categories):
+        """记录一次请求涉及的类别"""
+        with self.mutex:
+            for category in categories:
+                self.pending[category] = self.pending.get(category, 0) + 1
+            due = time.monotonic() - self.flushed_at >= SCHEDULER_CONFIG['traffic_flush_interval']
+        if due:
+            self.flush()
+
+    def flush(self):
+        """把累计的请求数写入共享缓存；其他进程正在写入时留到下次"""
+        with self.mutex:
+            pending, self.pending = self.pending, {}
+            self.flushed_at = time.monotonic()
+        if not pending:
+            return
+        lock = self.store.lock("traffic", timeout=5)
+        if not lock.acquire(blocking=False):
+            self._restore(pending)
+            return
+        try:
+            now = time.time()
+            for category, count in pending.items():
+                entry = self.store.get(f"traffic:{category}")
+                self.store.set(f"traffic:{category}", {'count': _decayed(entry, now) + count, 'at': now})
+        except Exception as e:
+            logger.error(f"写入请求计数失败: {e}")
+        finally:
+            lock.release()
+
+    def _restore(self, pending):
+        with self.mutex:
+            for category, count in pending.items():
+                self.pending[category] = self.pending.get(category, 0) + count
+
+
+class RefreshScheduler:
+    """按优先级安排各类别的刷新"""
+
+    def __init__(self, store, last_update, mapping=DATA_SOURCE_MAPPING):
+        """
+        参数:
+            store: 缓存驱动，保存请求计数和变化率
+            last_update: 返回类别上次抓取时间的函数
+            mapping: 数据源映射，提供各类别的 update_interval
+        """
+        self.store = store
+        self.last_update = last_update
+        self.mapping = mapping
+
+    def interval(self, category):
+        """类别的刷新间隔（秒），到了该时间才会刷新"""
+        return source_interval(self.store, self.mapping[category]['source'], self.mapping[category]['config'])
+
+    def sla(self, category):
+        """类别的新鲜度目标（秒）"""
+        return SCHEDULER_CONFIG['freshness_sla'].get(category) or self.mapping[category]['config']['update_interval']
+
+    def traffic(self, category, now=None):
+        """类别衰减后的请求计数"""
+        try:
+            return _decayed(self.store.get(f"traffic:{category}"), now or time.time())
+        except Exception as e:
+            logger.error(f"读取请求计数失败: {e}")
+            return 0.0
+
+    def volatility(self, category):
+        """类别平滑后的变化率（0~1）"""
+        try:
+            return self.store.get(f"volatility:{category}", 0.0)
+        except Exception as e:
+            logger.error(f"读取变化率失败: {e}")
+            return 0.0
+
+    def observe(self, category, previous, current, now=None):
+        """
+        记录一次刷新的变化率（新数据中上次没有出现的条目占比），并调整数据源的刷新间隔；
+        没有上次的数据时不记录。需要在更新类别的抓取时间之前调用
+        """
+        if not current or not previous:
+            return
+        known = {item_key(item) for item in previous}
+        changed = sum(1 for item in current if item_key(item) not in known) / len(current)
+        alpha = SCHEDULER_CONFIG['volatility_smoothing']
+        try:
+            self.store.set(f"volatility:{category}", alpha * changed + (1 - alpha) * self.volatility(category))
+        except Exception as e:
+            logger.error(f"保存变化率失败: {e}")
+        if SCHEDULER_CONFIG['adaptive_interval']:
+            self._adapt_interval(category, changed, (now or time.time()) - self.last_update(category))
+
+    def _adapt_interval(self, category, changed, elapsed):
+        """按本次刷新观察到的变化速度调整数据源的刷新间隔"""
+        if elapsed <= 0 or elapsed > 30 * 24 * 3600:
+            # 没有上次抓取时间（或时钟异常）时无法估计变化速度
+            return
+        source = self.mapping[category]['source']
+        config = self.mapping[category]['config']
+        current = self.interval(category)
+        step = SCHEDULER_CONFIG['max_interval_step']
+        if changed > 0:
+            # 按变化速度（新条目占比/秒）估计达到目标占比需要的时间
+            desired = SCHEDULER_CONFIG['target_change'] * elapsed / changed
+        elif elapsed >= current:
+            # 整个间隔内没有新条目
+            desired = current * step
+        else:
+            # 提前强制刷新且没有变化，不足以说明变化变慢
+            return
+        lower, upper = _bounds(config)
+        interval = min(max(desired, current / step, lower), current * step, upper)
+        try:
+            self.store.set(f"interval:{source}", interval)
+        except Exception as e:
+            logger.error(f"保存刷新间隔失败: {e}")
+            return
+        REFRESH_INTERVAL.set(interval, source=source)
+        if abs(interval - current) >= 1:
+            logger.info(f"数据源 {source} 本次新条目占比 {changed:.0%}，刷新间隔 {current:.0f}秒 -> {interval:.0f}秒")
+
+    def priority(self, category, now=None):
+        """
+        计算类别的刷新优先级
+
+        返回:
+            dict: {"category", "due", "overdue", "traffic", "volatility", "priority"}
+        """
+        now = now or time.time()
+        elapsed = now - self.last_update(category)
+        traffic = self.traffic(category, now)
+        volatility = self.volatility(category)
+        overdue = elapsed / self.sla(category)
+        priority = overdue \
+            * (1 + SCHEDULER_CONFIG['traffic_weight'] * math.log1p(traffic)) \
+            * (1 + SCHEDULER_CONFIG['volatility_weight'] * volatility)
+        REFRESH_PRIORITY.set(priority, category=category)
+        return {
+            'category': category,
+            'due': elapsed > self.interval(category),
+            'overdue': round(overdue, 3),
+            'traffic': round(traffic, 2),
+            'volatility': round(volatility, 3),
+            'priority': round(priority, 3),
+        }
+
+    def plan(self, now=None):
+        """所有类别的优先级，到期的类别在前，各自按优先级降序排列"""
+        now = now or time.time()
+        entries = [self.priority(category, now) for category in self.mapping]
+        entries.sort(key=lambda entry: (entry['due'], entry['priority']), reverse=True)
+        return entries
@@ -3,8 +3,22 @@
 
 """
 爬虫模块初始化文件
-提供对外统一接口
+提供对外统一接口，爬虫类在首次访问时才会导入
 """
 
-from .maimai_scraper import MaimaiScraper
-from .sspai_scraper import SSPAIScraper 
\ No newline at end of file
+from .registry import get_scraper, registry
+
+_LAZY_CLASSES = {
+    'MaimaiScraper': '.maimai_scraper',
+    'SSPAIScraper': '.sspai_scraper',
+    'TopHubScraper': '.tophub_scraper',
+}
+
+
+def __getattr__(name):
+    """按需导入爬虫类，避免导入包时加载所有爬虫依赖"""
+    if name in _LAZY_CLASSES:
+        import importlib
+        module = importlib.import_module(_LAZY_CLASSES[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+数据源熔断模块
+数据源连续失败达到阈值后熔断，熔断期间不再发起抓取，由爬虫管理器直接返回缓存数据；
+等待恢复时间后放行一次试探请求（半开），成功则恢复，失败则继续熔断并延长等待时间。
+爬虫管理器在恢复时间到达后主动刷新该数据源的类别作为试探，不受刷新调度的名额限制
+"""
+
+import time
+import logging
+import threading
+
+from backend.config.data_sources import CIRCUIT_BREAKER_CONFIG
+from backend.metrics import CIRCUIT_STATE, CIRCUIT_REJECTED
+
+logger = logging.getLogger('circuit_breaker')
+
+CLOSED = 'closed'
+HALF_OPEN = 'half_open'
+OPEN = 'open'
+
+# 指标中的状态编号
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class SourceUnavailable(Exception):
+    """数据源没有返回任何有效数据，fallback 为可以展示的备用数据"""
+
+    def __init__(self, message, fallback=None):
+        super().__init__(message)
+        self.fallback = fallback or []
+
+
+class CircuitBreaker:
+    """单个数据源的熔断器"""
+
+    def __init__(self, name, failure_threshold=3, recovery_timeout=300, max_recovery_timeout=3600):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_recovery_timeout = recovery_timeout
+        self.max_recovery_timeout = max_recovery_timeout
+        self.recovery_timeout = recovery_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.lock = threading.Lock()
+        CIRCUIT_STATE.set(STATE_VALUES[CLOSED], source=name)
+
+    def _set_state(self, state):
+        if state != self.state:
+            logger.warning(f"数据源 {self.name} 熔断器状态: {self.state} -> {state}")
+        self.state = state
+        CIRCUIT_STATE.set(STATE_VALUES[state], source=self.name)
+
+    def retry_in(self):
+        """距离下一次试探的剩余时间（秒），未熔断时为0"""
+        if self.state != OPEN:
+            return 0
+        return max(self.opened_at + self.recovery_timeout - time.monotonic(), 0)
+
+    def probe_due(self):
+        """已熔断且到了试探时间"""
+        return self.state == OPEN and self.retry_in() <= 0
+
+    def allow_request(self):
+        """是否允许发起抓取，半开状态下同一时间只放行一个试探请求"""
+        with self.lock:
+            if self.state == OPEN and self.retry_in() <= 0:
+                self._set_state(HALF_OPEN)
+            if self.state == HALF_OPEN:
+                if self.probing:
+                    allowed = False
+                else:
+                    self.probing = True
+                    allowed = True
+            else:
+                allowed = self.state == CLOSED
+
+        if not allowed:
+            CIRCUIT_REJECTED.inc(source=self.name)
+        return allowed
+
+    def record_success(self):
+        """抓取成功，恢复为关闭状态"""
+        with self.lock:
+            self.failures = 0
+            self.probing = False
+            self.recovery_timeout = self.base_recovery_timeout
+            self._set_state(CLOSED)
+
+    def record_failure(self):
+        """抓取失败，达到阈值或试探失败时熔断"""
+        with self.lock:
+            self.failures += 1
+            if self.state == HALF_OPEN:
+                # 试探失败，等待时间翻倍
+                self.probing = False
+                self.recovery_timeout = min(self.recovery_timeout * 2, self.max_recovery_timeout)
+            elif self.failures < self.failure_threshold:
+                return
+            self.opened_at = time.monotonic()
+            self._set_state(OPEN)
+
+    def status(self):
+        """当前状态"""
+        return {
+            'state': self.state,
+            'failures': self.failures,
+            'retry_in': round(self.retry_in(), 1),
+        }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(source_name):
+    """获取（或创建）数据源对应的熔断器"""
+    with _breakers_lock:
+        breaker = _breakers.get(source_name)
+        if breaker is None:
+            policy = dict(CIRCUIT_BREAKER_CONFIG['default'])
+            policy.update(CIRCUIT_BREAKER_CONFIG['sources'].get(source_name, {}))
+            breaker = CircuitBreaker(source_name, **policy)
+            _breakers[source_name] = breaker
+        return breaker
+
+
+def breaker_status():
+    """所有已创建的熔断器的状态"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.status() for breaker in breakers}
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+关键词分类器
+把各分类的关键词编译成一个 Aho-Corasick 自动机（预先展开失配跳转，每个字符只查一次表），
+扫描一遍文本即可得到命中的所有分类；匹配规则与 `keyword.lower() in text.lower()` 相同
+"""
+
+import functools
+
+
+class KeywordClassifier:
+    """多分类关键词匹配"""
+
+    def __init__(self, keyword_sets):
+        """
+        参数:
+            keyword_sets (dict): {分类: [关键词, ...]}，返回结果按该顺序排列
+        """
+        self.categories = list(keyword_sets)
+        self._full_mask = (1 << len(self.categories)) - 1
+
+        # 字典树：每个状态的转移表和命中的分类掩码
+        goto = [{}]
+        output = [0]
+        for bit, keywords in enumerate(keyword_sets.values()):
+            for keyword in keywords:
+                keyword = keyword.lower()
+                if not keyword:
+                    continue
+                state = 0
+                for ch in keyword:
+                    if ch not in goto[state]:
+                        goto.append({})
+                        output.append(0)
+                        goto[state][ch] = len(goto) - 1
+                    state = goto[state][ch]
+                output[state] |= 1 << bit
+
+        # 按层计算失配指针，同时把失配状态的转移和命中分类并入当前状态，得到完整的转移表
+        fail = [0] * len(goto)
+        delta = [dict(goto[0])] + [None] * (len(goto) - 1)
+        queue = list(goto[0].values())
+        for state in queue:
+            fallback = delta[fail[state]]
+            output[state] |= output[fail[state]]
+            transitions = dict(fallback)
+            for ch, child in goto[state].items():
+                fail[child] = fallback.get(ch, 0)
+                transitions[ch] = child
+                queue.append(child)
+            delta[state] = transitions
+
+        self._delta = delta
+        self._output = output
+
+    def mask(self, text):
+        """文本命中的分类掩码（第i位对应第i个分类）"""
+        if not text:
+            return 0
+        delta = self._delta
+        output = self._output
+        full = self._full_mask
+        state = 0
+        matched = 0
+        for ch in text.lower():
+            state = delta[state].get(ch, 0)
+            if output[state]:
+                matched |= output[state]
+                if matched == full:
+                    break
+        return matched
+
+    def match(self, text):
+        """返回文本命中的所有分类"""
+        matched = self.mask(text)
+        return [category for bit, category in enumerate(self.categories) if matched >> bit & 1]
+
+    def matches_any(self, text):
+        """文本是否命中任一分类"""
+        return self.mask(text) != 0
+
+    def match_batch(self, texts):
+        """批量分类，返回与输入等长的分类列表"""
+        return [self.match(text) for text in texts]
+
+
+@functools.lru_cache(maxsize=32)
+def _compile(frozen):
+    return KeywordClassifier({category: list(keywords) for category, keywords in frozen})
+
+
+def get_classifier(keyword_sets):
+    """按关键词配置获取编译好的分类器，相同的配置只编译一次"""
+    if isinstance(keyword_sets, dict):
+        frozen = tuple((category, tuple(keywords)) for category, keywords in keyword_sets.items())
+    else:
+        # 关键词列表视为单个分类
+        frozen = ((None, tuple(keyword_sets)),)
+    return _compile(frozen)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+热度字符串解析
+把榜单页面上的热度文本转换为数值，支持:
+- 小数和千分位: "1.2万"、"1,234"
+- 单位: 千/k、万/w、百万/m、亿（大小写均可）
+- 前后缀: "热度 3.4万"、"12k+"、"🔥 99万热度"
+- 全角字符: "１２３４"、"３．５万"
+- 科学计数法: "1.2e5"
+
+热度不会是负数，带负号的数字（"-5"、"热度 −3万"）视为无法解析，返回默认值。
+
+常见的"数字+单位"格式由预编译的整串匹配直接处理；其余格式再在文本中查找第一个数字。
+整页解析时使用 parse_heat_batch，页面上重复出现的热度文本只解析一次
+"""
+
+import re
+import math
+
+# 全角数字和符号转换为半角
+_FULLWIDTH = str.maketrans(
+    '０１２３４５６７８９．，＋－−ｋＫｗＷｍＭｅＥ　',
+    '0123456789.,+--kKwWmMeE ',
+)
+
+# 单位对应的倍数
+UNITS = {
+    '': 1,
+    'k': 1000,
+    '千': 1000,
+    'w': 10000,
+    '万': 10000,
+    'm': 1000000,
+    '百万': 1000000,
+    '亿': 100000000,
+}
+
+# 快速路径：整串为 [热度] 数字 [单位] [+] [热度]
+_FAST = re.compile(r'\s*(?:热度)?[:：]?\s*(\d+(?:\.\d+)?)\s*(百万|[kK千wW万mM亿]?)\+?\s*(?:热度)?\s*')
+
+# 慢速路径：文本中第一个数字（可带指数）及其后紧跟的单位（字母单位后不能再跟字母，避免把 "3 min" 当作 3m）；
+# 数字前的 "-" 前面不是字母或数字时（"-5"、"热度 -5"，而不是 "Top-5"）作为负号记录在第一组
+_SEARCH = re.compile(
+    r'(?:(?<![0-9A-Za-z])(-)\s*)?(\d+(?:\.\d+)?(?:[eE][-+]?\d+|(?![eE][-+]?\d)))'
+    r'\s*(百万|[千万亿]|[kKwWmM](?![A-Za-z])|)'
+)
+
+
+def _to_number(digits, unit):
+    """数字和单位转换为热度值，超出浮点数范围时返回None"""
+    value = float(digits) * UNITS[unit.lower()]
+    if not math.isfinite(value):
+        return None
+    return int(round(value)) if value.is_integer() or value >= 1 else value
+
+
+def parse_heat(text, default=None):
+    """
+    解析单个热度字符串
+
+    参数:
+        text (str): 热度文本，数字会原样返回
+        default: 无法解析时的返回值
+
+    返回:
+        int/float: 热度值，超过1时取整
+    """
+    if isinstance(text, (int, float)):
+        return text
+    if not text:
+        return default
+
+    text = text.translate(_FULLWIDTH)
+    if ',' in text:
+        text = text.replace(',', '')
+    match = _FAST.fullmatch(text)
+    if match:
+        value = _to_number(match.group(1), match.group(2))
+    else:
+        match = _SEARCH.search(text)
+        if not match or match.group(1):
+            # 没有数字或是负数
+            return default
+        value = _to_number(match.group(2), match.group(3))
+    return default if value is None else value
+
+
+def parse_heat_batch(texts, default=None):
+    """解析一批热度字符串，返回与输入等长的列表；快速路径内联在循环中，相同的文本只解析一次"""
+    fast = _FAST.fullmatch
+    units = UNITS
+    parsed = {}
+    results = []
+    append = results.append
+    for text in texts:
+        value = parsed.get(text, parsed)
+        if value is parsed:
+            match = fast(text) if type(text) is str else None
+            # 过长的数字可能超出浮点数范围，交给 parse_heat 处理
+            if match and len(match.group(1)) < 300:
+                value = float(match.group(1)) * units[match.group(2).lower()]
+                value = int(round(value)) if value.is_integer() or value >= 1 else value
+            else:
+                value = parse_heat(text, default)
+            parsed[text] = value
+        append(value)
+    return results
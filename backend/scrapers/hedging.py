@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+对冲请求模块
+同一份数据有多个获取途径（接口、HTML页面）时，先请求主途径，主途径在等待时间内没有返回
+足够的条目或请求失败时再并行请求下一个途径，凑够条目数或超出耗时预算后立即返回
+"""
+
+import math
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from backend.metrics import HEDGED_REQUESTS
+
+logger = logging.getLogger('hedging')
+
+
+class LatencyTracker:
+    """记录最近若干次请求的耗时，按分位数估计对冲等待时间"""
+
+    def __init__(self, window=50, min_samples=5):
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+        self.lock = threading.Lock()
+
+    def record(self, seconds):
+        with self.lock:
+            self.samples.append(seconds)
+
+    def percentile(self, q, default):
+        """耗时的 q 分位数（0~1），样本不足 min_samples 时返回 default"""
+        with self.lock:
+            samples = sorted(self.samples)
+        if len(samples) < self.min_samples:
+            return default
+        return samples[min(math.ceil(q * len(samples)) - 1, len(samples) - 1)]
+
+
+def _default_key(item):
+    return item.get("title", "")
+
+
+def hedged_fetch(source, fetchers, max_items, hedge_delay, budget, key=_default_key):
+    """
+    按优先级对冲请求多个获取途径
+
+    参数:
+        source (str): 数据源名称，用于日志和指标
+        fetchers (list): [(端点名称, 无参函数)]，按优先级排列，函数返回条目列表
+        max_items (int): 凑够多少条不重复的条目后停止
+        hedge_delay (float): 上一个请求发出后多久（秒）仍未凑够条目时发出下一个请求
+        budget (float): 总耗时预算（秒），超出后返回已获取的条目
+        key: 条目去重的键
+
+    返回:
+        list: 按返回顺序合并、去重后的条目
+    """
+    items = {}
+    pending = {}
+    next_index = 0
+    start = time.monotonic()
+    deadline = start + budget
+    next_hedge_at = start
+    executor = ThreadPoolExecutor(max_workers=len(fetchers), thread_name_prefix=f'{source}-hedge')
+
+    def launch(reason=None):
+        nonlocal next_index, next_hedge_at
+        name, fetcher = fetchers[next_index]
+        if reason:
+            HEDGED_REQUESTS.inc(source=source, endpoint=name, reason=reason)
+            logger.info(f"{source} 发出对冲请求: {name}（{reason}）")
+        pending[executor.submit(fetcher)] = name
+        next_index += 1
+        next_hedge_at = time.monotonic() + hedge_delay
+
+    try:
+        launch()
+        while pending:
+            now = time.monotonic()
+            if now >= deadline:
+                logger.warning(f"{source} 超出耗时预算 {budget} 秒，放弃未完成的请求: {list(pending.values())}")
+                break
+
+            wait_until = deadline
+            if next_index < len(fetchers):
+                wait_until = min(wait_until, next_hedge_at)
+            done, _ = wait(pending, timeout=max(wait_until - now, 0), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    result = future.result() or []
+                except Exception as e:
+                    logger.error(f"{source} 端点 {name} 请求异常: {e}")
+                    result = []
+                for item in result:
+                    item_key = key(item)
+                    if item_key and item_key not in items:
+                        items[item_key] = item
+
+            if len(items) >= max_items:
+                break
+            if next_index < len(fetchers):
+                if not pending:
+                    # 已发出的请求都已返回但条目不足，不再等待
+                    launch('insufficient')
+                elif time.monotonic() >= next_hedge_at:
+                    launch('delay')
+    finally:
+        # 未完成的请求在后台结束，结果丢弃
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return list(items.values())
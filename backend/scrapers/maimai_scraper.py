@@ -16,19 +16,19 @@ from urllib.parse import urljoin
 
 # 导入配置
 import sys
-from backend.config.data_sources import MAIMAI_CONFIG, BASE_CONFIG
+from backend.config.data_sources import MAIMAI_CONFIG, BASE_CONFIG, init_runtime
+from .rate_limiter import rate_limiter
+from .circuit_breaker import SourceUnavailable
+from backend.metrics import PARSE_SECONDS, ITEMS_PARSED
 
-# 设置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger('maimai_scraper')
 
 class MaimaiScraper:
     """脉脉数据抓取类"""
     
     def __init__(self):
+        # 登录信息来自.env，cookie目录也需要提前创建
+        init_runtime()
         self.config = MAIMAI_CONFIG
         self.base_config = BASE_CONFIG
         self.base_url = "https://maimai.cn"
@@ -62,7 +62,8 @@ class MaimaiScraper:
     def _check_login_status(self):
         """检查登录状态"""
         try:
-            resp = self.session.get(
+            resp = rate_limiter.get(
+                self.session,
                 urljoin(self.base_url, "/web/feed_list"), 
                 timeout=self.base_config['request_timeout']
             )
@@ -91,7 +92,8 @@ class MaimaiScraper:
         
         try:
             logger.info("开始登录脉脉...")
-            resp = self.session.post(
+            resp = rate_limiter.post(
+                self.session,
                 login_url,
                 json=login_data,
                 timeout=self.base_config['request_timeout']
@@ -116,7 +118,8 @@ class MaimaiScraper:
     def get_csrf_token(self):
         """获取CSRF令牌"""
         try:
-            resp = self.session.get(
+            resp = rate_limiter.get(
+                self.session,
                 self.base_url,
                 timeout=self.base_config['request_timeout']
             )
@@ -128,9 +131,13 @@ class MaimaiScraper:
             logger.error(f"获取CSRF令牌失败: {e}")
         return ""
     
-    def get_hot_topics(self):
-        """获取热门话题"""
-        if not self._check_login_status() and not self.login():
+    def ensure_login(self):
+        """确认已登录，cookies失效时重新登录"""
+        return self._check_login_status() or self.login()
+    
+    def get_hot_topics(self, logged_in=False):
+        """获取热门话题，logged_in为True时跳过登录检查"""
+        if not logged_in and not self.ensure_login():
             logger.error("未登录，无法获取热门话题")
             return []
             
@@ -140,7 +147,8 @@ class MaimaiScraper:
         
         try:
             logger.info(f"正在获取脉脉热门话题: {url}")
-            resp = self.session.get(
+            resp = rate_limiter.get(
+                self.session,
                 url,
                 timeout=self.base_config['request_timeout']
             )
@@ -149,7 +157,9 @@ class MaimaiScraper:
                 result = resp.json()
                 if result.get("code") == 0:
                     feed_list = result.get("data", {}).get("list", [])
-                    parsed_items = self._parse_feed_items(feed_list)
+                    with PARSE_SECONDS.time(source='maimai'):
+                        parsed_items = self._parse_feed_items(feed_list)
+                    ITEMS_PARSED.inc(len(parsed_items), source='maimai')
                     logger.info(f"成功获取脉脉热门话题: {len(parsed_items)}条")
                     return parsed_items
                 else:
@@ -161,9 +171,9 @@ class MaimaiScraper:
             
         return []
     
-    def get_company_hot(self):
-        """获取公司热榜"""
-        if not self._check_login_status() and not self.login():
+    def get_company_hot(self, logged_in=False):
+        """获取公司热榜，logged_in为True时跳过登录检查"""
+        if not logged_in and not self.ensure_login():
             logger.error("未登录，无法获取公司热榜")
             return []
             
@@ -173,7 +183,8 @@ class MaimaiScraper:
         
         try:
             logger.info(f"正在获取脉脉公司热榜: {url}")
-            resp = self.session.get(
+            resp = rate_limiter.get(
+                self.session,
                 url,
                 timeout=self.base_config['request_timeout']
             )
@@ -182,7 +193,9 @@ class MaimaiScraper:
                 result = resp.json()
                 if result.get("code") == 0:
                     discuss_list = result.get("data", {}).get("list", [])
-                    parsed_items = self._parse_discuss_items(discuss_list)
+                    with PARSE_SECONDS.time(source='maimai'):
+                        parsed_items = self._parse_discuss_items(discuss_list)
+                    ITEMS_PARSED.inc(len(parsed_items), source='maimai')
                     logger.info(f"成功获取脉脉公司热榜: {len(parsed_items)}条")
                     return parsed_items
                 else:
@@ -211,11 +224,13 @@ class MaimaiScraper:
                     company_name = item.get("company", {}).get("name", "")
                     title = f"[{company_name}] {title}"
                 
+                # rank 为条目在原始榜单中的名次，按热度合并排序后仍保留
                 result.append({
                     "title": title,
                     "url": url,
                     "hot": item.get("like_cnt", 0) + item.get("comment_cnt", 0),
-                    "source": "脉脉热门"
+                    "source": "脉脉热门",
+                    "rank": len(result) + 1
                 })
             except Exception as e:
                 logger.error(f"解析热门话题项目失败: {e}")
@@ -242,20 +257,31 @@ class MaimaiScraper:
                     "title": title,
                     "url": url,
                     "hot": item.get("hot", 0),
-                    "source": "脉脉公司热榜"
+                    "source": "脉脉公司热榜",
+                    "rank": len(result) + 1
                 })
             except Exception as e:
                 logger.error(f"解析公司热榜项目失败: {e}")
                 
         return result
     
-    def get_all_hot_data(self):
-        """获取所有热门数据"""
+    def get_all_hot_data(self, use_backup=True):
+        """
+        获取所有热门数据
+        
+        参数:
+            use_backup (bool): 没有获取到数据时是否返回备用数据，为False时抛出SourceUnavailable
+        """
         hot_data = []
         
+        # 只登录一次，登录失败时不再请求各个接口
+        if not self.ensure_login():
+            logger.error("脉脉登录失败，跳过本次抓取")
+            return self._no_data(use_backup)
+        
         # 获取热门话题
         try:
-            topic_data = self.get_hot_topics()
+            topic_data = self.get_hot_topics(logged_in=True)
             if topic_data:
                 hot_data.extend(topic_data)
                 logger.info(f"获取到热门话题 {len(topic_data)} 条")
@@ -266,7 +292,7 @@ class MaimaiScraper:
         
         # 获取公司热榜
         try:
-            company_data = self.get_company_hot()
+            company_data = self.get_company_hot(logged_in=True)
             if company_data:
                 hot_data.extend(company_data)
                 logger.info(f"获取到公司热榜 {len(company_data)} 条")
@@ -277,8 +303,7 @@ class MaimaiScraper:
             
         # 如果没有获取到数据，使用备用数据
         if not hot_data:
-            logger.warning("无法从脉脉获取数据，使用备用数据")
-            hot_data = self._get_backup_hot_data()
+            return self._no_data(use_backup)
             
         # 按热度排序
         hot_data.sort(key=lambda x: x.get("hot", 0), reverse=True)
@@ -286,6 +311,17 @@ class MaimaiScraper:
         # 限制返回数量
         return hot_data[:self.config['max_items']]
         
+    def _no_data(self, use_backup):
+        """没有获取到数据时返回备用数据，或抛出SourceUnavailable交给熔断器处理"""
+        if not use_backup:
+            raise SourceUnavailable("无法从脉脉获取数据", fallback=self._get_backup_hot_data())
+        logger.warning("无法从脉脉获取数据，使用备用数据")
+        return self._get_backup_hot_data()
+        
+    def fetch(self, force=False):
+        """统一的数据源接口，没有获取到数据时抛出SourceUnavailable"""
+        return self.get_all_hot_data(use_backup=False)
+        
     def _get_backup_hot_data(self):
         """提供备用的热门数据，防止API失效时没有数据显示"""
         return [
@@ -365,6 +401,10 @@ class MaimaiScraper:
 
 # 测试代码
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
     scraper = MaimaiScraper()
     if scraper.login():
         print("登录成功!")
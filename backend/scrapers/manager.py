@@ -6,102 +6,114 @@
 负责调度和管理各个爬虫模块
 """
 
-import os
 import time
-import json
 import logging
+import threading
 from pathlib import Path
 
-from .maimai_scraper import MaimaiScraper
-from .sspai_scraper import SSPAIScraper
-from .tophub_scraper import TopHubScraper
+from .registry import get_scraper
+from .circuit_breaker import OPEN, get_breaker, SourceUnavailable
+from backend.metrics import CACHE_REQUESTS, SOURCE_FETCH_SECONDS
+from backend.shared_cache import FileCache, get_cache
+from backend.rank_history import RankHistory, get_rank_history
+from backend.heat_score import HeatNormalizer
+from backend.similarity import TopicIndex, get_topic_index
+from backend.fingerprint import fingerprint
+from backend.scheduler import RefreshScheduler
 from backend.config.data_sources import (
     DATA_SOURCE_MAPPING, 
     BASE_CONFIG, 
-    ROOT_DIR
+    CACHE_CONFIG,
+    init_runtime
 )
 
-# 设置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger('scraper_manager')
 
 class ScraperManager:
     """爬虫管理类"""
     
-    def __init__(self):
+    def __init__(self, temp_dir=None, store=None):
+        """
+        参数:
+            temp_dir: 指定时使用该目录下的独立文件缓存、排名历史和话题索引（基准测试等场景）
+            store: 缓存驱动，默认使用共享缓存，多个进程共用同一份类别数据和更新时间
+        """
+        init_runtime()
         self.data_source_mapping = DATA_SOURCE_MAPPING
         self.base_config = BASE_CONFIG
-        self.cache_dir = ROOT_DIR / 'temp' / 'cache'
-        self.last_update_file = ROOT_DIR / 'temp' / 'last_update.json'
-        
-        # 确保缓存目录存在
-        if not self.cache_dir.exists():
-            self.cache_dir.mkdir(parents=True)
-            
-        # 加载上次更新时间
-        self.last_update_times = self._load_last_update_times()
-        
-        # 初始化爬虫实例
-        self.scrapers = {
-            'maimai': MaimaiScraper(),
-            'sspai': SSPAIScraper(),
-            'tophub': TopHubScraper(),
-        }
+        if store is None:
+            store = FileCache(Path(temp_dir) / 'cache') if temp_dir else get_cache()
+        self.store = store
+        self.rank_history = RankHistory(Path(temp_dir) / 'rank_history') if temp_dir else get_rank_history()
+        # 各来源的热度分布与类别数据保存在同一个缓存中
+        self.heat_normalizer = HeatNormalizer(self.store)
+        self.temp_dir = temp_dir
+        # 到期类别的刷新顺序，请求量和变化率保存在同一个缓存中
+        self.scheduler = RefreshScheduler(self.store, self._last_update)
+        # 话题相似度索引，首次保存数据时创建；没有安装numpy时为False
+        self.topic_index = None
         
-    def _load_last_update_times(self):
-        """加载上次更新时间"""
-        if os.path.exists(self.last_update_file):
-            try:
-                with open(self.last_update_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.error(f"加载上次更新时间失败: {e}")
-        return {}
+        # 数据源不可用且没有缓存时展示的备用数据 {类别: 数据}
+        self.fallback_data = {}
         
-    def _save_last_update_times(self):
-        """保存上次更新时间"""
-        try:
-            with open(self.last_update_file, 'w', encoding='utf-8') as f:
-                json.dump(self.last_update_times, f)
-        except Exception as e:
-            logger.error(f"保存上次更新时间失败: {e}")
-            
     def _load_cache(self, category):
         """从缓存加载数据"""
-        cache_file = self.cache_dir / f"{category}.json"
-        if os.path.exists(cache_file):
-            try:
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.error(f"加载缓存数据失败: {e}")
+        try:
+            return self.store.get(f"category:{category}", [])
+        except Exception as e:
+            logger.error(f"加载缓存数据失败: {e}")
         return []
         
+    def _load_stale(self, category):
+        """抓取失败或熔断时返回旧缓存，没有缓存则返回备用数据"""
+        CACHE_REQUESTS.inc(category=category, result='stale')
+        return self._load_cache(category) or self.fallback_data.get(category, [])
+        
     def _save_cache(self, category, data):
         """保存数据到缓存"""
-        cache_file = self.cache_dir / f"{category}.json"
         try:
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False)
+            self.store.set(f"category:{category}", data)
         except Exception as e:
             logger.error(f"保存缓存数据失败: {e}")
             
+    def _save_fingerprint(self, category, digest):
+        """保存抓取结果（计算热度前）的内容指纹"""
+        try:
+            self.store.set(f"fingerprint:{category}", digest)
+        except Exception as e:
+            logger.error(f"保存数据指纹失败: {e}")
+            
+    def _fingerprint(self, category):
+        """上次抓取结果的内容指纹"""
+        try:
+            return self.store.get(f"fingerprint:{category}")
+        except Exception as e:
+            logger.error(f"加载数据指纹失败: {e}")
+        return None
+        
+    def _last_update(self, category):
+        """类别的最后更新时间"""
+        try:
+            return self.store.get(f"last_update:{category}", 0)
+        except Exception as e:
+            logger.error(f"加载上次更新时间失败: {e}")
+        return 0
+            
     def need_update(self, category):
         """判断类别是否需要更新"""
         if category not in self.data_source_mapping:
             return True
             
-        last_update = self.last_update_times.get(category, 0)
-        return self.data_source_mapping[category]['need_update'](last_update)
+        last_update = self._last_update(category)
+        return time.time() - last_update > self.scheduler.interval(category)
         
     def update_timestamp(self, category):
         """更新类别的最后更新时间"""
         if category in self.data_source_mapping:
-            self.last_update_times[category] = self.data_source_mapping[category]['update_timestamp']()
-            self._save_last_update_times()
+            try:
+                self.store.set(f"last_update:{category}", time.time())
+            except Exception as e:
+                logger.error(f"保存上次更新时间失败: {e}")
             
     def get_category_data(self, category, force_update=False):
         """获取指定类别的数据"""
@@ -109,153 +121,211 @@ class ScraperManager:
             logger.error(f"未知类别: {category}")
             return []
             
-        # 特殊处理科技类别，因为暂时没有对应的爬虫
-        if category == '科技':
-            logger.info(f"使用示例数据作为科技类别的数据")
-            example_data = self._get_example_tech_data()
-            return example_data
-            
         # 判断是否需要更新
         if not force_update and not self.need_update(category):
             logger.info(f"类别 {category} 使用缓存数据")
+            CACHE_REQUESTS.inc(category=category, result='hit')
             return self._load_cache(category)
             
-        logger.info(f"开始抓取类别 {category} 的数据")
-        
-        # 获取数据源和对应的爬虫
+        # 多个进程同时需要刷新时只有一个真正抓取，其余等待后直接读取其结果
+        lock = self.store.lock(f"refresh:{category}", timeout=CACHE_CONFIG['refresh_lock_timeout'])
+        if not lock.acquire(wait_timeout=CACHE_CONFIG['refresh_lock_timeout']):
+            logger.warning(f"等待其他进程刷新类别 {category} 超时，使用缓存数据")
+            return self._load_stale(category)
+        try:
+            if not force_update and not self.need_update(category):
+                logger.info(f"类别 {category} 已由其他进程刷新，使用缓存数据")
+                CACHE_REQUESTS.inc(category=category, result='hit')
+                return self._load_cache(category)
+            return self._refresh_category(category, force_update)
+        finally:
+            lock.release()
+            
+    def _refresh_category(self, category, force_update):
+        """抓取类别数据并写入缓存"""
+        # 数据源熔断期间不发起抓取，直接返回缓存数据
         source_name = self.data_source_mapping[category]['source']
-        scraper = self.scrapers.get(source_name)
+        breaker = get_breaker(source_name)
+        if not breaker.allow_request():
+            logger.warning(f"数据源 {source_name} 已熔断，{breaker.retry_in():.0f}秒后重试，类别 {category} 使用缓存数据")
+            return self._load_stale(category)
+            
+        CACHE_REQUESTS.inc(category=category, result='miss')
+        logger.info(f"开始抓取类别 {category} 的数据")
         
-        if not scraper:
-            logger.error(f"未找到类别 {category} 对应的爬虫")
-            return self._load_cache(category)  # 返回缓存数据
+        # 获取对应的爬虫（首次使用时才创建）
+        try:
+            scraper = get_scraper(source_name)
+        except Exception as e:
+            logger.error(f"未找到类别 {category} 对应的爬虫: {e}")
+            breaker.record_failure()
+            return self._load_stale(category)  # 返回缓存数据
             
-        # 根据不同的数据源类型，调用不同的方法
         data = []
         try:
-            if source_name == 'maimai':
-                data = scraper.get_all_hot_data()
-            elif source_name == 'sspai':
-                data = scraper.get_all_ai_tools()
-            elif source_name == 'tophub':
-                data = scraper.get_all_tech_data()
-            else:
-                logger.error(f"未知数据源类型: {source_name}")
-                return self._load_cache(category)
-                
+            with SOURCE_FETCH_SECONDS.time(source=source_name):
+                data = scraper.fetch(force=force_update)
+            breaker.record_success()
+            
             # 更新时间戳和缓存
             if data:
+                # 与上次抓取结果相同时只更新时间戳，沿用缓存中的数据对象，
+                # 不重新计算热度、排名和话题索引，调用方据此保留已编码的响应
+                digest = fingerprint(data)
+                previous = self._load_cache(category)
+                if previous and digest == self._fingerprint(category):
+                    self.scheduler.observe(category, previous, previous)
+                    self.update_timestamp(category)
+                    logger.info(f"类别 {category} 抓取成功，数据没有变化")
+                    return previous
+                self.scheduler.observe(category, previous, data)
+                data = self._score_heat(category, data)
                 self.update_timestamp(category)
                 self._save_cache(category, data)
+                self._save_fingerprint(category, digest)
+                self._record_ranks(category, data)
+                self._index_topics(category, data)
                 logger.info(f"类别 {category} 抓取成功，获取到 {len(data)} 条数据")
             else:
                 logger.warning(f"类别 {category} 抓取结果为空")
                 
             return data
             
+        except SourceUnavailable as e:
+            logger.error(f"抓取类别 {category} 失败: {e}")
+            breaker.record_failure()
+            self.fallback_data[category] = e.fallback
+            return self._load_stale(category)
         except Exception as e:
             logger.error(f"抓取类别 {category} 数据异常: {e}")
-            return self._load_cache(category)  # 出错时返回缓存数据
+            breaker.record_failure()
+            return self._load_stale(category)  # 出错时返回缓存数据
             
-    def get_all_data(self, force_update=False):
-        """获取所有类别的数据"""
-        result = {}
-        for category in self.data_source_mapping.keys():
-            result[category] = self.get_category_data(category, force_update)
-        return result
-        
-    def _get_example_tech_data(self):
-        """生成示例科技数据"""
-        return [
-            {
-                "title": "苹果发布会定档，将推出新一代M4芯片",
-                "url": "https://example.com/news1",
-                "hot": 9876,
-                "source": "科技媒体"
-            },
-            {
-                "title": "华为Mate70系列即将发布，预计搭载麒麟芯片",
-                "url": "https://example.com/news2",
-                "hot": 8765,
-                "source": "科技媒体"
-            },
-            {
-                "title": "特斯拉推出新型自动驾驶系统，精度提升50%",
-                "url": "https://example.com/news3",
-                "hot": 7654,
-                "source": "科技媒体"
-            },
-            {
-                "title": "谷歌DeepMind发布最新AI研究成果，突破多模态理解",
-                "url": "https://example.com/news4",
-                "hot": 6543,
-                "source": "科技媒体"
-            },
-            {
-                "title": "Meta发布新一代VR设备，更轻更强大",
-                "url": "https://example.com/news5",
-                "hot": 5432,
-                "source": "科技媒体"
-            },
-            {
-                "title": "微软发布Windows 11新版本，大幅提升AI功能",
-                "url": "https://example.com/news6",
-                "hot": 4321,
-                "source": "科技媒体"
-            },
-            {
-                "title": "苹果Vision Pro销量突破百万台",
-                "url": "https://example.com/news7",
-                "hot": 3210,
-                "source": "科技媒体"
-            },
-            {
-                "title": "亚马逊推出新型智能家居设备，集成大模型",
-                "url": "https://example.com/news8",
-                "hot": 2109,
-                "source": "科技媒体"
-            },
-            {
-                "title": "小米汽车SU7预订量超30万台",
-                "url": "https://example.com/news9",
-                "hot": 1987,
-                "source": "科技媒体"
-            },
-            {
-                "title": "NVIDIA发布新一代GPU，性能提升80%",
-                "url": "https://example.com/news10",
-                "hot": 1876,
-                "source": "科技媒体"
-            },
-            {
-                "title": "OpenAI推出最新版GPT-5模型，能力全面超越人类",
-                "url": "https://example.com/news11",
-                "hot": 1765,
-                "source": "科技媒体"
-            },
-            {
-                "title": "量子计算取得重大突破，IBM实现100量子比特稳定运行",
-                "url": "https://example.com/news12",
-                "hot": 1654,
-                "source": "科技媒体"
-            }
+    def _score_heat(self, category, data):
+        """为条目加上归一化热度 heat_score 并按其降序排列，使同一类别中不同来源的条目可以比较"""
+        try:
+            return self.heat_normalizer.annotate(data)
+        except Exception as e:
+            logger.error(f"计算类别 {category} 的归一化热度失败: {e}")
+            return data
+            
+    def _record_ranks(self, category, data):
+        """
+        按来源记录名次变化，名次取爬虫写入的原始名次 rank（不受类别内按热度排序的影响）；
+        在刷新锁内调用，同一来源不会有多个进程同时写入
+        """
+        by_source = {}
+        for item in data:
+            if isinstance(item.get('rank'), int):
+                by_source.setdefault(item.get('source', ''), []).append(item)
+        for source, items in by_source.items():
+            try:
+                self.rank_history.record(source, items, category=category)
+            except Exception as e:
+                logger.error(f"记录来源 {source} 的排名历史失败: {e}")
+            
+    def _index_topics(self, category, data):
+        """把新条目加入话题相似度索引"""
+        if self.topic_index is False:
+            return
+        try:
+            if self.topic_index is None:
+                self.topic_index = TopicIndex(Path(self.temp_dir) / 'similarity') if self.temp_dir else get_topic_index()
+            self.topic_index.add(data, category)
+        except RuntimeError as e:
+            logger.warning(f"{e}，不建立话题相似度索引")
+            self.topic_index = False
+        except Exception as e:
+            logger.error(f"更新类别 {category} 的话题索引失败: {e}")
+            
+    def _due_probes(self):
+        """到了试探时间的熔断数据源，每个数据源选一个类别，返回 {类别: 数据源}"""
+        probes = {}
+        sources = set()
+        for category, mapping in self.data_source_mapping.items():
+            source_name = mapping['source']
+            if source_name not in sources and get_breaker(source_name).probe_due():
+                sources.add(source_name)
+                probes[category] = source_name
+        return probes
+
+    def next_probe_in(self):
+        """距离最近一次熔断试探的时间（秒），没有熔断的数据源时返回None"""
+        waits = [
+            breaker.retry_in()
+            for breaker in (get_breaker(source_name) for source_name in {
+                mapping['source'] for mapping in self.data_source_mapping.values()
+            })
+            if breaker.state == OPEN
         ]
+        return min(waits) if waits else None
+
+    def get_all_data(self, force_update=False, max_refreshes=None):
+        """
+        获取所有类别的数据
+
+        参数:
+            force_update (bool): 忽略缓存，刷新所有类别
+            max_refreshes (int): 本次最多刷新的到期类别数，按优先级选择，其余到期类别先返回缓存数据；
+                没有缓存数据的类别总是刷新
+        """
+        if force_update:
+            return {
+                category: self.get_category_data(category, force_update)
+                for category in self.data_source_mapping
+            }
         
-# 单例模式
-scraper_manager = ScraperManager()
+        result = {}
+        refreshed = 0
+        probes = self._due_probes()
+        for entry in self.scheduler.plan():
+            category = entry['category']
+            if category in probes:
+                # 熔断的数据源到了试探时间，立即试探，不占用刷新名额
+                logger.info(f"数据源 {probes[category]} 到达熔断恢复时间，刷新类别 {category} 作为试探")
+                result[category] = self.get_category_data(category, force_update=True)
+                continue
+            if entry['due'] and max_refreshes is not None and refreshed >= max_refreshes:
+                cached = self._load_cache(category)
+                if cached:
+                    logger.info(f"类别 {category} 已到期（优先级 {entry['priority']}），留到下一轮刷新")
+                    result[category] = cached
+                    continue
+            if entry['due']:
+                refreshed += 1
+            result[category] = self.get_category_data(category)
+        # 按配置的类别顺序返回
+        return {category: result[category] for category in self.data_source_mapping}
+        
+# 单例模式（首次使用时才创建，导入模块时不做任何文件操作）
+_scraper_manager = None
+_scraper_manager_lock = threading.Lock()
+
+def get_scraper_manager():
+    """获取爬虫管理器单例"""
+    global _scraper_manager
+    if _scraper_manager is None:
+        with _scraper_manager_lock:
+            if _scraper_manager is None:
+                _scraper_manager = ScraperManager()
+    return _scraper_manager
 
 # 对外接口
 def get_category_data(category, force_update=False):
     """获取指定类别的数据"""
-    return scraper_manager.get_category_data(category, force_update)
+    return get_scraper_manager().get_category_data(category, force_update)
     
-def get_all_data(force_update=False):
+def get_all_data(force_update=False, max_refreshes=None):
     """获取所有类别的数据"""
-    return scraper_manager.get_all_data(force_update)
+    return get_scraper_manager().get_all_data(force_update, max_refreshes)
 
 
 # 测试代码
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
     # 测试获取各类别数据
     categories = list(DATA_SOURCE_MAPPING.keys())
     for category in categories:
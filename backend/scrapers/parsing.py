@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+解析调度模块
+爬虫的页面解析统一通过 parse() 调用：默认在当前进程内执行；
+抓取进程（backend.worker）设置进程池后，解析在子进程中执行，不再占用抓取线程的GIL
+"""
+
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger('parsing')
+
+_pool = None
+
+
+def _call_parser(source, method, args):
+    """在子进程中执行解析，子进程内的爬虫实例同样通过注册表按需创建"""
+    from .registry import get_scraper
+    return getattr(get_scraper(source), method)(*args)
+
+
+def _warm_up():
+    """预先导入解析所需的模块"""
+    import bs4  # noqa: F401
+    return True
+
+
+def create_parse_pool(processes, start_method='spawn'):
+    """
+    创建解析进程池并预热所有子进程
+
+    参数:
+        processes (int): 子进程数量
+        start_method (str): 子进程启动方式，抓取进程中有多个线程，默认使用spawn避免fork带来的锁问题
+    """
+    context = multiprocessing.get_context(start_method)
+    pool = ProcessPoolExecutor(max_workers=processes, mp_context=context)
+    for future in [pool.submit(_warm_up) for _ in range(processes)]:
+        future.result()
+    logger.info(f"已启动 {processes} 个解析进程")
+    return pool
+
+
+def set_parse_pool(pool):
+    """设置解析使用的进程池，None 表示在当前进程内解析"""
+    global _pool
+    _pool = pool
+
+
+def parse(source, method, *args):
+    """
+    调用爬虫的解析方法
+
+    参数:
+        source (str): 数据源名称（注册表中的名称）
+        method (str): 爬虫实例上的解析方法名
+        args: 解析方法的参数，需要可以被pickle（通常是页面文本）
+    """
+    pool = _pool
+    if pool is None:
+        return _call_parser(source, method, args)
+    return pool.submit(_call_parser, source, method, args).result()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+请求限速模块
+按站点(host)维护令牌桶，遇到429/5xx时按指数退避重试，并遵守Retry-After
+"""
+
+import math
+import time
+import random
+import logging
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+from backend.config.data_sources import RATE_LIMIT_CONFIG, BASE_CONFIG
+from backend.metrics import HTTP_FETCH_SECONDS, HTTP_FETCH_BYTES
+
+logger = logging.getLogger('rate_limiter')
+
+
+class TokenBucket:
+    """令牌桶，只在没有可用令牌时才等待"""
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """获取一个令牌，必要时阻塞到令牌可用"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                wait = self.blocked_until - now
+                if wait <= 0:
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def block_for(self, seconds):
+        """在指定时间内暂停该站点的所有请求（退避）"""
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class RateLimiter:
+    """按站点限速的请求器"""
+
+    def __init__(self, config=None):
+        self.config = config or RATE_LIMIT_CONFIG
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def _host_policy(self, host):
+        """获取站点的限速策略，未配置的站点使用默认策略"""
+        hosts = self.config.get('hosts', {})
+        if host in hosts:
+            return hosts[host]
+        # 子域名沿用主域名的配置，例如 www.tophub.today
+        for name, policy in hosts.items():
+            if host.endswith(f".{name}"):
+                return policy
+        return self.config['default']
+
+    def get_bucket(self, host):
+        """获取（或创建）站点对应的令牌桶"""
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                policy = self._host_policy(host)
+                bucket = TokenBucket(policy['rate'], policy['burst'])
+                self.buckets[host] = bucket
+            return bucket
+
+    def _backoff_delay(self, attempt):
+        """计算第attempt次重试的指数退避时间（带随机抖动）"""
+        backoff = self.config['backoff']
+        delay = min(backoff['max_delay'], backoff['base_delay'] * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _retry_after(self, resp):
+        """解析Retry-After响应头，支持秒数和HTTP日期两种格式"""
+        value = resp.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            delay = float(value)
+        except ValueError:
+            try:
+                delay = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                return None
+        if not math.isfinite(delay):
+            # float() 接受 nan/inf，nan 会让 time.sleep 抛出异常
+            return None
+        return min(max(delay, 0), self.config['backoff']['max_delay'])
+
+    def _rewrite_url(self, host, url):
+        """按 host_overrides 将请求转发到替换地址，例如 http://127.0.0.1:8765/<host>/<path>"""
+        base = BASE_CONFIG['host_overrides'].get(host)
+        if not base:
+            return url
+        parsed = urlparse(url)
+        rewritten = f"{base.rstrip('/')}{parsed.path or '/'}"
+        if parsed.query:
+            rewritten = f"{rewritten}?{parsed.query}"
+        return rewritten
+
+    def request(self, session, method, url, **kwargs):
+        """
+        发送受限速保护的请求
+
+        参数:
+            session: requests.Session 或 requests 模块本身
+            method (str): 请求方法
+            url (str): 请求地址
+        """
+        host = urlparse(url).hostname or ''
+        bucket = self.get_bucket(host)
+        url = self._rewrite_url(host, url)
+        retries = self.config['backoff']['retries']
+
+        attempt = 0
+        while True:
+            bucket.acquire()
+            start = time.perf_counter()
+            try:
+                resp = session.request(method, url, **kwargs)
+            except Exception:
+                HTTP_FETCH_SECONDS.observe(time.perf_counter() - start, host=host, status='error')
+                raise
+            HTTP_FETCH_SECONDS.observe(time.perf_counter() - start, host=host, status=resp.status_code)
+            HTTP_FETCH_BYTES.inc(len(resp.content or b''), host=host)
+
+            if resp.status_code != 429 and resp.status_code < 500:
+                return resp
+            if attempt >= retries:
+                logger.warning(f"{host} 重试{retries}次后仍返回状态码: {resp.status_code}")
+                return resp
+
+            delay = self._retry_after(resp)
+            if delay is None:
+                delay = self._backoff_delay(attempt)
+            logger.warning(f"{host} 返回状态码 {resp.status_code}，{delay:.1f}秒后重试")
+            bucket.block_for(delay)
+            attempt += 1
+
+    def get(self, session, url, **kwargs):
+        """发送GET请求"""
+        return self.request(session, 'GET', url, **kwargs)
+
+    def post(self, session, url, **kwargs):
+        """发送POST请求"""
+        return self.request(session, 'POST', url, **kwargs)
+
+
+# 全局共享的限速器，保证同一站点的所有请求共用一个令牌桶
+rate_limiter = RateLimiter()
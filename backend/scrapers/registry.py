@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+数据源注册表
+根据配置按需导入并创建爬虫实例，同一数据源在进程内只创建一次
+"""
+
+import logging
+import importlib
+import threading
+
+from backend.config.data_sources import SCRAPER_REGISTRY
+
+logger = logging.getLogger('scraper_registry')
+
+
+class ScraperRegistry:
+    """爬虫注册表，首次使用时才创建爬虫实例"""
+
+    def __init__(self, sources=None):
+        self.sources = SCRAPER_REGISTRY if sources is None else sources
+        self.instances = {}
+        self.lock = threading.Lock()
+
+    def names(self):
+        """返回所有已注册的数据源名称"""
+        return list(self.sources.keys())
+
+    def _load_class(self, path):
+        """根据 '模块路径:类名' 导入爬虫类"""
+        module_name, _, class_name = path.partition(':')
+        module = importlib.import_module(module_name)
+        return getattr(module, class_name)
+
+    def get(self, name):
+        """获取数据源对应的爬虫实例，未注册时抛出KeyError"""
+        instance = self.instances.get(name)
+        if instance is not None:
+            return instance
+
+        if name not in self.sources:
+            raise KeyError(f"未注册的数据源: {name}")
+
+        with self.lock:
+            instance = self.instances.get(name)
+            if instance is None:
+                scraper_class = self._load_class(self.sources[name]['class'])
+                instance = scraper_class()
+                self.instances[name] = instance
+                logger.info(f"已创建数据源 {name} 的爬虫实例")
+        return instance
+
+
+# 全局注册表
+registry = ScraperRegistry()
+
+
+def get_scraper(name):
+    """获取数据源对应的爬虫实例"""
+    return registry.get(name)
@@ -16,12 +16,13 @@ from urllib.parse import urljoin
 # 导入配置
 import sys
 from backend.config.data_sources import SSPAI_CONFIG, BASE_CONFIG
+from .rate_limiter import rate_limiter
+from .circuit_breaker import SourceUnavailable
+from .hedging import hedged_fetch, LatencyTracker
+from .parsing import parse
+from .classifier import get_classifier
+from backend.metrics import PARSE_SECONDS, ITEMS_PARSED
 
-# 设置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger('sspai_scraper')
 
 class SSPAIScraper:
@@ -31,11 +32,23 @@ class SSPAIScraper:
         self.config = SSPAI_CONFIG
         self.base_config = BASE_CONFIG
         self.base_url = "https://sspai.com"
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.ai_tag_classifier = get_classifier(self.config['ai_tag_keywords'])
+        # 对冲请求时各端点在不同线程中并发请求，每个端点使用独立的会话（requests.Session 不是线程安全的）
+        self.sessions = {endpoint: self._new_session() for endpoint in ('api_articles', 'ai_tools')}
+        # API抓取（含翻页）的耗时，用于计算对冲等待时间
+        self.api_latency = LatencyTracker(self.config['hedge_latency_window'])
+        
+    def _new_session(self):
+        session = requests.Session()
+        session.headers.update({
             'User-Agent': self.base_config['user_agent'],
             'Referer': self.base_url,
         })
+        return session
+        
+    def _timeout(self, endpoint):
+        """端点的请求超时（秒）"""
+        return self.config['timeouts'].get(endpoint, self.base_config['request_timeout'])
         
     def get_ai_tools(self):
         """获取AI工具文章列表"""
@@ -43,14 +56,16 @@ class SSPAIScraper:
         
         try:
             logger.info(f"正在从少数派获取AI工具文章列表: {url}")
-            resp = self.session.get(
+            resp = rate_limiter.get(
+                self.sessions['ai_tools'],
                 url,
-                timeout=self.base_config['request_timeout']
+                timeout=self._timeout('ai_tools')
             )
             
             if resp.status_code == 200:
-                soup = BeautifulSoup(resp.text, 'html.parser')
-                articles = self._parse_articles(soup)
+                with PARSE_SECONDS.time(source='sspai'):
+                    articles = parse('sspai', '_parse_articles_html', resp.text)
+                ITEMS_PARSED.inc(len(articles), source='sspai')
                 logger.info(f"从少数派HTML页面获取到 {len(articles)} 条AI工具文章")
                 return articles
             else:
@@ -61,14 +76,47 @@ class SSPAIScraper:
         return []
         
     def get_articles_api(self):
-        """通过API获取AI工具文章列表"""
-        url = self.config['endpoints']['api_articles']
+        """
+        通过API获取AI工具文章列表
+        API返回的是混合各类标签的文章，按AI标签过滤后不足 max_items 条时继续翻页，
+        最多请求 api_max_pages 页，某一页没有新文章时停止
+        """
+        started = time.monotonic()
+        result = {}
+        page_size = self.config['api_page_size']
+        for page in range(self.config['api_max_pages']):
+            articles = self._fetch_api_page(page * page_size, page_size)
+            if not articles:
+                break
+            with PARSE_SECONDS.time(source='sspai'):
+                parsed_articles = self._parse_articles_api(articles)
+            ITEMS_PARSED.inc(len(parsed_articles), source='sspai')
+            
+            added = 0
+            for article in parsed_articles:
+                if article["title"] not in result:
+                    # rank 为文章在API（按上架时间排列、过滤AI标签后）列表中的名次，跨页连续编号
+                    result[article["title"]] = dict(article, rank=len(result) + 1)
+                    added += 1
+            if len(result) >= self.config['max_items'] or added == 0 or len(articles) < page_size:
+                break
+        
+        if result:
+            # 只记录成功的耗时，失败通常很快返回，会低估正常情况下需要等待的时间
+            self.api_latency.record(time.monotonic() - started)
+            logger.info(f"从少数派API获取到 {len(result)} 条AI工具文章（{page + 1}页）")
+        return list(result.values())[:self.config['max_items']]
+    
+    def _fetch_api_page(self, offset, limit):
+        """请求一页API文章，失败时返回空列表"""
+        url = self.config['endpoints']['api_articles'].format(limit=limit, offset=offset)
         
         try:
             logger.info(f"正在从少数派API获取文章列表: {url}")
-            resp = self.session.get(
+            resp = rate_limiter.get(
+                self.sessions['api_articles'],
                 url,
-                timeout=self.base_config['request_timeout']
+                timeout=self._timeout('api_articles')
             )
             
             if resp.status_code == 200:
@@ -84,12 +132,9 @@ class SSPAIScraper:
                         articles = []
                         logger.error(f"获取少数派文章API返回格式异常: {result}")
                         
-                    if articles:
-                        parsed_articles = self._parse_articles_api(articles)
-                        logger.info(f"从少数派API获取到 {len(parsed_articles)} 条AI工具文章")
-                        return parsed_articles
-                    else:
+                    if not articles:
                         logger.warning("少数派API返回的文章列表为空")
+                    return articles
                 except Exception as e:
                     logger.error(f"解析少数派API返回数据异常: {e}")
             else:
@@ -99,6 +144,10 @@ class SSPAIScraper:
             
         return []
     
+    def _parse_articles_html(self, html):
+        """解析AI工具页面"""
+        return self._parse_articles(BeautifulSoup(html, 'html.parser'))
+        
     def _parse_articles(self, soup):
         """解析HTML中的文章列表"""
         result = []
@@ -135,11 +184,13 @@ class SSPAIScraper:
                     # 将标题添加"AI工具:"前缀
                     title = f"AI工具: {title}"
                     
+                    # rank 为文章在HTML页面列表中的名次
                     result.append({
                         "title": title,
                         "url": url,
                         "hot": hot,
-                        "source": "少数派AI专栏"
+                        "source": "少数派AI专栏",
+                        "rank": len(result) + 1
                     })
                 except Exception as e:
                     logger.error(f"解析少数派文章卡片失败: {e}")
@@ -153,19 +204,14 @@ class SSPAIScraper:
         """解析API返回的文章列表"""
         result = []
         
-        for item in articles_data[:self.config['max_items']]:
+        for item in articles_data:
+            # 先过滤再截断，凑够条目数后停止
+            if len(result) >= self.config['max_items']:
+                break
             try:
                 # 过滤只包含AI标签的文章
                 tags = item.get("tags", [])
-                is_ai_article = False
-                
-                for tag in tags:
-                    tag_name = tag.get("name", "").lower()
-                    if "ai" in tag_name or "人工智能" in tag_name or "chatgpt" in tag_name:
-                        is_ai_article = True
-                        break
-                
-                if not is_ai_article:
+                if not any(self.ai_tag_classifier.matches_any(tag.get("name", "")) for tag in tags):
                     continue
                 
                 title = item.get("title", "")
@@ -191,27 +237,40 @@ class SSPAIScraper:
                 
         return result
     
-    def get_all_ai_tools(self):
-        """获取所有AI工具相关文章"""
-        # 首先尝试直接获取热门文章
-        articles = []
+    def _hedge_delay(self):
+        """对冲等待时间：API抓取耗时的高分位数，样本不足时使用配置值"""
+        lower, upper = self.config['hedge_delay_bounds']
+        delay = self.api_latency.percentile(self.config['hedge_percentile'], self.config['hedge_delay'])
+        return min(max(delay, lower), upper)
         
-        # 尝试从API获取
-        api_articles = self.get_articles_api()
-        if api_articles:
-            articles.extend(api_articles)
-            
-        # 尝试从HTML页面获取
-        html_articles = self.get_ai_tools()
-        if html_articles:
-            articles.extend(html_articles)
+    def get_all_ai_tools(self, use_backup=True):
+        """
+        获取所有AI工具相关文章
+        
+        参数:
+            use_backup (bool): 没有获取到文章时是否返回备用数据，为False时抛出SourceUnavailable
+        """
+        # 按 fetch_order 先请求API（条目不足时自动翻页），API较慢、失败或条目少于 sufficient_items 时再对冲请求HTML页面
+        fetchers = {
+            'api_articles': self.get_articles_api,
+            'ai_tools': self.get_ai_tools,
+        }
+        articles = hedged_fetch(
+            'sspai',
+            [(name, fetchers[name]) for name in self.config['fetch_order']],
+            max_items=self.config['sufficient_items'],
+            hedge_delay=self._hedge_delay(),
+            budget=self.config['fetch_budget'],
+        )
             
         # 如果还是没有文章，使用备用数据
         if not articles:
+            if not use_backup:
+                raise SourceUnavailable("无法从少数派获取文章", fallback=self._get_backup_ai_tools())
             logger.warning("无法从少数派获取文章，使用备用数据")
             articles = self._get_backup_ai_tools()
         
-        # 去重（基于标题）
+        # 去重（基于标题），保留先返回的一份及其在该端点列表中的名次（rank）
         unique_articles = {}
         for article in articles:
             title = article.get("title", "")
@@ -225,6 +284,10 @@ class SSPAIScraper:
         # 限制返回数量
         return result[:self.config['max_items']]
         
+    def fetch(self, force=False):
+        """统一的数据源接口，没有获取到文章时抛出SourceUnavailable"""
+        return self.get_all_ai_tools(use_backup=False)
+        
     def _get_backup_ai_tools(self):
         """提供一些备用的AI工具数据，防止API失效时没有数据显示"""
         return [
@@ -293,6 +356,10 @@ class SSPAIScraper:
 
 # 测试代码
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
     scraper = SSPAIScraper()
     
     print("获取少数派AI工具文章:")
@@ -3,21 +3,35 @@
 
 """
 TopHub爬虫
-负责抓取今日热榜(tophub.today)的科技相关数据
+负责抓取今日热榜(tophub.today)的数据：
+一次下载首页即可得到首页上所有节点的热榜，并按关键词完成分类；
+首页上没有出现的配置节点再单独抓取
 """
 
-import requests
-import logging
-import random
 import time
+import logging
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from bs4 import BeautifulSoup
 
+from backend.config.data_sources import TOPHUB_CONFIG
+from .rate_limiter import rate_limiter
+from .circuit_breaker import SourceUnavailable
+from .parsing import parse
+from .heat_parser import parse_heat_batch
+from .classifier import get_classifier
+from backend.metrics import PARSE_SECONDS, ITEMS_PARSED
+from backend.shared_cache import get_cache
+from backend.scheduler import source_interval
+
 logger = logging.getLogger('tophub_scraper')
 
 class TopHubScraper:
     """TopHub爬虫类"""
     
     def __init__(self):
+        self.config = TOPHUB_CONFIG
         self.base_url = "https://tophub.today"
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -25,83 +39,400 @@ class TopHubScraper:
             "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
             "Referer": "https://tophub.today/"
         }
-        self.tech_nodes = {
-            "36Kr": "/n/Q1Vd5Ko85R",
-            "虎嗅网": "/n/74Kvx59dkx",
-            "少数派": "/n/Y2KeDGQdNp",
-            "FreeBuf": "/n/NX5pOXVzB7"
-        }
+        self.tech_nodes = self.config['endpoints']
+        self.classifier = get_classifier(self.config['category_keywords'])
+        
+        # 节点级缓存: {来源名称: {"items": [...], "fetched_at": 时间戳}}
+        self.node_cache = {}
+        # 首页缓存: {"categories": {分类: [...]}, "fetched_at": 时间戳}
+        self.homepage_cache = None
+        self.node_cache_lock = threading.Lock()
+    
+    def _node_ttl(self):
+        """
+        节点和首页缓存的有效期：不超过数据源当前的刷新间隔，
+        自适应刷新间隔缩短到 node_ttl 以下时，按时发起的刷新也会真正重新抓取
+        """
+        try:
+            return min(self.config['node_ttl'], source_interval(get_cache(), 'tophub', self.config))
+        except Exception as e:
+            logger.error(f"读取TopHub刷新间隔失败: {e}")
+            return self.config['node_ttl']
+    
+    def _is_node_fresh(self, source_name):
+        """判断节点缓存是否仍在有效期内"""
+        with self.node_cache_lock:
+            entry = self.node_cache.get(source_name)
+        return entry is not None and time.time() - entry["fetched_at"] < self._node_ttl()
     
-    def get_tech_news(self):
-        """获取科技新闻数据"""
+    def _parse_items(self, links, source_name):
+        """解析榜单中的条目链接，热度文本在整个榜单解析完后批量转换"""
         results = []
+        hot_texts = []
+        for item in links[:15]:  # 只取前15条
+            # 新版页面将序号、标题、热度分别放在 .s/.t/.e 中
+            title_elem = item.select_one(".t")
+            title = title_elem.get_text(strip=True) if title_elem else item.text.strip()
+            if not title:
+                continue
+                
+            # 清理标题中的序号和多余空格
+            if not title_elem:
+                title = title.split(".", 1)[-1].strip() if "." in title else title
+            
+            link = item.get("href", "")
+            # 确保链接是完整的URL
+            if link and not (link.startswith("http://") or link.startswith("https://")):
+                if link.startswith("/"):
+                    link = f"{self.base_url}{link}"
+                else:
+                    link = f"https://{link}"
+            
+            # 获取热度值
+            hot_elem = item.select_one(".e") or item.select_one(".cc-cd-cb-ll")
+            hot_texts.append(hot_elem.text if hot_elem else "")
+            
+            # rank 为条目在原始榜单中的名次，排序合并后仍保留，用于记录排名历史
+            results.append({
+                "title": title,
+                "url": link,
+                "hot": 0,
+                "source": source_name,
+                "rank": len(results) + 1
+            })
+        
+        # 无法解析的热度记为0
+        for item, hot in zip(results, parse_heat_batch(hot_texts, default=0)):
+            item["hot"] = hot
+        return results
+    
+    def _match_categories(self, text):
+        """返回文本命中的所有分类"""
+        return self.classifier.match(text)
+    
+    def _parse_homepage(self, html):
+        """
+        单次解析首页：提取每个节点的条目并完成分类
         
-        # 随机选择两个科技媒体抓取
-        selected_nodes = random.sample(list(self.tech_nodes.items()), min(2, len(self.tech_nodes)))
+        返回:
+            tuple: ({节点路径: 条目列表}, {分类: 条目列表})
+        """
+        soup = BeautifulSoup(html, 'html.parser')
+        nodes = {}
+        primary = {category: [] for category in self.config['category_keywords']}
+        secondary = {category: [] for category in self.config['category_keywords']}
         
-        for source_name, node_url in selected_nodes:
-            try:
-                logger.info(f"开始抓取{source_name}热榜数据")
-                url = f"{self.base_url}{node_url}"
-                
-                response = requests.get(url, headers=self.headers, timeout=10)
-                if response.status_code != 200:
-                    logger.warning(f"抓取{source_name}返回状态码: {response.status_code}")
+        for block in soup.select("div.cc-cd"):
+            label_elem = block.select_one(".cc-cd-lb")
+            if not label_elem:
+                continue
+            label = label_elem.get_text(strip=True)
+            
+            node_link = block.select_one(".cc-cd-is a") or label_elem.find_parent("a")
+            node_path = node_link.get("href", "") if node_link else ""
+            
+            items = self._parse_items(block.select(".cc-cd-cb-l a"), label)
+            if node_path:
+                nodes[node_path] = items
+            
+            # 榜单名称决定条目的主分类，标题命中的其他分类作为补充候选
+            block_categories = self._match_categories(label)
+            target_category = block_categories[0] if block_categories else None
+            for item in items:
+                if target_category:
+                    primary[target_category].append(item)
+                for category in self._match_categories(item["title"]):
+                    if category != target_category:
+                        secondary[category].append(item)
+        
+        # 如果某些类别数据不足，用标题命中的条目补足
+        categories = {}
+        for category, items in primary.items():
+            if len(items) < self.config['category_min_items']:
+                seen = {item["url"] for item in items}
+                for item in secondary[category]:
+                    if item["url"] not in seen:
+                        seen.add(item["url"])
+                        items.append(item)
+            categories[category] = items[:self.config['max_items']]
+        
+        return nodes, categories
+    
+    def _parse_node(self, html, source_name):
+        """解析单个节点页面"""
+        soup = BeautifulSoup(html, 'html.parser')
+        return self._parse_items(soup.select(".cc-cd-cb-l a"), source_name)
+    
+    def refresh_homepage(self, force=False):
+        """
+        下载并解析首页，将首页上出现的配置节点写入节点缓存
+
+        返回:
+            bool: 抓取成功返回True，失败返回False，缓存仍有效、没有请求时返回None
+        """
+        ttl = self._node_ttl()
+        with self.node_cache_lock:
+            fresh = not force and self.homepage_cache is not None and \
+                time.time() - self.homepage_cache["fetched_at"] < ttl
+        if fresh:
+            return None
+        
+        try:
+            logger.info("开始抓取TopHub首页")
+            url = f"{self.base_url}{self.config['homepage']}"
+            response = rate_limiter.get(requests, url, headers=self.headers, timeout=15)
+            if response.status_code != 200:
+                logger.warning(f"抓取TopHub首页返回状态码: {response.status_code}")
+                return False
+            
+            with PARSE_SECONDS.time(source='tophub'):
+                nodes, categories = parse('tophub', '_parse_homepage', response.text)
+            ITEMS_PARSED.inc(sum(len(items) for items in nodes.values()), source='tophub')
+            now = time.time()
+            with self.node_cache_lock:
+                self.homepage_cache = {"categories": categories, "fetched_at": now}
+                for source_name, node_path in self.tech_nodes.items():
+                    if node_path in nodes:
+                        items = [dict(item, source=source_name) for item in nodes[node_path]]
+                        self.node_cache[source_name] = {"items": items, "fetched_at": now}
+            logger.info(f"TopHub首页解析完成: {len(nodes)}个节点")
+            return True
+        except Exception as e:
+            logger.error(f"抓取TopHub首页异常: {e}")
+            return False
+    
+    def get_category_data(self, force=False):
+        """获取首页按关键词分类后的数据"""
+        self.refresh_homepage(force=force)
+        return self._cached_categories()
+    
+    def _cached_categories(self):
+        """首页缓存中按关键词分类后的数据，不发起请求"""
+        with self.node_cache_lock:
+            if self.homepage_cache is None:
+                return {category: [] for category in self.config['category_keywords']}
+            return {
+                category: list(items)
+                for category, items in self.homepage_cache["categories"].items()
+            }
+    
+    def _fetch_node(self, source_name, node_url):
+        """抓取单个节点的热榜数据，失败时返回None"""
+        try:
+            logger.info(f"开始抓取{source_name}热榜数据")
+            url = f"{self.base_url}{node_url}"
+            
+            response = rate_limiter.get(requests, url, headers=self.headers, timeout=10)
+            if response.status_code != 200:
+                logger.warning(f"抓取{source_name}返回状态码: {response.status_code}")
+                return None
+            
+            with PARSE_SECONDS.time(source='tophub'):
+                results = parse('tophub', '_parse_node', response.text, source_name)
+            ITEMS_PARSED.inc(len(results), source='tophub')
+            
+            logger.info(f"成功抓取{source_name}热榜数据: {len(results)}条")
+            return results
+            
+        except Exception as e:
+            logger.error(f"抓取{source_name}热榜异常: {e}")
+            return None
+    
+    def _fetched_since(self, source_name, since):
+        """节点缓存是否在since之后写入"""
+        with self.node_cache_lock:
+            entry = self.node_cache.get(source_name)
+        return entry is not None and entry["fetched_at"] >= since
+    
+    def refresh_nodes(self, force=False, refreshed_after=None):
+        """
+        并发抓取所有已过期的节点，未过期的节点沿用缓存
+        
+        参数:
+            force (bool): 忽略节点缓存的有效期，重新抓取
+            refreshed_after (float): 强制刷新时跳过在该时间之后已写入缓存的节点（例如刚从首页解析出的节点）
+
+        返回:
+            tuple: (请求的节点数, 失败的节点数)
+        """
+        stale_nodes = [
+            (source_name, node_url)
+            for source_name, node_url in self.tech_nodes.items()
+            if (force and not (refreshed_after and self._fetched_since(source_name, refreshed_after)))
+            or not self._is_node_fresh(source_name)
+        ]
+        if not stale_nodes:
+            logger.info("TopHub所有节点缓存均有效，跳过抓取")
+            return 0, 0
+        
+        failed = 0
+        max_workers = min(len(stale_nodes), self.config['max_workers'])
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self._fetch_node, source_name, node_url): source_name
+                for source_name, node_url in stale_nodes
+            }
+            for future in as_completed(futures):
+                source_name = futures[future]
+                items = future.result()
+                # 抓取失败时保留旧的节点缓存
+                if items is None:
+                    failed += 1
                     continue
-                
-                soup = BeautifulSoup(response.text, 'html.parser')
-                items = soup.select(".cc-cd-cb-l a")
-                
-                for i, item in enumerate(items[:15]):  # 只取前15条
-                    title = item.text.strip()
-                    if not title:
-                        continue
-                        
-                    # 清理标题中的序号和多余空格
-                    title = title.split(".", 1)[-1].strip() if "." in title else title
-                    
-                    link = item.get("href", "")
-                    # 确保链接是完整的URL
-                    if link and not (link.startswith("http://") or link.startswith("https://")):
-                        if link.startswith("/"):
-                            link = f"{self.base_url}{link}"
-                        else:
-                            link = f"https://{link}"
-                    
-                    # 获取热度值
-                    hot_elem = item.select_one(".cc-cd-cb-ll")
-                    hot = hot_elem.text.strip() if hot_elem else "0"
-                    try:
-                        hot_value = int(hot.replace("万", "0000").replace("k", "000").replace("+", ""))
-                    except ValueError:
-                        hot_value = i * 1000  # 如果无法解析，则使用位置作为热度
-                    
-                    results.append({
-                        "title": title,
-                        "url": link,
-                        "hot": hot_value,
-                        "source": source_name
-                    })
-                
-                logger.info(f"成功抓取{source_name}热榜数据: {len(results)}条")
-                
-                # 随机休眠，避免请求过快
-                time.sleep(random.uniform(1, 3))
-                
-            except Exception as e:
-                logger.error(f"抓取{source_name}热榜异常: {e}")
+                with self.node_cache_lock:
+                    self.node_cache[source_name] = {"items": items, "fetched_at": time.time()}
+        return len(stale_nodes), failed
+    
+    def get_tech_news(self, force=False):
+        """
+        获取科技新闻数据（覆盖所有配置的节点）
+        首页和需要抓取的节点全部请求失败时抛出SourceUnavailable，fallback 为缓存中的旧数据，
+        不把过期的缓存当作新抓取的数据返回
+        """
+        # 先解析首页，首页上已有的节点不再单独请求；强制刷新时首页缺失的节点也重新抓取
+        started = time.time()
+        homepage_ok = self.refresh_homepage(force=force)
+        requested, failed = self.refresh_nodes(force=force, refreshed_after=started)
+        
+        results = []
+        with self.node_cache_lock:
+            for source_name in self.tech_nodes:
+                entry = self.node_cache.get(source_name)
+                if entry:
+                    results.extend(entry["items"])
         
         # 按热度排序
         results.sort(key=lambda x: x.get("hot", 0), reverse=True)
+        if homepage_ok is False and requested and failed == requested:
+            raise SourceUnavailable("TopHub首页和所有节点均抓取失败", fallback=results)
         return results
         
-    def get_all_tech_data(self):
-        """获取所有科技数据"""
-        return self.get_tech_news()
-
+    def get_all_tech_data(self, force=False, use_backup=True):
+        """
+        获取所有科技数据：配置节点的条目加上首页分类为科技的条目
+        
+        参数:
+            force (bool): 是否忽略节点缓存
+            use_backup (bool): 没有获取到数据时是否返回备用数据，为False时抛出SourceUnavailable
+        """
+        try:
+            # get_tech_news 已经刷新过首页，这里直接读取首页缓存
+            articles = self.get_tech_news(force=force)
+            articles.extend(self._cached_categories().get("科技", []))
+        except SourceUnavailable as e:
+            # 本次请求全部失败，缓存中的旧数据只作为备用数据
+            cached = self._merge(e.fallback + self._cached_categories().get("科技", []))
+            if not use_backup:
+                raise SourceUnavailable(str(e), fallback=cached or self._get_backup_tech_data())
+            logger.warning(f"{e}，使用缓存中的旧数据")
+            articles = cached
+        
+        # 如果没有数据，使用备用数据
+        if not articles:
+            if not use_backup:
+                raise SourceUnavailable("无法从TopHub获取数据", fallback=self._get_backup_tech_data())
+            logger.warning("无法从TopHub获取数据，使用备用数据")
+            articles = self._get_backup_tech_data()
+        
+        return self._merge(articles)
+    
+    def _merge(self, articles):
+        """按链接去重后按热度排序，限制条目数"""
+        # 去重（基于链接）
+        unique_articles = {}
+        for article in articles:
+            key = article.get("url") or article.get("title", "")
+            if key and key not in unique_articles:
+                unique_articles[key] = article
+        
+        # 按热度排序
+        result = list(unique_articles.values())
+        result.sort(key=lambda x: x.get("hot", 0), reverse=True)
+        
+        # 限制返回数量
+        return result[:self.config['max_items']]
+    
+    def fetch(self, force=False):
+        """统一的数据源接口，没有获取到数据时抛出SourceUnavailable"""
+        return self.get_all_tech_data(force=force, use_backup=False)
+    
+    def _get_backup_tech_data(self):
+        """提供备用的科技数据，防止抓取失败时没有数据显示"""
+        return [
+            {
+                "title": "苹果发布会定档，将推出新一代M4芯片",
+                "url": "https://example.com/news1",
+                "hot": 9876,
+                "source": "科技媒体"
+            },
+            {
+                "title": "华为Mate70系列即将发布，预计搭载麒麟芯片",
+                "url": "https://example.com/news2",
+                "hot": 8765,
+                "source": "科技媒体"
+            },
+            {
+                "title": "特斯拉推出新型自动驾驶系统，精度提升50%",
+                "url": "https://example.com/news3",
+                "hot": 7654,
+                "source": "科技媒体"
+            },
+            {
+                "title": "谷歌DeepMind发布最新AI研究成果，突破多模态理解",
+                "url": "https://example.com/news4",
+                "hot": 6543,
+                "source": "科技媒体"
+            },
+            {
+                "title": "Meta发布新一代VR设备，更轻更强大",
+                "url": "https://example.com/news5",
+                "hot": 5432,
+                "source": "科技媒体"
+            },
+            {
+                "title": "微软发布Windows 11新版本，大幅提升AI功能",
+                "url": "https://example.com/news6",
+                "hot": 4321,
+                "source": "科技媒体"
+            },
+            {
+                "title": "苹果Vision Pro销量突破百万台",
+                "url": "https://example.com/news7",
+                "hot": 3210,
+                "source": "科技媒体"
+            },
+            {
+                "title": "亚马逊推出新型智能家居设备，集成大模型",
+                "url": "https://example.com/news8",
+                "hot": 2109,
+                "source": "科技媒体"
+            },
+            {
+                "title": "小米汽车SU7预订量超30万台",
+                "url": "https://example.com/news9",
+                "hot": 1987,
+                "source": "科技媒体"
+            },
+            {
+                "title": "NVIDIA发布新一代GPU，性能提升80%",
+                "url": "https://example.com/news10",
+                "hot": 1876,
+                "source": "科技媒体"
+            },
+            {
+                "title": "OpenAI推出最新版GPT-5模型，能力全面超越人类",
+                "url": "https://example.com/news11",
+                "hot": 1765,
+                "source": "科技媒体"
+            },
+            {
+                "title": "量子计算取得重大突破，IBM实现100量子比特稳定运行",
+                "url": "https://example.com/news12",
+                "hot": 1654,
+                "source": "科技媒体"
+            }
+        ]
 
-# 创建单例
-tophub_scraper = TopHubScraper()
 
 # 测试代码
 if __name__ == "__main__":
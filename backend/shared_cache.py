@@ -0,0 +1,350 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+共享缓存
+热搜数据、预测结果和各类别的抓取缓存都通过这里读写，驱动可替换:
+- memory: 进程内LRU，只在单进程部署时使用
+- file: 本地目录，每个键一个文件，同一台机器上的多个进程共享（默认）
+- redis: Redis或兼容服务，多台机器共享；fakeredis 为进程内的模拟实现，用于本地调试
+
+除读写外每个驱动还提供跨进程的锁，保证多个Web进程同一时间只有一个在刷新数据
+"""
+
+import os
+import json
+import mmap
+import time
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from urllib.parse import quote
+
+from backend.config.data_sources import CACHE_CONFIG
+
+logger = logging.getLogger('shared_cache')
+
+
+class MemoryLock:
+    """进程内锁"""
+
+    def __init__(self, lock):
+        self._lock = lock
+
+    def acquire(self, blocking=True, wait_timeout=None):
+        if not blocking:
+            return self._lock.acquire(blocking=False)
+        return self._lock.acquire(timeout=-1 if wait_timeout is None else wait_timeout)
+
+    def release(self):
+        self._lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class _PollingLock:
+    """通过轮询获取的锁，子类实现 _try_acquire/_release；持有超过timeout秒视为持有者已退出"""
+
+    poll_interval = 0.05
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.token = uuid.uuid4().hex
+
+    def acquire(self, blocking=True, wait_timeout=None):
+        deadline = None if wait_timeout is None else time.monotonic() + wait_timeout
+        while True:
+            if self._try_acquire():
+                return True
+            if not blocking or (deadline is not None and time.monotonic() >= deadline):
+                return False
+            time.sleep(self.poll_interval)
+
+    def release(self):
+        self._release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class FileLock(_PollingLock):
+    """基于独占创建锁文件的跨进程锁"""
+
+    def __init__(self, path, timeout):
+        super().__init__(timeout)
+        self.path = path
+
+    def _try_acquire(self):
+        try:
+            fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            # 持有者异常退出时锁文件会残留，超时后清理
+            try:
+                if time.time() - os.stat(self.path).st_mtime > self.timeout:
+                    os.remove(self.path)
+            except OSError:
+                pass
+            return False
+        with os.fdopen(fd, 'w') as f:
+            f.write(self.token)
+        return True
+
+    def _release(self):
+        try:
+            with open(self.path, 'r') as f:
+                if f.read() != self.token:
+                    return
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class RedisLock(_PollingLock):
+    """基于 SET NX PX 的跨进程锁"""
+
+    def __init__(self, client, key, timeout):
+        super().__init__(timeout)
+        self.client = client
+        self.key = key
+
+    def _try_acquire(self):
+        return bool(self.client.set(self.key, self.token, nx=True, px=int(self.timeout * 1000)))
+
+    def _release(self):
+        value = self.client.get(self.key)
+        if value is not None and (value.decode() if isinstance(value, bytes) else value) == self.token:
+            self.client.delete(self.key)
+
+
+class MemoryCache:
+    """进程内LRU缓存"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.locks = {}
+        self.mutex = threading.Lock()
+
+    def get(self, key, default=None):
+        with self.mutex:
+            entry = self.entries.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at is not None and time.time() >= expires_at:
+                del self.entries[key]
+                return default
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self.mutex:
+            self.entries[key] = (value, time.time() + ttl if ttl else None)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.mutex:
+            self.entries.pop(key, None)
+
+    def lock(self, name, timeout=60):
+        with self.mutex:
+            if name not in self.locks:
+                self.locks[name] = threading.Lock()
+            return MemoryLock(self.locks[name])
+
+
+class FileCache:
+    """
+    文件缓存，每个键对应目录下的一个JSON文件
+    写入先写临时文件再替换，读取通过mmap映射文件；文件未变化时直接返回上次解码的结果，
+    因此返回的对象由多次读取共享，调用方不应修改
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.decoded = {}
+        self.mutex = threading.Lock()
+        os.makedirs(self.path, exist_ok=True)
+
+    def _file(self, key):
+        return os.path.join(self.path, f"{quote(key, safe='')}.json")
+
+    def get(self, key, default=None):
+        path = self._file(key)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return default
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self.mutex:
+            cached = self.decoded.get(key)
+        if cached is None or cached[0] != signature:
+            try:
+                with open(path, 'rb') as f:
+                    if stat.st_size == 0:
+                        return default
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        entry = json.loads(mm[:])
+            except (OSError, ValueError) as e:
+                logger.error(f"读取缓存 {key} 失败: {e}")
+                return default
+            cached = (signature, entry)
+            with self.mutex:
+                self.decoded[key] = cached
+
+        entry = cached[1]
+        if entry.get('expires_at') is not None and time.time() >= entry['expires_at']:
+            return default
+        return entry.get('value')
+
+    def set(self, key, value, ttl=None):
+        path = self._file(key)
+        tmp_file = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'value': value, 'expires_at': time.time() + ttl if ttl else None}, f, ensure_ascii=False)
+        os.replace(tmp_file, path)
+
+    def delete(self, key):
+        try:
+            os.remove(self._file(key))
+        except OSError:
+            pass
+        with self.mutex:
+            self.decoded.pop(key, None)
+
+    def lock(self, name, timeout=60):
+        return FileLock(os.path.join(self.path, f"{quote(name, safe='')}.lock"), timeout)
+
+
+class FakeRedis:
+    """进程内的Redis模拟实现，只支持本模块用到的命令"""
+
+    def __init__(self):
+        self.data = {}
+        self.mutex = threading.Lock()
+
+    def _alive(self, key):
+        entry = self.data.get(key)
+        if entry is not None and entry[1] is not None and time.time() >= entry[1]:
+            del self.data[key]
+            return None
+        return entry
+
+    def get(self, key):
+        with self.mutex:
+            entry = self._alive(key)
+            return entry[0] if entry else None
+
+    def set(self, key, value, ex=None, px=None, nx=False):
+        with self.mutex:
+            if nx and self._alive(key) is not None:
+                return None
+            expires_at = None
+            if ex:
+                expires_at = time.time() + ex
+            elif px:
+                expires_at = time.time() + px / 1000.0
+            self.data[key] = (value.encode() if isinstance(value, str) else value, expires_at)
+            return True
+
+    def delete(self, *keys):
+        with self.mutex:
+            return sum(1 for key in keys if self.data.pop(key, None) is not None)
+
+
+class RedisCache:
+    """Redis缓存，值以JSON保存"""
+
+    def __init__(self, client, prefix=''):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url, prefix=''):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("使用redis缓存需要先安装redis: pip install redis")
+        return cls(redis.Redis.from_url(url), prefix)
+
+    def get(self, key, default=None):
+        value = self.client.get(f"{self.prefix}{key}")
+        return default if value is None else json.loads(value)
+
+    def set(self, key, value, ttl=None):
+        payload = json.dumps(value, ensure_ascii=False)
+        self.client.set(f"{self.prefix}{key}", payload, px=int(ttl * 1000) if ttl else None)
+
+    def delete(self, key):
+        self.client.delete(f"{self.prefix}{key}")
+
+    def lock(self, name, timeout=60):
+        return RedisLock(self.client, f"{self.prefix}lock:{name}", timeout)
+
+
+def create_cache(backend=None):
+    """
+    按配置创建缓存驱动
+
+    参数:
+        backend (str): memory/file/redis/fakeredis，默认读取环境变量 CACHE_BACKEND
+    """
+    backend = backend or os.environ.get('CACHE_BACKEND') or CACHE_CONFIG['backend']
+    if backend == 'memory':
+        return MemoryCache(CACHE_CONFIG['memory']['max_entries'])
+    if backend == 'file':
+        return FileCache(os.environ.get('CACHE_PATH') or CACHE_CONFIG['file']['path'])
+    if backend == 'redis':
+        url = os.environ.get('REDIS_URL') or CACHE_CONFIG['redis']['url']
+        return RedisCache.from_url(url, CACHE_CONFIG['redis']['prefix'])
+    if backend == 'fakeredis':
+        return RedisCache(FakeRedis(), CACHE_CONFIG['redis']['prefix'])
+    raise ValueError(f"未知的缓存驱动: {backend}")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """获取进程内共享的缓存驱动（首次使用时创建）"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = create_cache()
+    return _cache
+
+
+def publish(store, name, value, ttl=None):
+    """写入带版本号的条目，其他进程比较版本号即可判断数据是否变化，返回新版本号"""
+    version = uuid.uuid4().hex
+    store.set(name, value, ttl)
+    store.set(f"{name}:version", version, ttl)
+    return version
+
+
+def read_if_changed(store, name, known_version):
+    """
+    版本号变化时读取条目
+
+    返回:
+        tuple: (版本号, 数据)，没有变化或不存在时数据为None
+    """
+    version = store.get(f"{name}:version")
+    if version is None or version == known_version:
+        return known_version, None
+    return version, store.get(name)
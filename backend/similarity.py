@@ -0,0 +1,461 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+话题相似度索引
+用哈希字符 n-gram 的 TF-IDF 向量表示标题（纯CPU，不需要模型），相似度为余弦值，
+不同来源中改写过的同一话题、预测与之后真实出现的热搜都可以通过它匹配。
+
+向量保存在内存映射文件中（固定容量，写满后覆盖最早的条目），爬虫管理器每次保存类别数据后增量加入；
+覆盖条目时同时从文档频率中减去被覆盖条目的 n-gram，文档频率始终对应当前保存的条目。
+条目信息的变化追加到日志文件，日志积累到一定条数后才改写整个 meta.json。
+查询先用随机超平面LSH找出候选再精确排序，多个进程共用同一份文件。需要安装 numpy（可选依赖）
+"""
+
+import os
+import re
+import json
+import time
+import zlib
+import logging
+import threading
+import unicodedata
+
+from backend.config.data_sources import SIMILARITY_CONFIG
+from backend.rank_history import item_key
+from backend.shared_cache import FileLock
+
+logger = logging.getLogger('similarity')
+
+# 只保留文字和数字
+_NON_WORD = re.compile(r'[\W_]+', re.UNICODE)
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError("使用话题相似度索引需要先安装numpy: pip install numpy")
+    return numpy
+
+
+def normalize_text(text):
+    """全角转半角、转小写并去掉标点和空白"""
+    return _NON_WORD.sub('', unicodedata.normalize('NFKC', text or '').lower())
+
+
+def ngrams(text, sizes=(2, 3)):
+    """文本的字符 n-gram，文本短于n时使用整个文本"""
+    text = normalize_text(text)
+    grams = []
+    for n in sizes:
+        if len(text) < n:
+            if text and n == sizes[0]:
+                grams.append(text)
+            continue
+        grams.extend(text[i:i + n] for i in range(len(text) - n + 1))
+    return grams
+
+
+def hash_features(text, dim):
+    """n-gram 哈希到 [0, dim) 的下标和符号（±1，减少哈希冲突造成的偏差）"""
+    indices = []
+    signs = []
+    for gram in ngrams(text):
+        h = zlib.crc32(gram.encode('utf-8'))
+        indices.append(h % dim)
+        signs.append(1.0 if (h >> 31) & 1 else -1.0)
+    return indices, signs
+
+
+class TopicIndex:
+    """
+    话题相似度索引
+
+    文件（位于 path 目录下）:
+        vectors.f32: (容量, 维度) 的 float32 矩阵，每行是归一化后的 TF-IDF 向量
+        codes.u8: (容量, LSH表数) 的 uint8 矩阵，每行是向量在各表中的桶编号
+        meta.json: 各行对应的条目、文档频率和版本号（快照）
+        meta.log: 快照之后的变化，每行一条记录（写入的行或一次重算），带快照的代数，
+            与当前快照代数不同的记录已包含在快照中
+    """
+
+    def __init__(self, path=None):
+        self.np = _numpy()
+        self.path = str(path or SIMILARITY_CONFIG['path'])
+        self.dim = SIMILARITY_CONFIG['dim']
+        self.capacity = SIMILARITY_CONFIG['capacity']
+        self.tables = SIMILARITY_CONFIG['lsh_tables']
+        self.bits = SIMILARITY_CONFIG['lsh_bits']
+
+        rng = self.np.random.default_rng(SIMILARITY_CONFIG['seed'])
+        self.planes = rng.standard_normal((self.dim, self.tables * self.bits)).astype(self.np.float32)
+        self.bit_weights = (1 << self.np.arange(self.bits)).astype(self.np.int64)
+
+        self.mutex = threading.Lock()
+        self.meta = None
+        self.meta_signature = None
+        # 已读取的日志位置和快照之后日志中的行数
+        self.log_offset = 0
+        self.logged_rows = 0
+        self.keys = {}
+        self.vectors = None
+        self.codes = None
+        # 各LSH表按桶编号排序后的行号及对应的桶编号，数据变化后查询时重建
+        self.buckets = None
+
+    # ---- 文件 ----
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _empty_meta(self):
+        return {
+            'dim': self.dim,
+            'capacity': self.capacity,
+            'version': 0,
+            'next': 0,
+            'rows': [],
+            'df': [0] * self.dim,
+            'docs': 0,
+            'weighted_docs': 0,
+            # 上次重算之后写入的条目数
+            'changed': 0,
+            # 快照的代数，每次改写 meta.json 加一
+            'generation': 0,
+        }
+
+    def _open_arrays(self):
+        np = self.np
+        os.makedirs(self.path, exist_ok=True)
+        arrays = []
+        for name, dtype, columns in (('vectors.f32', np.float32, self.dim), ('codes.u8', np.uint8, self.tables)):
+            path = self._file(name)
+            expected = self.capacity * columns * np.dtype(dtype).itemsize
+            if not os.path.exists(path) or os.path.getsize(path) != expected:
+                arrays.append(np.memmap(path, dtype=dtype, mode='w+', shape=(self.capacity, columns)))
+            else:
+                arrays.append(np.memmap(path, dtype=dtype, mode='r+', shape=(self.capacity, columns)))
+        self.vectors, self.codes = arrays
+
+    def _load(self):
+        """meta.json 或日志变化时重新加载，返回是否有变化"""
+        path = self._file('meta.json')
+        try:
+            stat = os.stat(path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            signature = None
+        if signature == self.meta_signature and self.meta is not None:
+            return self._catch_up()
+
+        meta = None
+        if signature is not None:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.error(f"读取相似度索引失败，将重新建立: {e}")
+        if not meta or meta.get('dim') != self.dim or meta.get('capacity') != self.capacity:
+            meta = self._empty_meta()
+        meta.setdefault('changed', meta['docs'] - meta['weighted_docs'])
+        meta.setdefault('generation', 0)
+
+        if self.vectors is None:
+            self._open_arrays()
+        self.meta = meta
+        self.meta_signature = signature
+        self.log_offset = 0
+        self.logged_rows = 0
+        self.keys = {row['key']: i for i, row in enumerate(meta['rows'])}
+        self._catch_up()
+        self.buckets = None
+        return True
+
+    def _catch_up(self):
+        """应用其他进程追加到日志的记录，返回是否有变化；日志被截断（快照已改写）时重新加载"""
+        path = self._file('meta.log')
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+        if size < self.log_offset:
+            self.meta = None
+            return self._load()
+        if size == self.log_offset:
+            return False
+
+        with open(path, 'rb') as f:
+            f.seek(self.log_offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    # 其他进程正在写入的半行，下次再读
+                    break
+                self.log_offset += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    logger.error(f"相似度索引日志损坏，已跳过: {e}")
+                    continue
+                if record.get('generation') == self.meta['generation']:
+                    self._apply(record)
+        self.buckets = None
+        return True
+
+    def _apply(self, record):
+        """应用一条日志记录：写入环形缓冲区的行（更新文档频率），或一次全部重算"""
+        meta = self.meta
+        if record.get('reweight'):
+            self._recount()
+            meta['weighted_docs'] = meta['docs']
+            meta['changed'] = 0
+        for position, row in record.get('rows', []):
+            if position < len(meta['rows']):
+                # 被覆盖的条目不再计入文档频率
+                evicted = meta['rows'][position]
+                self.keys.pop(evicted['key'], None)
+                for index in set(hash_features(evicted['title'], self.dim)[0]):
+                    meta['df'][index] -= 1
+                meta['docs'] -= 1
+                meta['rows'][position] = row
+            else:
+                meta['rows'].append(row)
+            self.keys[row['key']] = position
+            for index in set(hash_features(row['title'], self.dim)[0]):
+                meta['df'][index] += 1
+            meta['docs'] += 1
+            meta['changed'] += 1
+            meta['next'] = (position + 1) % self.capacity
+            self.logged_rows += 1
+        meta['version'] = record.get('version', meta['version'])
+
+    def _append(self, record):
+        """追加一条日志记录并应用到内存中的元数据"""
+        self.meta['version'] += 1
+        record = dict(record, generation=self.meta['generation'], version=self.meta['version'])
+        line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+        with open(self._file('meta.log'), 'ab') as f:
+            f.write(line)
+        self.log_offset += len(line)
+        self._apply(record)
+
+    def _save(self):
+        """日志中的行数超过 meta_log_rows 后改写 meta.json 快照并清空日志"""
+        self.vectors.flush()
+        self.codes.flush()
+        if self.logged_rows < SIMILARITY_CONFIG['meta_log_rows']:
+            return
+        self.meta['generation'] += 1
+        path = self._file('meta.json')
+        tmp_file = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f, ensure_ascii=False)
+        os.replace(tmp_file, path)
+        stat = os.stat(path)
+        self.meta_signature = (stat.st_mtime_ns, stat.st_size)
+        # 快照之后再清空日志，其他进程在此之间读到的旧记录代数不同，不会重复应用
+        open(self._file('meta.log'), 'wb').close()
+        self.log_offset = 0
+        self.logged_rows = 0
+
+    # ---- 向量 ----
+
+    def _idf(self):
+        np = self.np
+        df = np.asarray(self.meta['df'], dtype=np.float32)
+        return np.log((1 + self.meta['docs']) / (1 + df)) + 1
+
+    def _embed(self, features, idf):
+        np = self.np
+        indices, signs = features
+        vector = np.bincount(indices, weights=signs, minlength=self.dim).astype(np.float32) if indices \
+            else np.zeros(self.dim, dtype=np.float32)
+        vector *= idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _lsh_codes(self, vectors):
+        """向量在各LSH表中的桶编号"""
+        bits = (vectors @ self.planes > 0).reshape(len(vectors), self.tables, self.bits)
+        return (bits.astype(self.np.int64) @ self.bit_weights).astype(self.np.uint8)
+
+    def embed(self, text):
+        """计算文本的向量（使用当前的文档频率）"""
+        with self.mutex:
+            self._load()
+            return self._embed(hash_features(text, self.dim), self._idf())
+
+    def _recount(self):
+        """按当前保存的所有条目重新统计文档频率"""
+        np = self.np
+        rows = self.meta['rows']
+        df = np.zeros(self.dim, dtype=np.int64)
+        for row in rows:
+            df[list(set(hash_features(row['title'], self.dim)[0]))] += 1
+        self.meta['df'] = df.tolist()
+        self.meta['docs'] = len(rows)
+
+    def _reweight(self):
+        """按当前保存的所有条目重新统计文档频率并重算全部向量"""
+        np = self.np
+        self._append({'reweight': True})
+        rows = self.meta['rows']
+        features = [hash_features(row['title'], self.dim) for row in rows]
+        if rows:
+            idf = self._idf()
+            vectors = np.stack([self._embed(f, idf) for f in features])
+            self.vectors[:len(rows)] = vectors
+            self.codes[:len(rows)] = self._lsh_codes(vectors)
+        logger.info(f"已重算相似度索引的全部向量: {len(rows)} 条")
+
+    def add(self, items, category=None):
+        """
+        加入条目（按规范化后的链接去重），返回新加入的条数
+        多个进程通过文件锁依次写入
+        """
+        np = self.np
+        os.makedirs(self.path, exist_ok=True)
+        lock = FileLock(self._file('index.lock'), SIMILARITY_CONFIG['lock_timeout'])
+        with self.mutex, lock:
+            self._load()
+            meta = self.meta
+            now = time.time()
+
+            new_rows = []
+            new_features = []
+            seen = set()
+            for item in items:
+                key = item_key(item)
+                title = item.get('title', '')
+                if not title or key in self.keys or key in seen:
+                    continue
+                seen.add(key)
+                new_rows.append({
+                    'key': key,
+                    'title': title,
+                    'url': item.get('url', ''),
+                    'source': item.get('source', ''),
+                    'category': category,
+                    'added_at': now,
+                })
+                new_features.append(hash_features(title, self.dim))
+            if not new_rows:
+                return 0
+
+            # 写入环形缓冲区，写满后覆盖最早的条目（同时减去其文档频率）
+            positions = [(meta['next'] + i) % self.capacity for i in range(len(new_rows))]
+            self._append({'rows': [[position, row] for position, row in zip(positions, new_rows)]})
+
+            if meta['changed'] >= max(meta['weighted_docs'], SIMILARITY_CONFIG['min_reweight_docs']):
+                # 上次重算之后写入的条目数达到当时的文档数，文档频率变化较大，重算全部向量（均摊下来每条只算常数次）
+                self._reweight()
+            else:
+                idf = self._idf()
+                vectors = np.stack([self._embed(f, idf) for f in new_features])
+                self.vectors[positions] = vectors
+                self.codes[positions] = self._lsh_codes(vectors)
+
+            self._save()
+            self.buckets = None
+            return len(new_rows)
+
+    # ---- 查询 ----
+
+    def _build_buckets(self):
+        np = self.np
+        count = len(self.meta['rows'])
+        codes = np.asarray(self.codes[:count])
+        buckets = []
+        for table in range(self.tables):
+            order = np.argsort(codes[:, table], kind='stable')
+            buckets.append((order, codes[order, table]))
+        self.buckets = buckets
+
+    def _candidates(self, vector):
+        """LSH各表中与查询向量同桶的行"""
+        np = self.np
+        if self.buckets is None:
+            self._build_buckets()
+        query_codes = self._lsh_codes(vector[None, :])[0]
+        found = []
+        for table, (order, sorted_codes) in enumerate(self.buckets):
+            code = query_codes[table]
+            lo = np.searchsorted(sorted_codes, code, side='left')
+            hi = np.searchsorted(sorted_codes, code, side='right')
+            found.append(order[lo:hi])
+        return np.unique(np.concatenate(found)) if found else np.arange(0)
+
+    def search(self, text, k=10, category=None, min_score=0.0, exact=False):
+        """
+        查找与文本最相似的条目
+
+        参数:
+            text (str): 查询文本
+            k (int): 最多返回的条数
+            category (str): 只返回该类别的条目
+            min_score (float): 最低余弦相似度
+            exact (bool): 不使用LSH，与全部条目比较
+
+        返回:
+            list: [{"title", "url", "source", "category", "score"}]，按相似度降序
+        """
+        np = self.np
+        with self.mutex:
+            self._load()
+            rows = self.meta['rows']
+            if not rows:
+                return []
+            vector = self._embed(hash_features(text, self.dim), self._idf())
+            if not vector.any():
+                return []
+
+            if exact or len(rows) <= SIMILARITY_CONFIG['exact_search_below']:
+                candidates = np.arange(len(rows))
+                # 连续的切片直接在映射的内存上计算，不复制向量
+                scores = self.vectors[:len(rows)] @ vector
+            else:
+                candidates = self._candidates(vector)
+                scores = np.asarray(self.vectors[candidates]) @ vector
+            if category is not None:
+                keep = np.array([rows[i]['category'] == category for i in candidates], dtype=bool)
+                candidates, scores = candidates[keep], scores[keep]
+            if not len(candidates):
+                return []
+
+            top = min(k, len(candidates))
+            best = np.argpartition(-scores, top - 1)[:top]
+            best = best[np.argsort(-scores[best])]
+
+            results = []
+            for i in best:
+                score = float(scores[i])
+                if score < min_score:
+                    break
+                row = rows[int(candidates[i])]
+                results.append({
+                    'title': row['title'],
+                    'url': row['url'],
+                    'source': row['source'],
+                    'category': row['category'],
+                    'score': round(score, 4),
+                })
+            return results
+
+    def __len__(self):
+        with self.mutex:
+            self._load()
+            return len(self.meta['rows'])
+
+
+_topic_index = None
+_topic_index_lock = threading.Lock()
+
+
+def get_topic_index():
+    """获取话题相似度索引单例，没有安装numpy时抛出RuntimeError"""
+    global _topic_index
+    if _topic_index is None:
+        with _topic_index_lock:
+            if _topic_index is None:
+                _topic_index = TopicIndex()
+    return _topic_index
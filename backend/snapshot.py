@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+热搜数据快照
+抓取结果以JSON文件的形式保存，Web进程启动时加载；使用独立抓取进程时，
+抓取进程写入快照，Web进程在快照更新后重新加载
+
+另外按天归档当天出现过的所有条目（temp/history/YYYY-MM-DD.json），用于回测预测策略
+"""
+
+import os
+import json
+from datetime import datetime, timedelta
+
+from backend.config.data_sources import TEMP_DIR, BACKTEST_CONFIG
+from backend.rank_history import item_key
+from backend.shared_cache import FileLock
+
+# 默认快照文件
+SNAPSHOT_FILE = str(TEMP_DIR / "hot_data_snapshot.json")
+
+# 按天归档的目录
+HISTORY_DIR = BACKTEST_CONFIG['history_dir']
+
+DAY_FORMAT = "%Y-%m-%d"
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def write_snapshot(hot_data, updated_at, path=SNAPSHOT_FILE):
+    """原子地写入快照，读取方不会读到写了一半的文件"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_file = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump({
+            "hot_data": hot_data,
+            "updated_at": updated_at.strftime(TIME_FORMAT) if updated_at else None
+        }, f, ensure_ascii=False)
+    os.replace(tmp_file, path)
+
+
+def read_snapshot(path=SNAPSHOT_FILE):
+    """
+    读取快照
+
+    返回:
+        tuple: (热搜数据, 更新时间)，快照不存在时返回 (None, None)
+    """
+    if not os.path.exists(path):
+        return None, None
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    updated_at = data.get("updated_at")
+    return data.get("hot_data", {}), datetime.strptime(updated_at, TIME_FORMAT) if updated_at else None
+
+
+def snapshot_mtime(path=SNAPSHOT_FILE):
+    """快照文件的修改时间，文件不存在时返回None"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _heat(item):
+    """归档排序依据：先按归一化热度 heat_score（不同来源可比），没有时按原始热度"""
+    score = item.get("heat_score")
+    hot = item.get("hot", 0)
+    return (
+        score if isinstance(score, (int, float)) else -1,
+        hot if isinstance(hot, (int, float)) else 0,
+    )
+
+
+def archive_snapshot(hot_data, updated_at, history_dir=HISTORY_DIR):
+    """
+    把热搜数据并入当天的归档：同一条目（按规范化后的链接）只保留一份，
+    取当天 heat_score 最高的一次，并记录首次出现的时间；超过保留天数的归档会被删除。
+    Web进程和抓取进程都会写入归档，读取、合并和写入在文件锁内完成
+    """
+    os.makedirs(history_dir, exist_ok=True)
+    lock = FileLock(os.path.join(history_dir, "archive.lock"), BACKTEST_CONFIG['archive_lock_timeout'])
+    with lock:
+        _archive(hot_data, updated_at or datetime.now(), history_dir)
+
+
+def _archive(hot_data, updated_at, history_dir):
+    path = os.path.join(history_dir, f"{updated_at.strftime(DAY_FORMAT)}.json")
+    archived = {}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            archived = json.load(f).get("hot_data", {})
+
+    seen_at = updated_at.strftime(TIME_FORMAT)
+    for category, items in hot_data.items():
+        merged = {item_key(item): item for item in archived.get(category, [])}
+        for item in items:
+            key = item_key(item)
+            previous = merged.get(key)
+            if previous is None:
+                merged[key] = dict(item, first_seen=seen_at)
+            elif _heat(item) > _heat(previous):
+                merged[key] = dict(item, first_seen=previous.get("first_seen", seen_at))
+        # 回测中排名靠前的条目视为更热，按跨来源可比的 heat_score 排列
+        archived[category] = sorted(merged.values(), key=_heat, reverse=True)
+
+    write_snapshot(archived, updated_at, path)
+
+    cutoff = (updated_at - timedelta(days=BACKTEST_CONFIG['retention_days'])).strftime(DAY_FORMAT)
+    for filename in os.listdir(history_dir):
+        if filename.endswith(".json") and filename[:-5] < cutoff:
+            try:
+                os.remove(os.path.join(history_dir, filename))
+            except OSError:
+                pass
+
+
+def list_archives(history_dir=HISTORY_DIR):
+    """按日期排序的归档列表 [(日期字符串, 文件路径)]"""
+    if not os.path.isdir(history_dir):
+        return []
+    days = []
+    for filename in sorted(os.listdir(history_dir)):
+        if not filename.endswith(".json"):
+            continue
+        try:
+            datetime.strptime(filename[:-5], DAY_FORMAT)
+        except ValueError:
+            continue
+        days.append((filename[:-5], os.path.join(history_dir, filename)))
+    return days
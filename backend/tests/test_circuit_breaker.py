@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+熔断器状态机的测试
+CLOSED -> OPEN（连续失败达到阈值） -> HALF_OPEN（到了恢复时间，只放行一个试探请求）
+-> CLOSED（试探成功）或 OPEN（试探失败，等待时间翻倍，不超过上限）
+
+运行:
+    python -m pytest backend/tests
+"""
+
+import pytest
+
+from backend.scrapers import circuit_breaker
+from backend.scrapers.circuit_breaker import CircuitBreaker, CLOSED, HALF_OPEN, OPEN
+
+
+class FakeTime:
+    """替换熔断器模块中的 time，由测试推进时间"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(circuit_breaker, 'time', fake)
+    return fake
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker('test', failure_threshold=2, recovery_timeout=10, max_recovery_timeout=25)
+
+
+def open_breaker(breaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+
+def test_opens_after_threshold(breaker):
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+    assert breaker.retry_in() == pytest.approx(10)
+    assert not breaker.probe_due()
+
+
+def test_success_resets_failure_count(breaker):
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+def test_half_open_allows_a_single_probe(breaker, clock):
+    open_breaker(breaker)
+    clock.advance(10)
+    assert breaker.probe_due()
+    assert breaker.allow_request()
+    assert breaker.state == HALF_OPEN
+    # 试探进行中，其他请求仍被拒绝
+    assert not breaker.allow_request()
+    assert not breaker.probe_due()
+
+
+def test_successful_probe_closes(breaker, clock):
+    open_breaker(breaker)
+    clock.advance(10)
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.failures == 0
+    assert breaker.allow_request()
+
+
+def test_failed_probe_doubles_recovery_timeout_up_to_max(breaker, clock):
+    open_breaker(breaker)
+    for expected in (20, 25, 25):
+        clock.advance(breaker.recovery_timeout)
+        assert breaker.allow_request()
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert breaker.recovery_timeout == expected
+        clock.advance(expected - 1)
+        assert not breaker.allow_request()
+        clock.advance(-(expected - 1))
+
+
+def test_recovery_timeout_resets_after_success(breaker, clock):
+    open_breaker(breaker)
+    clock.advance(10)
+    breaker.allow_request()
+    breaker.record_failure()
+    clock.advance(20)
+    breaker.allow_request()
+    breaker.record_success()
+    assert breaker.recovery_timeout == 10
+
+    open_breaker(breaker)
+    assert breaker.retry_in() == pytest.approx(10)
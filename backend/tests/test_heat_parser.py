@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+热度字符串解析的性质测试
+用固定种子随机生成数字、单位、千分位、全角字符和前后缀的组合，检查解析结果与生成时的数值一致；
+不含数字的文本和负数返回默认值，批量解析与逐条解析结果相同
+
+运行:
+    python -m pytest backend/tests
+"""
+
+import random
+
+import pytest
+
+from backend.scrapers.heat_parser import UNITS, parse_heat, parse_heat_batch
+
+CASES = 2000
+DEFAULT = object()
+
+PREFIXES = ['', '热度', '热度 ', '热度：', '热度:', '🔥 ', ' ']
+SUFFIXES = ['', '+', '热度', ' 热度', '+热度', ' ']
+UNIT_SPELLINGS = {
+    '': [''],
+    'k': ['k', 'K'],
+    '千': ['千'],
+    'w': ['w', 'W'],
+    '万': ['万'],
+    'm': ['m', 'M'],
+    '百万': ['百万'],
+    '亿': ['亿'],
+}
+# 不含数字的文本，以及数字不构成热度的字符
+JUNK_ALPHABET = 'abcxyz热度万亿千+-.,:： 　🔥榜单新标题'
+
+_TO_FULLWIDTH = str.maketrans('0123456789.,+', '０１２３４５６７８９．，＋')
+
+
+def expected_value(number, unit):
+    value = number * UNITS[unit]
+    return int(round(value)) if value.is_integer() or value >= 1 else value
+
+
+def with_thousands(digits):
+    """整数部分加上千分位"""
+    integer, dot, fraction = digits.partition('.')
+    groups = []
+    while len(integer) > 3:
+        groups.insert(0, integer[-3:])
+        integer = integer[:-3]
+    groups.insert(0, integer)
+    return ','.join(groups) + dot + fraction
+
+
+def random_number(rng):
+    """随机的整数或一到两位小数，返回 (数值, 文本)"""
+    integer = rng.choice([rng.randint(0, 9), rng.randint(10, 999), rng.randint(1000, 10 ** 7)])
+    decimals = rng.choice([0, 0, 1, 2])
+    if decimals:
+        fraction = rng.randint(0, 10 ** decimals - 1)
+        text = f"{integer}.{fraction:0{decimals}d}"
+    else:
+        text = str(integer)
+    return float(text), text
+
+
+def random_heat_text(rng):
+    """随机的热度文本，返回 (文本, 期望值)"""
+    number, digits = random_number(rng)
+    unit = rng.choice(list(UNITS))
+    if '.' not in digits and rng.random() < 0.3:
+        digits = with_thousands(digits)
+    text = rng.choice(PREFIXES) + digits + rng.choice(['', ' ']) + rng.choice(UNIT_SPELLINGS[unit]) + rng.choice(SUFFIXES)
+    if rng.random() < 0.3:
+        text = text.translate(_TO_FULLWIDTH)
+    return text, expected_value(number, unit)
+
+
+def test_formatted_numbers_round_trip():
+    rng = random.Random(0)
+    for _ in range(CASES):
+        text, expected = random_heat_text(rng)
+        assert parse_heat(text) == expected, text
+
+
+def test_batch_matches_single():
+    rng = random.Random(1)
+    texts = [random_heat_text(rng)[0] for _ in range(CASES)]
+    texts += ['', '暂无', '-5', '1.2e5', '12K+', '3 min'] * 3
+    assert parse_heat_batch(texts, default=0) == [parse_heat(text, default=0) for text in texts]
+
+
+def test_junk_falls_back_to_default():
+    rng = random.Random(2)
+    for _ in range(CASES):
+        text = ''.join(rng.choice(JUNK_ALPHABET) for _ in range(rng.randint(0, 12)))
+        assert parse_heat(text, default=DEFAULT) is DEFAULT, text
+        assert parse_heat_batch([text], default=DEFAULT)[0] is DEFAULT, text
+
+
+@pytest.mark.parametrize('text', ['-5', '-1.5万', '热度 -3万', '热度：-12', '－５', '−7', '- 8k'])
+def test_negative_numbers_are_rejected(text):
+    assert parse_heat(text, default=DEFAULT) is DEFAULT
+    assert parse_heat_batch([text], default=DEFAULT)[0] is DEFAULT
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('1.2e5', 120000),
+    ('1E3', 1000),
+    ('3e2万', 3000000),
+    ('热度 2.5e3', 2500),
+    ('１．２ｅ３', 1200),
+    ('1e-3', 0.001),
+])
+def test_exponent_forms(text, expected):
+    assert parse_heat(text) == expected
+    assert parse_heat_batch([text]) == [expected]
+
+
+@pytest.mark.parametrize('text', ['1e400', '9' * 400])
+def test_out_of_range_falls_back_to_default(text):
+    assert parse_heat(text, default=DEFAULT) is DEFAULT
+    assert parse_heat_batch([text], default=DEFAULT)[0] is DEFAULT
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('Top-5 热度', 5),
+    ('3 min', 3),
+    ('99万热度', 990000),
+    ('2.5亿', 250000000),
+    ('1,234', 1234),
+])
+def test_hyphen_and_letters_after_numbers(text, expected):
+    assert parse_heat(text) == expected
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+排名历史的测试
+按来源记录原始名次，rising 返回窗口内名次上升最多的条目，其他实例（对应其他进程）读取同一份记录
+
+运行:
+    python -m pytest backend/tests
+"""
+
+from backend.rank_history import RankHistory, normalize_url
+
+T0 = 1_000_000.0
+
+
+def board(*titles):
+    """按列表顺序生成带原始名次的条目"""
+    return [
+        {'title': title, 'url': f'https://example.com/{title}', 'rank': rank}
+        for rank, title in enumerate(titles, 1)
+    ]
+
+
+def titles(entries):
+    return [entry['title'] for entry in entries]
+
+
+def test_rising_compares_with_rank_at_window_start(tmp_path):
+    history = RankHistory(tmp_path)
+    history.record('知乎', board('a', 'b', 'c'), ts=T0)
+    history.record('知乎', board('c', 'a', 'b'), ts=T0 + 100)
+
+    rising = history.rising('知乎', window=50, now=T0 + 100)
+    assert titles(rising) == ['c']
+    assert rising[0]['rank'] == 1
+    assert rising[0]['previous_rank'] == 3
+    assert rising[0]['rank_delta'] == 2
+    assert not rising[0]['entered']
+
+    # 窗口起点早于第一次记录时所有条目都视为新上榜
+    assert all(entry['entered'] for entry in history.rising('知乎', window=1000, now=T0 + 100))
+
+
+def test_new_entries_rise_from_outside_the_board(tmp_path):
+    history = RankHistory(tmp_path)
+    history.record('知乎', board('a', 'b', 'c'), ts=T0)
+    history.record('知乎', board('d', 'a', 'b'), ts=T0 + 100)
+
+    rising = history.rising('知乎', window=50, now=T0 + 100)
+    assert titles(rising) == ['d']
+    assert rising[0]['entered']
+    assert rising[0]['previous_rank'] is None
+    # 从当前最低名次之后（第4名）升到第1名
+    assert rising[0]['rank_delta'] == 3
+
+
+def test_native_ranks_are_used_instead_of_list_order(tmp_path):
+    history = RankHistory(tmp_path)
+    items = board('a', 'b', 'c')
+    history.record('知乎', items, ts=T0)
+    # 类别列表按热度重新排序，原始名次不变
+    history.record('知乎', list(reversed(items)), ts=T0 + 100)
+    assert history.rising('知乎', window=50, now=T0 + 100) == []
+
+
+def test_limit_and_tie_break_by_rank(tmp_path):
+    history = RankHistory(tmp_path)
+    history.record('知乎', board('a', 'b', 'c', 'd'), ts=T0)
+    history.record('知乎', board('c', 'd', 'a', 'b'), ts=T0 + 100)
+    assert titles(history.rising('知乎', window=50, limit=1, now=T0 + 100)) == ['c']
+    assert titles(history.rising('知乎', window=50, now=T0 + 100)) == ['c', 'd']
+
+
+def test_sources_are_kept_apart_and_shared_across_instances(tmp_path):
+    writer = RankHistory(tmp_path)
+    writer.record('知乎', board('a', 'b'), ts=T0, category='科技')
+    writer.record('微博', board('x', 'y'), ts=T0, category='科技')
+    writer.record('脉脉热门', board('m'), ts=T0, category='大厂八卦职场新闻')
+    writer.record('知乎', board('b', 'a'), ts=T0 + 100, category='科技')
+
+    reader = RankHistory(tmp_path)
+    assert reader.sources() == ['微博', '知乎', '脉脉热门']
+    assert reader.sources('科技') == ['微博', '知乎']
+    assert titles(reader.rising('知乎', window=50, now=T0 + 100)) == ['b']
+    assert reader.rising('微博', window=50, now=T0 + 100) == []
+    assert reader.trajectory('知乎', 'https://example.com/b') == [(T0, 2), (T0 + 100, 1)]
+
+
+def test_urls_are_normalized():
+    assert normalize_url('HTTPS://Example.com/a/?utm_source=x&b=2&a=1#top') == 'https://example.com/a?a=1&b=2'
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+刷新调度的测试
+到期类别的排列顺序、请求计数的半衰期衰减，以及自适应刷新间隔在范围边界处的加倍和减半
+
+运行:
+    python -m pytest backend/tests
+"""
+
+import pytest
+
+from backend.config.data_sources import SCHEDULER_CONFIG
+from backend.scheduler import RefreshScheduler, TrafficCounter, _decayed, source_interval
+from backend.shared_cache import MemoryCache
+
+NOW = 1_000_000.0
+HALF_LIFE = SCHEDULER_CONFIG['traffic_half_life']
+
+MAPPING = {
+    'a': {'source': 'sa', 'config': {'update_interval': 600, 'update_interval_bounds': (300, 2400)}},
+    'b': {'source': 'sb', 'config': {'update_interval': 600}},
+    'c': {'source': 'sc', 'config': {'update_interval': 600}},
+}
+
+
+def make_scheduler(elapsed):
+    """elapsed: {类别: 距上次抓取的秒数}"""
+    store = MemoryCache()
+    return store, RefreshScheduler(store, lambda category: NOW - elapsed[category], MAPPING)
+
+
+def planned(scheduler):
+    return [(entry['category'], entry['due']) for entry in scheduler.plan(now=NOW)]
+
+
+def test_due_categories_first_by_overdue():
+    _, scheduler = make_scheduler({'a': 1200, 'b': 900, 'c': 100})
+    assert planned(scheduler) == [('a', True), ('b', True), ('c', False)]
+
+
+def test_traffic_and_volatility_raise_priority():
+    store, scheduler = make_scheduler({'a': 1200, 'b': 900, 'c': 100})
+    store.set('traffic:b', {'count': 1000, 'at': NOW})
+    assert planned(scheduler) == [('b', True), ('a', True), ('c', False)]
+
+    store.set('volatility:a', 1.0)
+    store.set('traffic:b', {'count': 2, 'at': NOW})
+    assert planned(scheduler)[0] == ('a', True)
+
+
+def test_busy_category_that_is_not_due_stays_last():
+    store, scheduler = make_scheduler({'a': 1200, 'b': 900, 'c': 100})
+    store.set('traffic:c', {'count': 10 ** 6, 'at': NOW})
+    store.set('volatility:c', 1.0)
+    assert planned(scheduler)[-1] == ('c', False)
+
+
+@pytest.mark.parametrize('half_lives, expected', [(0, 8.0), (1, 4.0), (3, 1.0)])
+def test_traffic_decays_by_half_life(half_lives, expected):
+    entry = {'count': 8.0, 'at': NOW}
+    assert _decayed(entry, NOW + half_lives * HALF_LIFE) == pytest.approx(expected)
+
+
+def test_missing_traffic_is_zero():
+    assert _decayed(None, NOW) == 0.0
+
+
+def test_traffic_counter_flush_merges_decayed_count():
+    store, scheduler = make_scheduler({'a': 0, 'b': 0, 'c': 0})
+    counter = TrafficCounter(store)
+    counter.hit(['a', 'a', 'b'])
+    counter.flush()
+    entry = store.get('traffic:a')
+    assert entry['count'] == pytest.approx(2.0)
+    assert scheduler.traffic('a', now=entry['at'] + HALF_LIFE) == pytest.approx(1.0)
+    assert scheduler.traffic('b', now=entry['at']) == pytest.approx(1.0)
+    assert scheduler.traffic('c', now=entry['at']) == 0.0
+
+    # 已写入的计数先衰减再累加
+    store.set('traffic:a', {'count': 4.0, 'at': entry['at'] - HALF_LIFE})
+    counter.hit(['a'])
+    counter.flush()
+    assert store.get('traffic:a')['count'] == pytest.approx(3.0, rel=1e-3)
+
+
+def test_quiet_source_doubles_interval_up_to_upper_bound():
+    _, scheduler = make_scheduler({'a': 0, 'b': 0, 'c': 0})
+    intervals = []
+    for _ in range(4):
+        current = scheduler.interval('a')
+        scheduler._adapt_interval('a', 0.0, current)
+        intervals.append(scheduler.interval('a'))
+    assert intervals == [1200, 2400, 2400, 2400]
+
+
+def test_busy_source_halves_interval_down_to_lower_bound():
+    store, scheduler = make_scheduler({'a': 0, 'b': 0, 'c': 0})
+    store.set('interval:sa', 2400)
+    intervals = []
+    for _ in range(4):
+        current = scheduler.interval('a')
+        # 所有条目都是新的：目标间隔远小于当前间隔，单次最多减半
+        scheduler._adapt_interval('a', 1.0, current)
+        intervals.append(scheduler.interval('a'))
+    assert intervals == [1200, 600, 300, 300]
+
+
+def test_interval_moves_to_target_change_within_step():
+    store, scheduler = make_scheduler({'a': 0, 'b': 0, 'c': 0})
+    # 600 秒内有 30% 的新条目，达到 20% 需要 400 秒
+    scheduler._adapt_interval('a', 0.3, 600)
+    assert scheduler.interval('a') == pytest.approx(400)
+
+
+def test_early_refresh_without_changes_keeps_interval():
+    store, scheduler = make_scheduler({'a': 0, 'b': 0, 'c': 0})
+    scheduler._adapt_interval('a', 0.0, 100)
+    assert store.get('interval:sa') is None
+    assert scheduler.interval('a') == 600
+
+
+def test_observe_uses_time_since_last_fetch():
+    store, scheduler = make_scheduler({'a': 600, 'b': 0, 'c': 0})
+    items = [{'title': str(i), 'url': f'https://example.com/{i}'} for i in range(10)]
+    scheduler.observe('a', items, items, now=NOW)
+    assert scheduler.interval('a') == 1200
+    assert store.get('volatility:a') == 0.0
+
+
+def test_learned_interval_is_clamped_and_ignored_when_disabled(monkeypatch):
+    store = MemoryCache()
+    config = MAPPING['a']['config']
+    store.set('interval:sa', 10)
+    assert source_interval(store, 'sa', config) == 300
+    store.set('interval:sa', 10 ** 6)
+    assert source_interval(store, 'sa', config) == 2400
+
+    monkeypatch.setitem(SCHEDULER_CONFIG, 'adaptive_interval', False)
+    assert source_interval(store, 'sa', config) == 600
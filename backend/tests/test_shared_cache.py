@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+共享缓存版本号的测试
+publish 每次写入生成新的版本号，read_if_changed 只在版本号与已知的不同时读取数据，
+文件缓存的多个实例（对应多个进程）看到同一个版本号
+
+运行:
+    python -m pytest backend/tests
+"""
+
+import pytest
+
+from backend.shared_cache import FileCache, MemoryCache, publish, read_if_changed
+
+
+@pytest.fixture(params=['memory', 'file'])
+def store(request, tmp_path):
+    return MemoryCache() if request.param == 'memory' else FileCache(tmp_path / 'cache')
+
+
+def test_missing_entry_is_unchanged(store):
+    assert read_if_changed(store, 'hot_data', None) == (None, None)
+    assert read_if_changed(store, 'hot_data', 'known') == ('known', None)
+
+
+def test_read_only_when_version_changes(store):
+    version = publish(store, 'hot_data', {'a': [1]})
+    assert read_if_changed(store, 'hot_data', None) == (version, {'a': [1]})
+    assert read_if_changed(store, 'hot_data', version) == (version, None)
+
+    new_version = publish(store, 'hot_data', {'a': [1]})
+    assert new_version != version
+    # 内容相同也视为新版本，由调用方按指纹判断是否真的变化
+    assert read_if_changed(store, 'hot_data', version) == (new_version, {'a': [1]})
+
+
+def test_entries_are_independent(store):
+    hot_version = publish(store, 'hot_data', {'a': []})
+    publish(store, 'predictions', {'predictions': []})
+    assert read_if_changed(store, 'hot_data', hot_version) == (hot_version, None)
+
+
+def test_file_cache_instances_share_versions(tmp_path):
+    writer = FileCache(tmp_path / 'cache')
+    reader = FileCache(tmp_path / 'cache')
+    version = publish(writer, 'hot_data', {'a': [1]})
+    assert read_if_changed(reader, 'hot_data', None) == (version, {'a': [1]})
+
+    new_version = publish(writer, 'hot_data', {'a': [2]})
+    assert read_if_changed(reader, 'hot_data', version) == (new_version, {'a': [2]})
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+独立抓取进程
+在Web服务之外运行爬虫管理器的刷新循环，页面解析在进程池中执行，
+每次数据变化后写入热搜快照；Web服务以 SCRAPE_WORKER=external 启动后只读取快照，
+刷新期间API不受抓取和解析的影响
+
+用法:
+    python -m backend.worker [--once] [--poll-interval 60] [--processes 4]
+"""
+
+import sys
+import signal
+import logging
+import argparse
+import threading
+from datetime import datetime
+
+from backend.config.data_sources import WORKER_CONFIG, SCHEDULER_CONFIG, init_runtime
+from backend.snapshot import SNAPSHOT_FILE, TIME_FORMAT, write_snapshot, read_snapshot, archive_snapshot
+from backend.shared_cache import get_cache, publish
+from backend.fingerprint import fingerprint
+
+logger = logging.getLogger('worker')
+
+
+class ScrapeWorker:
+    """抓取进程：定期检查各类别是否需要刷新，数据变化后发布到快照和共享缓存"""
+
+    def __init__(self, poll_interval=None, processes=None, snapshot_file=SNAPSHOT_FILE):
+        self.poll_interval = poll_interval or WORKER_CONFIG['poll_interval']
+        self.processes = WORKER_CONFIG['parse_processes'] if processes is None else processes
+        self.snapshot_file = snapshot_file
+        self.stop_event = threading.Event()
+        self.pool = None
+        self.published = None
+
+    def start_pool(self):
+        """启动解析进程池"""
+        from backend.scrapers.parsing import create_parse_pool, set_parse_pool
+
+        if self.processes > 0:
+            self.pool = create_parse_pool(self.processes, WORKER_CONFIG['start_method'])
+            set_parse_pool(self.pool)
+
+    def stop_pool(self):
+        """关闭解析进程池"""
+        from backend.scrapers.parsing import set_parse_pool
+
+        if self.pool is not None:
+            set_parse_pool(None)
+            self.pool.shutdown()
+            self.pool = None
+
+    def publish(self, hot_data, force=False):
+        """数据有变化时写入快照，返回是否写入"""
+        if not force and hot_data == self.published:
+            return False
+        updated_at = datetime.now()
+        write_snapshot(hot_data, updated_at, self.snapshot_file)
+        try:
+            archive_snapshot(hot_data, updated_at)
+        except Exception as e:
+            logger.error(f"归档热搜数据失败: {e}")
+        # Web进程通过共享缓存的版本号发现数据变化
+        publish(get_cache(), "hot_data", {
+            "data": hot_data,
+            "fingerprint": fingerprint(hot_data),
+            "updated_at": updated_at.strftime(TIME_FORMAT)
+        })
+        self.published = hot_data
+        logger.info(f"已发布热搜快照: {sum(len(items) for items in hot_data.values())} 条")
+        return True
+
+    def run_once(self, force_update=False):
+        """执行一轮刷新（只刷新已到更新时间的类别，按优先级最多刷新若干个，另外试探到了恢复时间的熔断数据源）并发布快照"""
+        from backend.scrapers.manager import get_scraper_manager
+
+        hot_data = get_scraper_manager().get_all_data(
+            force_update=force_update,
+            max_refreshes=SCHEDULER_CONFIG['max_refreshes_per_round']
+        )
+        if not any(hot_data.values()):
+            logger.warning("本轮没有获取到任何数据，不发布快照")
+            return False
+        return self.publish(hot_data)
+
+    def next_wait(self):
+        """到下一轮的等待时间：有熔断的数据源时在其恢复时间到达后立即开始下一轮，发起试探"""
+        from backend.scrapers.manager import get_scraper_manager
+
+        try:
+            probe_in = get_scraper_manager().next_probe_in()
+        except Exception as e:
+            logger.error(f"读取熔断状态失败: {e}")
+            probe_in = None
+        if probe_in is None:
+            return self.poll_interval
+        return min(self.poll_interval, max(probe_in, WORKER_CONFIG['min_probe_wait']))
+
+    def run(self, once=False, force_update=False):
+        """运行刷新循环，直到收到停止信号"""
+        init_runtime()
+
+        # 从已有快照开始，数据没有变化时不重复写入
+        try:
+            self.published, _ = read_snapshot(self.snapshot_file)
+        except Exception as e:
+            logger.error(f"读取已有快照失败: {e}")
+
+        self.start_pool()
+        try:
+            while True:
+                try:
+                    self.run_once(force_update=force_update)
+                except Exception as e:
+                    logger.error(f"刷新热搜数据异常: {e}")
+                force_update = False
+                if once or self.stop_event.wait(self.next_wait()):
+                    break
+        finally:
+            self.stop_pool()
+        logger.info("抓取进程已退出")
+
+    def stop(self, *args):
+        """停止刷新循环（可作为信号处理器）"""
+        self.stop_event.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='独立抓取进程')
+    parser.add_argument('--once', action='store_true', help='只执行一轮刷新后退出')
+    parser.add_argument('--force', action='store_true', help='第一轮刷新忽略缓存')
+    parser.add_argument('--poll-interval', type=float, help='检查是否需要刷新的间隔（秒）')
+    parser.add_argument('--processes', type=int, help='解析进程数，0表示在抓取进程内解析')
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    worker = ScrapeWorker(poll_interval=args.poll_interval, processes=args.processes)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+
+    from backend.profiler import install_signal_handler
+    install_signal_handler()
+
+    worker.run(once=args.once, force_update=args.force)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
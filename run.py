@@ -33,21 +33,20 @@ def install_dependencies():
     subprocess.run([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"], check=True)
     print("依赖安装完成")
 
-def test_backend_connection(port=5000, retries=5, delay=2):
-    """测试后端连接"""
-    url = f"http://localhost:{port}"
-    for i in range(retries):
+def test_backend_connection(port=5000, timeout=15, interval=0.1):
+    """测试后端连接（轮询健康检查接口，后端启动时不会等待抓取完成）"""
+    url = f"http://localhost:{port}/health"
+    print("测试后端连接...")
+    deadline = time.time() + timeout
+    while time.time() < deadline:
         try:
-            print(f"测试后端连接 (尝试 {i+1}/{retries})...")
-            response = requests.get(url, timeout=5)
+            response = requests.get(url, timeout=1)
             if response.status_code == 200:
                 print(f"后端连接成功！响应: {response.json()}")
                 return True
         except requests.exceptions.RequestException:
             pass
-        
-        print(f"未连接到后端，{delay}秒后重试...")
-        time.sleep(delay)
+        time.sleep(interval)
     
     print("无法连接到后端服务")
     return False
@@ -78,9 +77,6 @@ def run_backend():
             bufsize=1
         )
         
-        # 等待服务启动
-        time.sleep(3)
-        
         # 测试服务连接
         if not test_backend_connection():
             print("后端服务可能未正确启动，请检查输出:")
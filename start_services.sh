@@ -73,14 +73,13 @@ EOF
   
   # 等待后端启动
   echo "等待后端服务就绪..."
-  sleep 3
   
-  # 测试后端连接
-  MAX_RETRIES=5
+  # 测试后端连接（健康检查不会等待数据抓取）
+  MAX_RETRIES=50
   RETRY_COUNT=0
   
   while [ $RETRY_COUNT -lt $MAX_RETRIES ]; do
-    if curl -s http://localhost:5000/ > /dev/null; then
+    if curl -sf http://localhost:5000/health > /dev/null; then
       echo "✅ 后端服务已就绪"
       break
     else
@@ -91,8 +90,7 @@ EOF
         echo "最后10行日志:"
         tail -n 10 "$PROJECT_DIR/backend/app.log" 2>/dev/null || echo "无法读取日志文件"
       else
-        echo "等待后端就绪... ($RETRY_COUNT/$MAX_RETRIES)"
-        sleep 2
+        sleep 0.2
       fi
     fi
   done